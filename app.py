@@ -1,12 +1,17 @@
 import streamlit as st
-from tensorflow.keras.models import load_model
-import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+from app.utils.loader import load_assets, model_version
+from app.utils.predictor import category_options, inverse_scale_prediction, preprocess_input
+from app.utils.store import get_store
+from app.utils.visualizer import revenue_aggregates
 
-# Load the trained Keras model
-model = load_model('neural_network_model.h5')
+# Load the published model with the scalers it was trained with, once per process
+@st.cache_resource
+def load_ml_model():
+    return model_version(), load_assets()
+
+version, (model, feature_scaler, target_scaler) = load_ml_model()
 
 # Configure visual settings
 sns.set_theme(style="whitegrid", palette="pastel")
@@ -62,7 +67,7 @@ with st.expander("📌 **Project Overview**", expanded=True):
     
     **Features Considered:**
     - **Franchise**: Whether the restaurant is part of a franchise or not.
-    - **Category**: Type of restaurant (Fast Food, Casual Dining, Fine Dining).
+    - **Category**: Cuisine type of the restaurant (e.g. Burger, Pizza, Coffee Cafe).
     - **Menu Size**: Number of items on the menu.
     - **Orders Placed**: The total number of orders placed (in lacs).
     """)
@@ -73,23 +78,21 @@ st.sidebar.header('Input Features')
 
 # Sidebar Inputs
 franchise = st.sidebar.selectbox('Franchise (0 = No, 1 = Yes)', [0, 1])
-category = st.sidebar.selectbox('Category', ['Fast Food', 'Casual Dining', 'Fine Dining'])
+category = st.sidebar.selectbox('Category', category_options(feature_scaler))
 no_of_items = st.sidebar.number_input('Number of Items Offered', min_value=1, value=10)
 order_placed = st.sidebar.number_input('Orders Placed (in lacs)', min_value=1, value=100)
-order_item_ratio = order_placed / no_of_items
-
-# Category encoding
-category_mapping = {'Fast Food': 0, 'Casual Dining': 1, 'Fine Dining': 2}
-category_encoded = category_mapping[category]
 
 # ========== Prediction Button and Result ==========
 
 if st.sidebar.button('Predict Revenue'):
-    input_data = np.array([franchise, category_encoded, no_of_items, order_placed, order_item_ratio]).reshape(1, -1)
-    prediction = model.predict(input_data)
+    # Encoded and scaled exactly as in training, then mapped back to rupees
+    inputs = {'franchise': franchise, 'category': category, 'menu_size': no_of_items, 'orders': order_placed}
+    input_data = preprocess_input(inputs, feature_scaler)
+    prediction = inverse_scale_prediction(model.predict(input_data), target_scaler)
+    get_store().record(inputs, prediction, version, 'app.py')
     
     st.subheader('📊 Predicted Revenue:')
-    st.markdown(f"### ₹ {prediction[0][0]:,.2f}")  # Format the prediction in INR
+    st.markdown(f"### ₹ {prediction:,.2f}")  # Format the prediction in INR
 
     st.markdown("""**Note**: The model was trained on restaurant features like franchise type, category, menu size, and orders placed.""")
 
@@ -97,13 +100,8 @@ if st.sidebar.button('Predict Revenue'):
 
 st.markdown("### 📈 Visual Insights")
 
-# Example Data for Visualization
-data = {
-    "Category": ['Fast Food', 'Casual Dining', 'Fine Dining'],
-    "Avg Revenue": [150000, 250000, 350000]  # Example revenues
-}
-
-df_vis = pd.DataFrame(data)
+# Average revenue per category, aggregated once from the training data
+df_vis = revenue_aggregates()['by_category'].rename(columns={'mean': 'Avg Revenue'})
 
 # Plot bar chart for visual insights
 fig, ax = plt.subplots(figsize=(10, 6))
@@ -111,6 +109,7 @@ sns.barplot(x='Category', y='Avg Revenue', data=df_vis, ax=ax, palette='Blues')
 ax.set_title('Average Revenue per Category')
 ax.set_ylabel('Average Revenue (₹)')
 ax.set_xlabel('Restaurant Category')
+ax.tick_params(axis='x', rotation=45)
 sns.despine()
 st.pyplot(fig)
 
@@ -1,15 +1,29 @@
+import os
+import time
 import streamlit as st
 import numpy as np
 import pandas as pd
 from app.utils import (
-    load_feature_scaler,
-    load_target_scaler,
-    load_keras_model,
+    LiveModel,
+    PredictionCache,
+    category_options,
+    predict_interval,
     preprocess_input,
     inverse_scale_prediction,
+    supports_intervals,
+    predict_grid,
     create_pie_chart,
-    create_trend_chart
+    create_city_chart,
+    create_importance_chart,
+    load_feature_importance,
+    create_scenario_heatmap,
+    create_trend_chart,
+    get_store,
+    ScoringJob,
+    UPLOAD_TYPES,
+    revenue_aggregates
 )
+from app.utils.metrics import registry, stage, start_metrics_server, write_prometheus
 
 # Custom CSS for styling
 st.markdown("""
@@ -48,15 +62,84 @@ st.markdown("""
 
 # Load assets
 @st.cache_resource
-def load_assets():
-    """Load models and scalers with caching for better performance."""
-    return (
-        load_keras_model(),
-        load_feature_scaler(),
-        load_target_scaler()
-    )
+def get_live_model():
+    """Model and scalers shared by every session of this server process.
 
-model, feature_scaler, target_scaler = load_assets()
+    A background thread watches the model registry and swaps in newly
+    published versions without a restart; each rerun uses one consistent set.
+    """
+    return LiveModel().start()
+
+@st.cache_resource
+def get_prediction_cache():
+    """Prediction cache shared by every session of this server process."""
+    cache = PredictionCache(maxsize=50000)
+    registry.register_gauge('prediction_cache_hits', lambda: cache.hits, 'Prediction cache hits.')
+    registry.register_gauge('prediction_cache_misses', lambda: cache.misses, 'Prediction cache misses.')
+    return cache
+
+@st.cache_resource
+def get_prediction_store():
+    """Prediction log shared by every session; rows are written by a background thread."""
+    store = get_store()
+    registry.register_gauge('prediction_store_written', lambda: store.written, 'Predictions written to the store.')
+    registry.register_gauge('prediction_store_dropped', lambda: store.dropped, 'Predictions dropped (queue full).')
+    return store
+
+@st.cache_resource
+def start_metrics_endpoint(port):
+    """Expose /metrics once per server process when REVENUE_METRICS_PORT is set."""
+    return start_metrics_server(port)
+
+# What-if grid: every menu size x order level the inputs above allow
+SCENARIO_MENU_SIZES = np.arange(1, 201)
+SCENARIO_ORDERS = np.arange(1, 501)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def scenario_grid(model_version, franchise, category, _assets):
+    """Revenue surface for one franchise/category, computed once per model version.
+
+    The assets are not hashed (leading underscore); the version in the key
+    ties each cached grid to the model that produced it.
+    """
+    model, feature_scaler, target_scaler = _assets
+    with stage('scenario_grid'):
+        return predict_grid(franchise, category, SCENARIO_MENU_SIZES, SCENARIO_ORDERS,
+                            model, feature_scaler, target_scaler)
+
+# Seconds between progress refreshes of a running upload
+UPLOAD_POLL_SECONDS = 1.0
+
+def poll(func):
+    """Rerun just ``func`` every UPLOAD_POLL_SECONDS where fragments exist (Streamlit >= 1.37)."""
+    fragment = getattr(st, 'fragment', None)
+    return fragment(run_every=UPLOAD_POLL_SECONDS)(func) if fragment else func
+
+def show_upload_status(job):
+    status = job.status()
+    st.progress(status['progress'], text=f"{status['rows']:,} outlets scored "
+                                         f"({status['rows_per_second']:,.0f} rows/s)")
+    if not status['summary'].empty:
+        st.dataframe(status['summary'], hide_index=True)
+    if not status['preview'].empty:
+        st.caption(f"First {len(status['preview']):,} scored rows")
+        st.dataframe(status['preview'], hide_index=True)
+    return status
+
+@poll
+def upload_progress(job):
+    """Live progress and partial results while the background job runs."""
+    show_upload_status(job)
+    st.button("Cancel", on_click=job.cancel)
+    if not job.running:
+        st.rerun()  # Swap to the final view with the download
+
+if os.environ.get('REVENUE_METRICS_PORT'):
+    start_metrics_endpoint(int(os.environ['REVENUE_METRICS_PORT']))
+
+version, (model, feature_scaler, target_scaler) = get_live_model().current()
+prediction_cache = get_prediction_cache()
+prediction_store = get_prediction_store()
 
 # Sidebar
 with st.sidebar:
@@ -82,7 +165,7 @@ with st.expander("🚀 Make Prediction", expanded=True):
     
     with col1:
         franchise = st.selectbox("Franchise Status", ["Independent", "Franchised"])
-        category = st.selectbox("Cuisine Type", ["Fast Food", "Casual Dining", "Fine Dining"])
+        category = st.selectbox("Cuisine Type", category_options(feature_scaler))
     
     with col2:
         menu_size = st.number_input("Menu Items", min_value=1, value=25)
@@ -97,29 +180,135 @@ with st.expander("🚀 Make Prediction", expanded=True):
             'orders': orders
         }
         
-        # Preprocess and predict
-        processed_input = preprocess_input(inputs, feature_scaler)
-        scaled_prediction = model.predict(processed_input)
-        prediction = inverse_scale_prediction(scaled_prediction, target_scaler)
+        # Preprocess and predict (memoized per input combination and model version)
+        def predict():
+            if supports_intervals(model):
+                # Point prediction and Monte-Carlo dropout samples from one tiled forward pass
+                with stage(registry.first_call_stage('model_predict')):
+                    result = predict_interval(inputs, model, feature_scaler, target_scaler, seed=0)
+                return result['prediction'][0], result['lower'][0], result['upper'][0]
+            processed_input = preprocess_input(inputs, feature_scaler)
+            # The first call also pays for Keras building and tracing the predict function
+            with stage(registry.first_call_stage('model_predict')):
+                scaled_prediction = model.predict(processed_input)
+            return inverse_scale_prediction(scaled_prediction, target_scaler), None, None
+
+        prediction, lower, upper = prediction_cache.get_or_compute(inputs, version, predict)
+        prediction_store.record(inputs, prediction, version, 'app/main.py', lower, upper)
+        if lower is None:
+            interval = "Prediction interval needs a model with dropout (keras or numpy backend)"
+        else:
+            interval = f"90% interval: ₹ {lower:,.0f} – ₹ {upper:,.0f} (Monte-Carlo dropout)"
         
         # Display results
         st.markdown(f"""
         <div class="metric-card">
             <h3>Predicted Monthly Revenue</h3>
             <h1>₹ {prediction:,.0f}</h1>
-            <p>± 5% margin of error</p>
+            <p>{interval}</p>
         </div>
         """, unsafe_allow_html=True)
 
+        cache_stats = prediction_cache.stats()
+        st.caption(
+            f"Prediction cache: {cache_stats['hits']:,} hits / {cache_stats['misses']:,} misses "
+            f"({cache_stats['hit_rate']:.0%} hit rate, model {cache_stats['model_version']})"
+        )
+
+# Scenario Section
+with st.expander("🧭 Scenario Explorer"):
+    st.markdown(f"Predicted revenue for every menu size ({SCENARIO_MENU_SIZES[0]}–{SCENARIO_MENU_SIZES[-1]}) "
+                f"× order level ({SCENARIO_ORDERS[0]}–{SCENARIO_ORDERS[-1]}), scored as one batch.")
+    col1, col2 = st.columns(2)
+    with col1:
+        scenario_franchise = st.selectbox("Franchise Status", ["Independent", "Franchised"], key='scenario_franchise')
+    with col2:
+        scenario_category = st.selectbox("Cuisine Type", category_options(feature_scaler), key='scenario_category')
+
+    if st.checkbox("Show response surface"):
+        with st.spinner("Scoring the scenario grid..."):
+            grid = scenario_grid(version, 1 if scenario_franchise == "Franchised" else 0, scenario_category,
+                                 (model, feature_scaler, target_scaler))
+        with stage('render_scenario'):
+            st.plotly_chart(create_scenario_heatmap(SCENARIO_MENU_SIZES, SCENARIO_ORDERS, grid,
+                                                    marker=(orders, menu_size)),
+                            use_container_width=True)
+        best = np.unravel_index(np.argmax(grid), grid.shape)
+        st.caption(f"{grid.size:,} scenarios; highest predicted revenue ₹ {grid[best]:,.0f} at "
+                   f"{SCENARIO_MENU_SIZES[best[0]]} menu items and {SCENARIO_ORDERS[best[1]]} orders "
+                   f"(model {version})")
+
+# Upload Section
+with st.expander("📂 Score a File"):
+    st.markdown("Upload outlets as CSV or Excel with Franchise, Category, No_Of_Item and Order_Placed columns "
+                "(or franchise, category, menu_size, orders). Rows are scored in chunks in the background.")
+    upload = st.file_uploader("Outlet file", type=list(UPLOAD_TYPES))
+    job = st.session_state.get('upload_job')
+    if upload is not None and st.button("Score file"):
+        if job is not None:
+            job.close()
+        job = st.session_state['upload_job'] = ScoringJob(
+            upload, upload.name, (model, feature_scaler, target_scaler), version, store=prediction_store).start()
+
+    if job is not None and job.running:
+        upload_progress(job)
+    elif job is not None:
+        status = show_upload_status(job)
+        if status['error']:
+            st.error(f"Scoring stopped after {status['rows']:,} rows: {status['error']}")
+        elif status['state'] == 'cancelled':
+            st.warning(f"Cancelled after {status['rows']:,} rows.")
+        else:
+            st.success(f"Scored {status['rows']:,} outlets in {status['seconds']:.1f} s (model {job.model_version})")
+        with open(job.output_path, 'rb') as scored:
+            st.download_button("Download scored file", scored, file_name=job.download_name, mime='text/csv')
+
 # Analytics Section
 st.markdown("## 📊 Performance Insights")
-col1, col2 = st.columns(2)
+try:
+    aggregates = revenue_aggregates()
+except FileNotFoundError:
+    aggregates = None
+    st.info("Training data not found; revenue insights are unavailable.")
 
-with col1:
-    st.plotly_chart(create_pie_chart(), use_container_width=True)
+if aggregates is not None:
+    col1, col2 = st.columns(2)
+
+    with col1, stage('render_pie'):
+        st.plotly_chart(create_pie_chart(aggregates), use_container_width=True)
+
+    with col2, stage('render_city'):
+        st.plotly_chart(create_city_chart(aggregates), use_container_width=True)
+
+# Prediction history: hourly aggregates from the prediction store
+st.markdown("## 📈 Prediction History")
+history_category = st.selectbox("Cuisine Type", ["All"] + category_options(feature_scaler), key='history_category')
+with stage('history_query'):
+    history = prediction_store.trend('hour', category=None if history_category == "All" else history_category)
+if history.empty:
+    st.caption("No predictions recorded yet.")
+else:
+    with stage('render_trend'):
+        st.plotly_chart(create_trend_chart(history['time'], history['mean_revenue'], weights=history['predictions'],
+                                           title='Predicted Revenue per Hour'),
+                        use_container_width=True)
+    st.caption(f"{int(history['predictions'].sum()):,} predictions over {len(history):,} hours "
+               f"({prediction_store.path})")
 
-with col2:
-    st.plotly_chart(create_trend_chart(), use_container_width=True)
+# Model quality: precomputed by src/importance.py, only read here
+importance_report = load_feature_importance()
+if importance_report is None:
+    st.caption("Feature importance not computed for this model yet (python -m src.importance).")
+else:
+    metrics = importance_report['metrics']
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Held-out MAE", f"₹ {metrics['mae']:,.0f}")
+    col2.metric("Held-out R²", f"{metrics['r2']:.3f}")
+    col3.metric("Held-out MAPE", f"{metrics['mape']:.1%}")
+    with stage('render_importance'):
+        st.plotly_chart(create_importance_chart(importance_report), use_container_width=True)
+    st.caption(f"{importance_report['rows']} held-out outlets, {importance_report['repeats']} shuffles per feature "
+               f"(model {importance_report['model_version']}, {importance_report['created']})")
 
 # Footer
 st.markdown("---")
@@ -128,4 +317,13 @@ st.markdown("""
     <p>🔮 Powered by Deep Learning | 🚀 Production-Ready Pipeline</p>
     <small>Developed by Avinash Rai | 2023 Revenue Prediction System</small>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+if os.environ.get('REVENUE_METRICS_FILE'):
+    write_prometheus(os.environ['REVENUE_METRICS_FILE'])
+
+# Without fragments, poll a running upload by rerunning the page
+job = st.session_state.get('upload_job')
+if job is not None and job.running and not hasattr(st, 'fragment'):
+    time.sleep(UPLOAD_POLL_SECONDS)
+    st.rerun()
\ No newline at end of file
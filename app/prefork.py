@@ -0,0 +1,358 @@
+"""
+Pre-fork launcher: load the model once, then fork N scoring workers.
+
+The parent imports the serving runtime, loads and warms the model, freezes
+the garbage collector's view of every object created so far (``gc.freeze``)
+and only then forks. Workers inherit the interpreter, imported modules and
+model weights copy-on-write, so those pages stay shared, and each worker runs
+the ``app.server`` ScoringServer on one listening socket inherited from the
+parent (the kernel spreads connections across workers).
+
+TensorFlow's runtime is not fork-safe: ``model.predict`` deadlocks in a
+child forked after a Keras model was loaded. With ``--backend keras`` the
+parent therefore shares the imported TensorFlow and Keras modules and the
+feature/target transforms, and each worker loads its own (small) network.
+The NumPy backend is loaded and warmed entirely in the parent.
+
+Signals to the parent: SIGTERM/SIGINT stop all workers; SIGHUP reloads the
+model in the parent and replaces workers one at a time (so a hot-reloaded
+version is shared again). A worker that dies is replaced; workers that keep
+dying within MIN_WORKER_UPTIME of starting are respawned with an exponential
+backoff, and after MAX_FAILED_STARTS such failures in a row the parent gives
+up and exits with status 1 instead of fork-looping.
+
+Usage (from the repository root):
+    python -m app.prefork --workers 4 --port 8000 --backend numpy
+    python -m app.prefork --workers 4 --backend numpy --measure   # memory report as JSON
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import signal
+import socket
+import sys
+import time
+
+from app.utils.loader import DEFAULT_BACKEND
+
+SMAPS_FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+
+# A worker that exits sooner than this after being forked counts as a failed start
+MIN_WORKER_UPTIME = 5.0
+# Respawn delay after the n-th failed start in a row: base * 2**(n - 1), capped
+RESPAWN_BACKOFF_BASE = 0.5
+RESPAWN_BACKOFF_MAX = 30.0
+MAX_FAILED_STARTS = 5
+
+def read_smaps_rollup(pid='self'):
+    """Memory of one process from /proc/<pid>/smaps_rollup, in MB."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            name, _, rest = line.partition(':')
+            if name in SMAPS_FIELDS:
+                values[name] = int(rest.split()[0]) / 1024
+    return {
+        'rss_mb': values['Rss'],
+        'pss_mb': values['Pss'],
+        'shared_mb': values['Shared_Clean'] + values['Shared_Dirty'],
+        'private_mb': values['Private_Clean'] + values['Private_Dirty'],
+    }
+
+def memory_report(parent_pid, worker_pids):
+    """
+    Per-process memory and the saving from sharing pages copy-on-write.
+
+    RSS counts shared pages in full for every process, PSS splits them
+    between the processes sharing them, so the sum of RSS approximates N
+    independently started workers and the sum of PSS is what the pre-forked
+    group actually uses. A worker's private memory is its marginal cost.
+    """
+    parent = read_smaps_rollup(parent_pid)
+    workers = {pid: read_smaps_rollup(pid) for pid in worker_pids}
+    rss_total = parent['rss_mb'] + sum(w['rss_mb'] for w in workers.values())
+    pss_total = parent['pss_mb'] + sum(w['pss_mb'] for w in workers.values())
+    return {
+        'workers': len(workers),
+        'parent': parent,
+        'per_worker': workers,
+        'worker_private_mb_mean': sum(w['private_mb'] for w in workers.values()) / max(len(workers), 1),
+        'worker_rss_mb_mean': sum(w['rss_mb'] for w in workers.values()) / max(len(workers), 1),
+        'rss_total_mb': rss_total,
+        'pss_total_mb': pss_total,
+        'shared_savings_mb': rss_total - pss_total,
+    }
+
+def _warm(live_model, batch_sizes=(1, 8, 64, 256)):
+    """Run the scoring path once per batch size so lazy imports and caches are settled before forking."""
+    from app.utils.predictor import category_options, predict_batch
+    model, feature_scaler, target_scaler = live_model.assets
+    category = category_options(feature_scaler)[0]
+    for n_rows in batch_sizes:
+        rows = {'franchise': [1] * n_rows, 'category': [category] * n_rows,
+                'menu_size': [25] * n_rows, 'orders': [4.0] * n_rows}
+        predict_batch(rows, model, feature_scaler, target_scaler)
+
+class PreforkServer:
+    """
+    Parent process holding the shared model and supervising forked workers.
+
+    Args:
+        backend (str): 'keras', 'numpy' or 'tflite' (defaults to REVENUE_MODEL_BACKEND)
+        workers (int): Number of worker processes
+        host (str): Bind address
+        port (int): Bind port (0 picks a free one)
+        threads_per_worker (int): BLAS/TensorFlow threads per worker
+        max_batch_size (int): Micro-batcher batch bound per worker
+        max_wait_ms (float): Micro-batcher wait per worker
+        poll_interval (float): Seconds between model registry checks in workers
+        segments (bool): Route rows with a "city" through the segment model zoo
+        record (bool): Append every prediction to the prediction store
+    """
+
+    def __init__(self, backend=None, workers=None, host='127.0.0.1', port=8000, threads_per_worker=1,
+                 max_batch_size=256, max_wait_ms=2.0, poll_interval=2.0, segments=False,
+                 record=False):
+        self.backend = backend or DEFAULT_BACKEND
+        self.n_workers = workers or os.cpu_count()
+        self.threads_per_worker = threads_per_worker
+        self.server_options = {'max_batch_size': max_batch_size, 'max_wait_ms': max_wait_ms,
+                               'poll_interval': poll_interval, 'segments': segments,
+                               'record': record}
+        self.workers = set()
+        self.live_model = None
+        self._started_at = {}
+        self._respawn_at = []
+        self._failed_starts = 0
+        self._stopping = False
+        self._recycle = False
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen(1024)
+        self.sock.setblocking(False)
+        self.address = self.sock.getsockname()
+
+    def preload(self):
+        """Import and load everything that can be shared before forking."""
+        from app.utils.parallel import limit_threads
+        limit_threads(self.threads_per_worker, tensorflow=self.backend == 'keras')
+        if self.backend == 'keras':
+            import tensorflow  # noqa: F401  (shared runtime code; the network is loaded per worker)
+            import app.utils.transform  # noqa: F401
+        else:
+            from app.utils.registry import LiveModel
+            self.live_model = LiveModel(self.backend, poll_interval=self.server_options['poll_interval'])
+            _warm(self.live_model)
+        import app.server  # noqa: F401
+        gc.collect()
+        gc.freeze()
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._worker_main()
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers.add(pid)
+        self._started_at[pid] = time.monotonic()
+        return pid
+
+    def _worker_main(self):
+        for signum in (signal.SIGTERM, signal.SIGHUP, signal.SIGCHLD):
+            signal.signal(signum, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # The parent handles Ctrl-C for the group
+        from app.server import build_server
+        server = build_server(self.backend, live_model=self.live_model, **self.server_options)
+        server_stats = server.stats_fn
+        server.stats_fn = lambda: dict(server_stats(), worker_pid=os.getpid(), memory=read_smaps_rollup())
+
+        async def serve():
+            task = asyncio.current_task()
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+            try:
+                await server.serve(sock=self.sock)
+            except asyncio.CancelledError:
+                pass
+        asyncio.run(serve())
+
+    def _reap(self):
+        """Collect exited workers; returns their pids."""
+        exited = []
+        while self.workers:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            self.workers.discard(pid)
+            exited.append(pid)
+        return exited
+
+    def _schedule_respawn(self, pid, log):
+        """Queue a replacement for exited worker ``pid``, backing off while workers keep failing to start."""
+        now = time.monotonic()
+        if now - self._started_at.pop(pid, now) >= MIN_WORKER_UPTIME:
+            self._failed_starts = 0
+            print(f"worker {pid} exited; starting a replacement", file=log)
+            self._respawn_at.append(now)
+            return True
+        self._failed_starts += 1
+        if self._failed_starts >= MAX_FAILED_STARTS:
+            print(f"worker {pid} exited during startup; {self._failed_starts} failed starts in a row, "
+                  f"giving up", file=log)
+            return False
+        delay = min(RESPAWN_BACKOFF_BASE * 2 ** (self._failed_starts - 1), RESPAWN_BACKOFF_MAX)
+        print(f"worker {pid} exited during startup ({self._failed_starts} in a row); "
+              f"starting a replacement in {delay:.1f}s", file=log)
+        self._respawn_at.append(now + delay)
+        return True
+
+    def _respawn_due(self):
+        now = time.monotonic()
+        due = [at for at in self._respawn_at if at <= now]
+        self._respawn_at = [at for at in self._respawn_at if at > now]
+        for _ in due:
+            self.spawn()
+        # Every worker got past startup: the failure streak is over
+        if self._failed_starts and not self._respawn_at and all(
+                now - started >= MIN_WORKER_UPTIME for started in self._started_at.values()):
+            self._failed_starts = 0
+
+    def _stop_worker(self, pid, timeout=10.0):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if os.waitpid(pid, os.WNOHANG)[0] == pid:
+                break
+            time.sleep(0.05)
+        else:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.workers.discard(pid)
+        self._started_at.pop(pid, None)
+
+    def recycle(self):
+        """Reload the model in the parent, then replace workers one at a time."""
+        if self.live_model is not None:
+            gc.unfreeze()
+            if self.live_model.reload():
+                _warm(self.live_model)
+            gc.collect()
+            gc.freeze()
+        for pid in list(self.workers):
+            self.spawn()
+            self._stop_worker(pid)
+
+    def start(self):
+        self.preload()
+        for _ in range(self.n_workers):
+            self.spawn()
+        return self
+
+    def run(self, log=sys.stderr):
+        """
+        Supervise workers until SIGTERM/SIGINT.
+
+        Returns:
+            int: 0 after a requested stop, 1 when workers kept failing to start
+        """
+        def request_stop(signum, frame):
+            self._stopping = True
+
+        def request_recycle(signum, frame):
+            self._recycle = True
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGHUP, request_recycle)
+        print(f"Serving revenue predictions on http://{self.address[0]}:{self.address[1]} "
+              f"with {len(self.workers)} {self.backend} workers (parent pid {os.getpid()})", file=log)
+        try:
+            while not self._stopping:
+                for pid in self._reap():
+                    if not self._stopping and not self._schedule_respawn(pid, log):
+                        return 1
+                self._respawn_due()
+                if self._recycle:
+                    self._recycle = False
+                    self.recycle()
+                    print(f"workers recycled ({len(self.workers)} running)", file=log)
+                time.sleep(0.2)
+            return 0
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        for pid in list(self.workers):
+            self._stop_worker(pid)
+        self.sock.close()
+
+def _wait_until_serving(address, backend, requests=20, timeout=60.0):
+    """Send a few predictions so every worker has scored before memory is measured."""
+    import urllib.request
+    from app.utils.loader import FEATURE_TRANSFORM_FILE, load_feature_transform, resolve_artifacts
+    from app.utils.predictor import category_options
+
+    path = os.path.join(resolve_artifacts(backend)[1], FEATURE_TRANSFORM_FILE)
+    category = category_options(load_feature_transform(path))[0]
+    body = json.dumps({'franchise': 1, 'category': category, 'menu_size': 25, 'orders': 4}).encode()
+    url = f'http://{address[0]}:{address[1]}/predict'
+    deadline = time.monotonic() + timeout
+    sent = 0
+    while sent < requests:
+        try:
+            urllib.request.urlopen(urllib.request.Request(url, body, method='POST'), timeout=5).read()
+            sent += 1
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--backend', choices=['keras', 'numpy', 'tflite'], help='default: REVENUE_MODEL_BACKEND')
+    parser.add_argument('--threads-per-worker', type=int, default=1)
+    parser.add_argument('--max-batch-size', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--poll-interval', type=float, default=2.0, help='seconds between model registry checks')
+    parser.add_argument('--segments', action='store_true', help='route rows with a "city" through the segment model zoo')
+    parser.add_argument('--record', action='store_true', help='append every prediction to the prediction store')
+    parser.add_argument('--measure', action='store_true',
+                        help='start the workers, score a few requests, print a memory report as JSON and exit')
+    args = parser.parse_args(argv)
+
+    server = PreforkServer(args.backend, args.workers, args.host, 0 if args.measure else args.port,
+                           args.threads_per_worker, args.max_batch_size, args.max_wait_ms, args.poll_interval,
+                           args.segments, args.record)
+    server.start()
+    if not args.measure:
+        return server.run()
+
+    try:
+        _wait_until_serving(server.address, server.backend, requests=10 * len(server.workers))
+        report = dict(memory_report(os.getpid(), sorted(server.workers)), backend=server.backend)
+    finally:
+        server.shutdown()
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""
+Asyncio HTTP scoring service for the revenue model.
+
+Concurrent single-row requests are coalesced into batched forward passes by
+``app.utils.batching.MicroBatcher``.
+
+Endpoints:
+    POST /predict   {"franchise": 1, "category": "Burger", "menu_size": 25, "orders": 4}
+                    -> {"revenue": 1234567.0}
+                    or {"rows": [{...}, ...]} -> {"revenues": [...]}
+                    With --segments an optional "city" routes the row to its
+                    City model from the segment zoo (src/train_segments.py)
+    GET  /stats     batcher counters, p50/p99 latency, achieved batch sizes and model version
+    GET  /metrics   per-stage latency histograms in Prometheus text format
+    GET  /healthz   liveness check
+
+Usage (from the repository root):
+    python -m app.server --port 8000 --backend numpy --max-batch-size 256 --max-wait-ms 2
+    python -m app.server --backend numpy --segments
+    python -m app.server --backend numpy --record   # log every prediction to the prediction store
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from app.utils.batching import MicroBatcher
+from app.utils.loader import DEFAULT_BACKEND, resolve_artifacts
+from app.utils.metrics import registry, stage
+from app.utils.predictor import predict_batch
+from app.utils.registry import LiveModel
+from app.utils.segments import load_router
+from app.utils.store import get_store
+
+INPUT_KEYS = ('franchise', 'category', 'menu_size', 'orders')
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def make_predict_fn(model, feature_scaler, target_scaler):
+    """Build the batch scoring function handed to the micro-batcher."""
+    def predict_rows(rows):
+        columns = {key: [row[key] for row in rows] for key in INPUT_KEYS}
+        return predict_batch(columns, model, feature_scaler, target_scaler).tolist()
+    return predict_rows
+
+def make_live_predict_fn(live_model):
+    """Batch scoring function that always uses the live model's current version."""
+    def predict_rows(rows):
+        return make_predict_fn(*live_model.assets)(rows)
+    return predict_rows
+
+def make_segment_predict_fn(live_model, max_resident=16):
+    """
+    Batch scoring function routing rows by City through the live version's segment zoo.
+
+    The router is rebuilt when the live model swaps, around the new
+    version's global model; versions without a zoo score every row with it.
+    """
+    routers = {}
+
+    def router_for(version, assets):
+        if version not in routers:
+            resolved, directory = resolve_artifacts(live_model.backend, live_model.model_dir)
+            if resolved != version:  # Swapped while resolving; try again on the next batch
+                return None
+            routers.clear()
+            routers[version] = load_router(live_model.backend, directory, max_resident, assets)
+        return routers[version]
+
+    def predict_rows(rows):
+        version, assets = live_model.current()
+        router = router_for(version, assets)
+        if router is None:
+            return make_predict_fn(*assets)(rows)
+        columns = {key: [row[key] for row in rows] for key in INPUT_KEYS}
+        columns['city'] = [row.get('city', '') for row in rows]
+        return router.predict_batch(columns).tolist()
+
+    predict_rows.stats = lambda: {'segments': router.stats() for router in list(routers.values()) if router}
+    return predict_rows
+
+def make_recording_predict_fn(predict_fn, live_model, store):
+    """Wrap a batch scoring function so every scored batch is queued on the prediction store."""
+    def predict_rows(rows):
+        revenues = predict_fn(rows)
+        columns = {key: [row.get(key) for row in rows] for key in INPUT_KEYS + ('city',)}
+        store.record_batch(columns, revenues, live_model.version, 'app/server.py')
+        return revenues
+
+    if hasattr(predict_fn, 'stats'):
+        predict_rows.stats = predict_fn.stats
+    return predict_rows
+
+class ScoringServer:
+    """
+    Minimal HTTP/1.1 server (keep-alive, JSON bodies) in front of a MicroBatcher.
+    
+    Args:
+        batcher (MicroBatcher): Batcher used for /predict
+        stats_fn: Optional zero-argument callable adding fields to /stats
+    """
+
+    def __init__(self, batcher, stats_fn=None):
+        self.batcher = batcher
+        self.stats_fn = stats_fn
+
+    async def serve(self, host='127.0.0.1', port=8000, sock=None):
+        """Start the batcher and serve until cancelled."""
+        await self.batcher.start()
+        if sock is not None:
+            server = await asyncio.start_server(self._handle_connection, sock=sock)
+        else:
+            server = await asyncio.start_server(self._handle_connection, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.close()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                try:
+                    method, path, version, headers, length = self._parse_head(head)
+                except HTTPError as exc:
+                    await self._respond(writer, exc.status, {'error': str(exc)}, keep_alive=False)
+                    break
+                try:
+                    body = await reader.readexactly(length) if length else b''
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                try:
+                    status, payload = 200, await self._route(method, path.split('?', 1)[0], body)
+                except HTTPError as exc:
+                    status, payload = exc.status, {'error': str(exc)}
+                except Exception as exc:
+                    status, payload = 500, {'error': f'{type(exc).__name__}: {exc}'}
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _parse_head(head):
+        """Request line, headers and body length of a request head; HTTPError when malformed."""
+        request_line, *header_lines = head.decode('latin-1').split('\r\n')
+        parts = request_line.split(' ', 2)
+        if len(parts) != 3:
+            raise HTTPError(400, f'malformed request line {request_line!r}')
+        method, path, version = parts
+        headers = {}
+        for line in header_lines:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(400, f"invalid Content-Length {headers['content-length']!r}") from None
+        if length < 0:
+            raise HTTPError(400, f'invalid Content-Length {length}')
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, 'request body too large')
+        return method, path, version, headers, length
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), 'text/plain; version=0.0.4'
+        else:
+            body, content_type = json.dumps(payload).encode(), 'application/json'
+        writer.write(
+            f'HTTP/1.1 {status} {REASONS[status]}\r\n'
+            f'Content-Type: {content_type}\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode() + body
+        )
+        await writer.drain()
+
+    async def _route(self, method, path, body):
+        if path == '/healthz':
+            return {'status': 'ok'}
+        if path == '/stats':
+            stats = self.batcher.stats()
+            if self.stats_fn is not None:
+                stats.update(self.stats_fn())
+            return stats
+        if path == '/metrics':
+            return registry.render_prometheus()
+        if path != '/predict':
+            raise HTTPError(404, f'unknown path {path}')
+        if method != 'POST':
+            raise HTTPError(405, 'use POST for /predict')
+
+        try:
+            request = json.loads(body)
+        except ValueError:
+            raise HTTPError(400, 'request body must be JSON') from None
+
+        try:
+            with stage('http_predict'):
+                if isinstance(request, dict) and 'rows' in request:
+                    return {'revenues': await self.batcher.submit_many(request['rows'])}
+                return {'revenue': await self.batcher.submit(request)}
+        except KeyError as exc:
+            raise HTTPError(400, f'missing input field {exc}') from None
+        except (TypeError, ValueError) as exc:
+            raise HTTPError(400, str(exc)) from None
+
+def build_server(backend=None, max_batch_size=256, max_wait_ms=2.0, poll_interval=2.0, live_model=None,
+                 segments=False, record=False):
+    """
+    Load the model for ``backend`` and wrap it in a ScoringServer.
+    
+    New registry versions are loaded in the background every
+    ``poll_interval`` seconds and used from the next batch on. Pass an
+    already loaded ``live_model`` to reuse it (e.g. one inherited from a
+    pre-fork parent). With ``segments`` rows carrying a "city" are scored by
+    that City's segment model where one was kept. With ``record`` every
+    prediction is appended to the prediction store (app.utils.store).
+    """
+    backend = backend or DEFAULT_BACKEND
+    live_model = (live_model or LiveModel(backend, poll_interval=poll_interval)).start()
+    predict_fn = make_segment_predict_fn(live_model) if segments else make_live_predict_fn(live_model)
+    if record:
+        store = get_store()
+        predict_fn = make_recording_predict_fn(predict_fn, live_model, store)
+        registry.register_gauge('prediction_store_written', lambda: store.written, 'Predictions written to the store.')
+        registry.register_gauge('prediction_store_dropped', lambda: store.dropped, 'Predictions dropped (queue full).')
+    batcher = MicroBatcher(predict_fn, max_batch_size, max_wait_ms)
+    register_batcher_gauges(batcher)
+    registry.register_gauge('model_swaps', lambda: live_model.swaps, 'Model versions swapped in since start.')
+    extra_stats = getattr(predict_fn, 'stats', dict)
+    return ScoringServer(batcher, stats_fn=lambda: dict(live_model.stats(), backend=backend, **extra_stats()))
+
+def register_batcher_gauges(batcher):
+    """Export the batcher's counters and percentiles on /metrics."""
+    registry.register_gauge('batcher_requests', lambda: batcher.requests, 'Requests scored by the micro-batcher.')
+    registry.register_gauge('batcher_batches', lambda: batcher.batches, 'Forward passes run by the micro-batcher.')
+    for key in ('latency_p50_ms', 'latency_p99_ms', 'batch_size_mean', 'queue_depth'):
+        registry.register_gauge(f'batcher_{key}', lambda key=key: batcher.stats()[key])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--backend', choices=['keras', 'numpy', 'tflite'], help='default: REVENUE_MODEL_BACKEND')
+    parser.add_argument('--max-batch-size', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--poll-interval', type=float, default=2.0, help='seconds between model registry checks')
+    parser.add_argument('--segments', action='store_true', help='route rows with a "city" through the segment model zoo')
+    parser.add_argument('--record', action='store_true', help='append every prediction to the prediction store')
+    args = parser.parse_args(argv)
+
+    server = build_server(args.backend, args.max_batch_size, args.max_wait_ms, args.poll_interval,
+                          segments=args.segments, record=args.record)
+    print(f"Serving revenue predictions on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
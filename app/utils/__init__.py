@@ -1,14 +1,59 @@
-from .loader import load_feature_scaler, load_target_scaler, load_keras_model, load_sample_data
-from .predictor import preprocess_input, inverse_scale_prediction
-from .visualizer import create_pie_chart, create_trend_chart
-
-__all__ = [
-    'load_feature_scaler',
-    'load_target_scaler',
-    'load_keras_model',
-    'load_sample_data',
-    'preprocess_input',
-    'inverse_scale_prediction',
-    'create_pie_chart',
-    'create_trend_chart'
-]
\ No newline at end of file
+"""
+Model loading, prediction and chart helpers for the revenue predictor.
+
+Submodules are imported on first attribute access, so ``from app.utils import
+preprocess_input`` only pays for NumPy, while TensorFlow, joblib, pandas and
+Plotly are imported when a loader or chart helper is first used.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'load_feature_scaler': 'loader',
+    'load_target_scaler': 'loader',
+    'load_keras_model': 'loader',
+    'load_numpy_model': 'loader',
+    'load_feature_transform': 'loader',
+    'load_feature_importance': 'loader',
+    'load_assets': 'loader',
+    'model_version': 'loader',
+    'resolve_artifacts': 'loader',
+    'load_sample_data': 'loader',
+    'preprocess_input': 'predictor',
+    'inverse_scale_prediction': 'predictor',
+    'build_features': 'predictor',
+    'scale_features': 'predictor',
+    'predict_batch': 'predictor',
+    'predict_grid': 'predictor',
+    'category_options': 'predictor',
+    'predict_interval': 'intervals',
+    'supports_intervals': 'intervals',
+    'SegmentRouter': 'segments',
+    'load_router': 'segments',
+    'FeatureTransform': 'transform',
+    'PredictionCache': 'cache',
+    'LiveModel': 'registry',
+    'PredictionStore': 'store',
+    'get_store': 'store',
+    'ScoringJob': 'upload',
+    'UPLOAD_TYPES': 'upload',
+    'create_pie_chart': 'visualizer',
+    'create_trend_chart': 'visualizer',
+    'create_city_chart': 'visualizer',
+    'create_importance_chart': 'visualizer',
+    'revenue_aggregates': 'visualizer',
+    'create_scenario_heatmap': 'visualizer'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,128 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-row predictions into batched forward passes.
+    
+    Requests queue up while the previous batch is being scored; the worker
+    then takes up to ``max_batch_size`` of them, waiting at most
+    ``max_wait_ms`` after the first one for stragglers, and scores them with
+    one call to ``predict_fn``. Scoring runs on a single background thread so
+    the event loop keeps accepting requests during the forward pass.
+    
+    Args:
+        predict_fn: Callable taking a list of row dicts, returning one prediction per row
+        max_batch_size (int): Upper bound on rows per forward pass
+        max_wait_ms (float): Longest a request waits for a batch to fill
+        stats_window (int): Number of recent requests/batches kept for percentiles
+    """
+
+    def __init__(self, predict_fn, max_batch_size=256, max_wait_ms=2.0, stats_window=10000):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self._latencies = deque(maxlen=stats_window)
+        self._batch_sizes = deque(maxlen=stats_window)
+        self._queue = None
+        self._worker = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='micro-batcher')
+
+    async def start(self):
+        """Start the batching loop on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        """Stop the batching loop and release the scoring thread."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=True)
+
+    async def submit(self, row):
+        """Queue one row and wait for its prediction."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future, time.perf_counter()))
+        return await future
+
+    async def submit_many(self, rows):
+        """Queue several rows and wait for all of their predictions."""
+        return await asyncio.gather(*(self.submit(row) for row in rows))
+
+    async def _next_batch(self):
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            rows = [row for row, _, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, self.predict_fn, rows)
+                outcomes = [(result, None) for result in results]
+            except Exception:
+                # Score rows one by one so a single bad row does not fail its neighbours
+                outcomes = []
+                for row in rows:
+                    try:
+                        outcomes.append(((await loop.run_in_executor(self._executor, self.predict_fn, [row]))[0], None))
+                    except Exception as exc:
+                        outcomes.append((None, exc))
+
+            finished = time.perf_counter()
+            self.batches += 1
+            self._batch_sizes.append(len(batch))
+            for (_, future, queued), (result, error) in zip(batch, outcomes):
+                self.requests += 1
+                self._latencies.append(finished - queued)
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(result)
+                else:
+                    self.errors += 1
+                    future.set_exception(error)
+
+    def stats(self):
+        """Return request/batch counters, latency percentiles and achieved batch sizes."""
+        latencies = np.array(self._latencies) * 1000
+        sizes = np.array(self._batch_sizes)
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'errors': self.errors,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'latency_p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else None,
+            'latency_p99_ms': float(np.percentile(latencies, 99)) if len(latencies) else None,
+            'batch_size_mean': float(sizes.mean()) if len(sizes) else None,
+            'batch_size_p50': float(np.percentile(sizes, 50)) if len(sizes) else None,
+            'batch_size_max': int(sizes.max()) if len(sizes) else None,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+        }
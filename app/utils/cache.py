@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+
+def normalize_inputs(inputs):
+    """
+    Build a hashable cache key from a prediction input dict.
+    
+    Equivalent inputs (1 vs 1.0 vs True, padded category labels) map to the same key.
+    """
+    return (
+        int(inputs['franchise']),
+        str(inputs['category']).strip(),
+        float(inputs['menu_size']),
+        float(inputs['orders'])
+    )
+
+class PredictionCache:
+    """
+    Thread-safe bounded LRU cache of single-row predictions.
+    
+    Entries are keyed on the normalized inputs and tied to one model version;
+    looking up with a different version drops every entry, so predictions
+    from a replaced model artifact are never served.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.model_version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, inputs, model_version, compute):
+        """
+        Return the cached prediction for ``inputs`` or compute and store it.
+        
+        Args:
+            inputs (dict): Prediction inputs (franchise, category, menu_size, orders)
+            model_version (str): Version of the loaded model artifact
+            compute: Zero-argument callable producing the prediction on a miss
+        
+        Returns:
+            The cached or freshly computed prediction
+        """
+        key = normalize_inputs(inputs)
+        with self._lock:
+            if model_version != self.model_version:
+                self._entries.clear()
+                self.model_version = model_version
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Compute outside the lock so concurrent sessions are not serialised
+        value = compute()
+
+        with self._lock:
+            if model_version == self.model_version:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return hit/miss counters and occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'model_version': self.model_version,
+            }
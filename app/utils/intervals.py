@@ -0,0 +1,104 @@
+import numpy as np
+
+from .metrics import stage
+from .predictor import scale_features
+
+# Stochastic passes per row and the central coverage of the reported interval
+DEFAULT_SAMPLES = 50
+DEFAULT_LEVEL = 0.9
+
+# Upper bound on tiled rows (rows x (samples + 1)) in one forward pass
+MAX_TILED_ROWS = 1 << 16
+
+def supports_intervals(model):
+    """True when the model keeps Dropout layers that can be sampled."""
+    if hasattr(model, 'has_dropout'):
+        return model.has_dropout
+    return any(type(layer).__name__ == 'Dropout' for layer in getattr(model, 'layers', ()))
+
+def _keras_samples(model, x, n_samples, rng):
+    """Layer-by-layer pass over the tiled rows with our own dropout masks.
+
+    Only Dropout is made stochastic; BatchNormalization keeps its moving
+    statistics (``model(x, training=True)`` would switch it to batch
+    statistics as well).
+    """
+    n_rows = len(x)
+    x = np.tile(np.asarray(x, dtype=np.float32), (n_samples + 1, 1))
+    for layer in model.layers:
+        if type(layer).__name__ == 'Dropout':
+            mask = (rng.random(tuple(x.shape), dtype=np.float32) >= layer.rate).astype(np.float32)
+            mask /= 1.0 - layer.rate
+            mask[:n_rows] = 1.0
+            x = x * mask
+        else:
+            x = layer(x, training=False)
+    return np.asarray(x, dtype=np.float64).reshape(n_samples + 1, n_rows)
+
+def sample_predictions(model, x, n_samples=DEFAULT_SAMPLES, seed=None):
+    """
+    Point prediction and Monte-Carlo dropout samples in one batched pass.
+
+    The input rows are tiled ``n_samples + 1`` times and pushed through the
+    network once; the first copy runs without dropout, every other copy with
+    fresh dropout masks. Large inputs are split so a pass holds at most
+    MAX_TILED_ROWS rows.
+
+    Args:
+        model: Keras model or NumPy engine with Dropout
+        x: Model input (scaled features for Keras, raw for the NumPy engine)
+        n_samples (int): Stochastic passes per row
+        seed (int): Seed for the dropout masks (None for fresh randomness)
+
+    Returns:
+        np.array: Shape (n_samples + 1, n_rows) in model output units; row 0
+        is the deterministic prediction
+    """
+    if not supports_intervals(model):
+        raise TypeError(f"{type(model).__name__} has no Dropout layers to sample; "
+                        "prediction intervals need the keras or numpy backend")
+    rng = np.random.default_rng(seed)
+    if hasattr(model, 'sample'):
+        sample = model.sample
+    else:
+        sample = lambda rows, n, rng: _keras_samples(model, rows, n, rng)
+    step = max(1, MAX_TILED_ROWS // (n_samples + 1))
+    if len(x) <= step:
+        return sample(x, n_samples, rng)
+    return np.concatenate([sample(x[start:start + step], n_samples, rng)
+                           for start in range(0, len(x), step)], axis=1)
+
+def predict_interval(data, model, feature_scaler, target_scaler, n_samples=DEFAULT_SAMPLES,
+                     level=DEFAULT_LEVEL, seed=None):
+    """
+    Revenue predictions with Monte-Carlo dropout prediction intervals.
+
+    Args:
+        data: Single input dict, DataFrame or dict of column arrays (see build_features)
+        model: Loaded Keras model or NumPy engine
+        feature_scaler: Fitted feature scaler, or a FeatureTransform
+        target_scaler: Fitted target scaler
+        n_samples (int): Stochastic passes per row
+        level (float): Central coverage of the interval (0.9 -> 5th to 95th percentile)
+        seed (int): Seed for the dropout masks
+
+    Returns:
+        dict: 'prediction', 'lower', 'upper' and 'std' arrays in original units,
+        one value per input row
+    """
+    scaled = scale_features(data, feature_scaler)
+    if not len(scaled):
+        return {key: np.empty(0, dtype=np.float64) for key in ('prediction', 'lower', 'upper', 'std')}
+
+    with stage('model_predict_interval'):
+        samples = sample_predictions(model, scaled, n_samples, seed)
+    with stage('inverse_scale_batch'):
+        revenue = target_scaler.inverse_transform(samples.reshape(-1, 1)).reshape(samples.shape)
+    tail = (1.0 - level) / 2
+    lower, upper = np.quantile(revenue[1:], [tail, 1.0 - tail], axis=0)
+    return {
+        'prediction': revenue[0],
+        'lower': lower,
+        'upper': upper,
+        'std': revenue[1:].std(axis=0),
+    }
@@ -1,22 +1,200 @@
-import joblib
-import pandas as pd
-from tensorflow.keras.models import load_model
+import hashlib
+import os
 
+from .metrics import timed
+from .registry import current_version, version_dir
+
+# joblib, pandas and TensorFlow are imported inside the loaders that need them,
+# so importing this module (or app.utils) stays cheap.
+
+# Serving backend: 'keras' (TensorFlow), 'numpy' (exported engine, no TensorFlow import)
+# or 'tflite' (quantized model from src/export_tflite.py)
+DEFAULT_BACKEND = os.environ.get('REVENUE_MODEL_BACKEND', 'keras')
+
+# Directory holding the served artifacts (flat files or a versioned registry)
+MODEL_DIR = os.environ.get('REVENUE_MODEL_DIR', 'models')
+
+FEATURE_TRANSFORM_FILE = 'feature_transform.npz'
+FEATURE_IMPORTANCE_FILE = 'feature_importance.json'
+
+# Memory-mappable NumPy engine inside a registry version
+ENGINE_DIR = 'engine'
+
+# Files whose contents define the served model, per backend
+BACKEND_ARTIFACTS = {
+    'keras': (
+        'neural_network_model.keras',
+        'feature_scaler.pkl',
+        'target_scaler.pkl',
+    ),
+    'numpy': ('neural_network_model.npz',),
+    'tflite': (
+        'neural_network_model.tflite',
+        'feature_scaler.pkl',
+        'target_scaler.pkl',
+    ),
+}
+
+@timed('load_scaler')
 def load_feature_scaler(path='models/feature_scaler.pkl'):
     """Load the feature scaler from disk."""
+    import joblib
     return joblib.load(path)
 
+@timed('load_scaler')
 def load_target_scaler(path='models/target_scaler.pkl'):
     """Load the target scaler from disk."""
+    import joblib
     return joblib.load(path)
 
+@timed('load_model')
 def load_keras_model(path='models/neural_network_model.keras'):
     """Load the trained Keras model."""
+    from tensorflow.keras.models import load_model
     return load_model(path)
 
+@timed('warm_up')
+def load_warm_keras_model(path='models/neural_network_model.keras'):
+    """Load the Keras model behind a traced, bucketed and warmed inference function (see KerasModel)."""
+    from .keras_engine import KerasModel
+    model = KerasModel(load_keras_model(path))
+    model.warm_up()
+    return model
+
+@timed('load_model')
+def load_numpy_model(path='models/neural_network_model.npz'):
+    """Load the exported NumPy inference engine (``.npz`` file or memory-mapped directory)."""
+    from .numpy_engine import NumpyModel
+    return NumpyModel.load(path)
+
+@timed('load_model')
+def load_tflite_model(path='models/neural_network_model.tflite'):
+    """Load the quantized TFLite model (LiteRT/tflite-runtime when installed, else TensorFlow's interpreter)."""
+    from .tflite_engine import TFLiteModel
+    return TFLiteModel.load(path)
+
+@timed('load_scaler')
+def load_feature_transform(path=None):
+    """
+    Load the fused feature-transform artifact (vocabularies, ratio, scaling).
+
+    Raises:
+        FileNotFoundError: The artifact set predates it. The feature scaler
+            alone cannot encode category labels the way training did, so the
+            model has to be retrained (``python -m src.train``).
+    """
+    from .transform import FeatureTransform
+    path = path or os.path.join(MODEL_DIR, FEATURE_TRANSFORM_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"{path} not found: these model artifacts carry no training vocabularies, so category labels "
+            f"cannot be encoded as in training. Retrain with 'python -m src.train' to write it.")
+    return FeatureTransform.load(path)
+
+def resolve_artifacts(backend=None, model_dir=None):
+    """
+    Locate the artifact set to serve and identify it.
+    
+    When the model directory holds a registry (a ``CURRENT`` pointer, see
+    ``app.utils.registry``) this is the current version's directory and its
+    id. Otherwise it is the flat model directory, identified by each
+    artifact's size and modification time, so the version still changes
+    whenever a model or scaler file is replaced.
+    
+    Args:
+        backend (str): 'keras', 'numpy' or 'tflite' (defaults to REVENUE_MODEL_BACKEND)
+        model_dir (str): Model directory (defaults to REVENUE_MODEL_DIR or models/)
+    
+    Returns:
+        tuple: (version string, artifact directory)
+    """
+    backend = backend or DEFAULT_BACKEND
+    model_dir = model_dir or MODEL_DIR
+    version = current_version(model_dir)
+    if version is not None:
+        return version, version_dir(version, model_dir)
+
+    digest = hashlib.sha1(backend.encode())
+    for name in BACKEND_ARTIFACTS[backend] + (FEATURE_TRANSFORM_FILE,):
+        path = os.path.join(model_dir, name)
+        if name == FEATURE_TRANSFORM_FILE and not os.path.exists(path):
+            continue
+        stat = os.stat(path)
+        digest.update(f'{path}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+    return digest.hexdigest()[:12], model_dir
+
+def load_assets(backend=None, directory=None):
+    """
+    Load the model together with the scalers its backend expects.
+    
+    feature_transform.npz takes the feature scaler's place, so inputs are
+    encoded with the training vocabularies; artifact sets without it are
+    rejected (see ``load_feature_transform``). The NumPy engine has both
+    scalers folded into its weights, so it is paired with an unscaled
+    transform and a pass-through target scaler; the rest of the prediction
+    flow (preprocess_input, inverse_scale_prediction, predict_batch) is
+    unchanged. Registry versions store the engine as ``.npy`` files that are
+    memory-mapped, so worker processes share its pages. The Keras model is
+    returned warmed up (see ``KerasModel``), so the first request does not
+    pay for tracing.
+    
+    Args:
+        backend (str): 'keras', 'numpy' or 'tflite' (defaults to REVENUE_MODEL_BACKEND)
+        directory (str): Artifact directory (defaults to the one ``resolve_artifacts`` picks)
+    
+    Returns:
+        tuple: (model, feature_scaler, target_scaler)
+    """
+    backend = backend or DEFAULT_BACKEND
+    directory = directory or resolve_artifacts(backend)[1]
+    path = lambda name: os.path.join(directory, name)
+    if backend not in BACKEND_ARTIFACTS:
+        raise ValueError(f"Unknown model backend '{backend}' (expected one of {sorted(BACKEND_ARTIFACTS)})")
+    transform = load_feature_transform(path(FEATURE_TRANSFORM_FILE))
+    if backend in ('keras', 'tflite'):
+        load_model = load_warm_keras_model if backend == 'keras' else load_tflite_model
+        return load_model(path(BACKEND_ARTIFACTS[backend][0])), transform, load_target_scaler(path('target_scaler.pkl'))
+    from .numpy_engine import IdentityScaler
+    engine = path(ENGINE_DIR) if os.path.isdir(path(ENGINE_DIR)) else path('neural_network_model.npz')
+    return load_numpy_model(engine), transform.unscaled(), IdentityScaler()
+
+def model_version(backend=None, model_dir=None):
+    """
+    Identify the model artifacts currently being published.
+    
+    Cheap enough to check on every request (see ``resolve_artifacts``).
+    
+    Args:
+        backend (str): 'keras', 'numpy' or 'tflite' (defaults to REVENUE_MODEL_BACKEND)
+        model_dir (str): Model directory (defaults to REVENUE_MODEL_DIR or models/)
+    
+    Returns:
+        str: Registry version id, or a short hex digest of the flat artifact set
+    """
+    return resolve_artifacts(backend, model_dir)[0]
+
+def load_feature_importance(directory=None):
+    """
+    Load the permutation importance report written by ``src/importance.py``.
+    
+    Args:
+        directory (str): Artifact directory (defaults to the served one)
+    
+    Returns:
+        dict: Report with 'metrics' and 'importance', or None if not computed yet
+    """
+    import json
+    directory = directory or resolve_artifacts()[1]
+    try:
+        with open(os.path.join(directory, FEATURE_IMPORTANCE_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
 def load_sample_data():
     """Load sample data for visualization."""
+    import pandas as pd
     return pd.DataFrame({
         'Category': ['Fast Food', 'Casual Dining', 'Fine Dining'],
         'Avg_Revenue': [250000, 450000, 750000]
-    })
\ No newline at end of file
+    })
@@ -0,0 +1,207 @@
+"""
+Lightweight per-stage latency metrics with Prometheus text export.
+
+Wrap a stage with ``with stage('model_predict'):`` or decorate a function
+with ``@timed('preprocess')``; each stage gets a latency histogram (whose
+``_count`` is the call counter) and an error counter. Set REVENUE_METRICS=0 to disable instrumentation: ``stage``
+then returns a shared no-op context manager and ``timed`` leaves functions
+undecorated, so the hot path pays almost nothing.
+"""
+
+import bisect
+import contextlib
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENABLED = os.environ.get('REVENUE_METRICS', '1') != '0'
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PREFIX = 'revenue'
+
+_NOOP = contextlib.nullcontext()
+
+class Histogram:
+    """Cumulative-bucket latency histogram."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Registry:
+    """Thread-safe store of stage histograms, counters and gauge callbacks."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+        self._first_calls = set()
+
+    def observe(self, stage_name, seconds):
+        """Record one stage latency."""
+        with self._lock:
+            histogram = self._histograms.get(stage_name)
+            if histogram is None:
+                histogram = self._histograms[stage_name] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name, value=1, **labels):
+        """Increment a counter (exported as ``revenue_<name>_total``)."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def register_gauge(self, name, func, help_text=''):
+        """Export ``func()`` as gauge ``revenue_<name>`` at render time."""
+        with self._lock:
+            self._gauges[name] = (func, help_text)
+
+    def first_call_stage(self, stage_name):
+        """Return ``<stage>_first`` the first time a stage runs in this process, else the stage name."""
+        with self._lock:
+            if stage_name in self._first_calls:
+                return stage_name
+            self._first_calls.add(stage_name)
+        return f'{stage_name}_first'
+
+    def snapshot(self):
+        """Return stage latency summaries as plain dicts."""
+        with self._lock:
+            return {
+                name: {'count': h.count, 'sum_s': h.sum, 'mean_s': h.sum / h.count if h.count else 0.0}
+                for name, h in self._histograms.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._first_calls.clear()
+
+    def render_prometheus(self):
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = {name: (h.buckets, list(h.counts), h.sum, h.count) for name, h in self._histograms.items()}
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+
+        lines = [
+            f'# HELP {PREFIX}_stage_latency_seconds Latency of prediction pipeline stages.',
+            f'# TYPE {PREFIX}_stage_latency_seconds histogram',
+        ]
+        for name in sorted(histograms):
+            buckets, counts, total, count = histograms[name]
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{PREFIX}_stage_latency_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{PREFIX}_stage_latency_seconds_bucket{{stage="{name}",le="+Inf"}} {count}')
+            lines.append(f'{PREFIX}_stage_latency_seconds_sum{{stage="{name}"}} {total}')
+            lines.append(f'{PREFIX}_stage_latency_seconds_count{{stage="{name}"}} {count}')
+
+        for counter_name in sorted({name for name, _ in counters}):
+            lines.append(f'# TYPE {PREFIX}_{counter_name}_total counter')
+            for (name, labels), value in sorted(counters.items()):
+                if name == counter_name:
+                    label_text = ','.join(f'{k}="{v}"' for k, v in labels)
+                    lines.append(f'{PREFIX}_{name}_total{{{label_text}}} {value}' if label_text
+                                 else f'{PREFIX}_{name}_total {value}')
+
+        for name, (func, help_text) in sorted(gauges.items()):
+            try:
+                value = func()
+            except Exception:
+                continue
+            if value is None:
+                continue
+            if help_text:
+                lines.append(f'# HELP {PREFIX}_{name} {help_text}')
+            lines.append(f'# TYPE {PREFIX}_{name} gauge')
+            lines.append(f'{PREFIX}_{name} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+
+class _StageTimer:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        registry.observe(self.name, time.perf_counter() - self.start)
+        if exc_type is not None:
+            registry.inc('stage_errors', stage=self.name)
+        return False
+
+def set_enabled(flag):
+    """Turn ``stage`` timing on or off at runtime (``timed`` is fixed at import)."""
+    global ENABLED
+    ENABLED = bool(flag)
+
+def stage(name):
+    """Context manager timing one pipeline stage (a shared no-op when disabled)."""
+    if not ENABLED:
+        return _NOOP
+    return _StageTimer(name)
+
+def timed(name):
+    """Decorator timing every call of a function as stage ``name``."""
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with _StageTimer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def write_prometheus(path):
+    """Atomically write the current metrics to ``path`` (textfile collector format)."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(registry.render_prometheus())
+    os.replace(tmp_path, path)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = registry.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server(port=9108, host='127.0.0.1'):
+    """Serve ``/metrics`` from a daemon thread; returns the server instance."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
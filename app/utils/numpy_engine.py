@@ -0,0 +1,163 @@
+import os
+
+import numpy as np
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0, out=x),
+}
+
+class IdentityScaler:
+    """Pass-through scaler used when scaling is folded into the engine weights."""
+
+    def transform(self, X):
+        return np.asarray(X, dtype=np.float64)
+
+    def inverse_transform(self, X):
+        return np.asarray(X, dtype=np.float64)
+
+class NumpyModel:
+    """
+    Pure-NumPy forward pass for the exported revenue network.
+    
+    The exported artifact is a stack of affine layers with the feature scaler,
+    BatchNormalization and target scaler already folded in, so ``predict``
+    takes raw (unscaled) features and returns revenue in original units.
+    
+    Dropout is kept as metadata for Monte-Carlo sampling: ``dropout[i]`` is
+    the rate applied to layer i's input and ``dropout_shifts[i]`` the part of
+    its folded bias that passes through the dropped units, so ``sample``
+    reproduces the Keras network with dropout active exactly.
+    """
+
+    def __init__(self, weights, biases, activations, dropout=None, dropout_shifts=None):
+        self.weights = [np.asarray(w) for w in weights]
+        self.biases = [np.asarray(b) for b in biases]
+        self.activations = [str(a) for a in activations]
+        unknown = set(self.activations) - set(ACTIVATIONS)
+        if unknown:
+            raise ValueError(f"Unsupported activation(s) in engine: {sorted(unknown)}")
+        self.dtype = self.weights[0].dtype
+        self.dropout = [float(p) for p in dropout] if dropout is not None else [0.0] * len(self.weights)
+        self.dropout_shifts = list(dropout_shifts) if dropout_shifts is not None else [None] * len(self.weights)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load an engine exported by ``src/export_numpy.py``.
+        
+        ``path`` is either the ``.npz`` file or a directory written by
+        ``save_dir``; weights in a directory are memory-mapped read-only, so
+        every process serving the same file shares one copy of the pages.
+        """
+        if os.path.isdir(path):
+            mmap_mode = 'r' if mmap else None
+            with open(os.path.join(path, 'activations.txt')) as f:
+                activations = f.read().split()
+            load = lambda name: np.load(os.path.join(path, name), mmap_mode=mmap_mode)
+            weights = [load(f'W{i}.npy') for i in range(len(activations))]
+            biases = [load(f'b{i}.npy') for i in range(len(activations))]
+            dropout_path = os.path.join(path, 'dropout.npy')
+            dropout = np.load(dropout_path) if os.path.exists(dropout_path) else None
+            shifts = [load(f'S{i}.npy') if dropout is not None and dropout[i] else None for i in range(len(activations))]
+            return cls(weights, biases, activations, dropout, shifts)
+        with np.load(path, allow_pickle=False) as data:
+            activations = list(data['activations'])
+            weights = [data[f'W{i}'] for i in range(len(activations))]
+            biases = [data[f'b{i}'] for i in range(len(activations))]
+            dropout = data['dropout'] if 'dropout' in data.files else None
+            shifts = [data[f'S{i}'] if dropout is not None and dropout[i] else None for i in range(len(activations))]
+        return cls(weights, biases, activations, dropout, shifts)
+
+    def _dropout_arrays(self):
+        arrays = {'dropout': np.array(self.dropout)}
+        for i, shift in enumerate(self.dropout_shifts):
+            if self.dropout[i]:
+                arrays[f'S{i}'] = shift
+        return arrays
+
+    def save(self, path):
+        """Write the engine weights to a compact ``.npz`` file."""
+        arrays = {'activations': np.array(self.activations), **self._dropout_arrays()}
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            arrays[f'W{i}'] = w
+            arrays[f'b{i}'] = b
+        np.savez(path, **arrays)
+
+    def save_dir(self, path):
+        """Write one ``.npy`` per array so ``load`` can memory-map them."""
+        os.makedirs(path, exist_ok=True)
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            np.save(os.path.join(path, f'W{i}.npy'), np.ascontiguousarray(w))
+            np.save(os.path.join(path, f'b{i}.npy'), np.ascontiguousarray(b))
+        for name, array in self._dropout_arrays().items():
+            np.save(os.path.join(path, f'{name}.npy'), np.ascontiguousarray(array))
+        with open(os.path.join(path, 'activations.txt'), 'w') as f:
+            f.write('\n'.join(self.activations) + '\n')
+
+    def _forward(self, x):
+        for w, b, activation in zip(self.weights, self.biases, self.activations):
+            x = x @ w
+            x += b
+            x = ACTIVATIONS[activation](x)
+        return x
+
+    def predict(self, x, batch_size=None, verbose=0):
+        """
+        Run the forward pass, mirroring ``keras.Model.predict``.
+        
+        Args:
+            x: Raw feature matrix of shape (n_rows, n_features)
+            batch_size (int): Rows per matrix-multiply step (None for all at once)
+            verbose: Ignored; accepted for Keras compatibility
+        
+        Returns:
+            np.array: Predictions of shape (n_rows, 1)
+        """
+        x = np.asarray(x, dtype=self.dtype)
+        if batch_size is None or len(x) <= batch_size:
+            return self._forward(x)
+        return np.concatenate([
+            self._forward(x[start:start + batch_size])
+            for start in range(0, len(x), batch_size)
+        ])
+
+    @property
+    def has_dropout(self):
+        return any(self.dropout)
+
+    def sample(self, x, n_samples, rng=None):
+        """
+        Monte-Carlo dropout predictions from one tiled forward pass.
+        
+        The rows are tiled ``n_samples + 1`` times; the first copy runs
+        without dropout (the point prediction) and every other copy draws its
+        own dropout masks.
+        
+        Args:
+            x: Raw feature matrix of shape (n_rows, n_features)
+            n_samples (int): Stochastic passes per row
+            rng: ``np.random.Generator`` for the masks
+        
+        Returns:
+            np.array: Shape (n_samples + 1, n_rows); row 0 is the point prediction
+        """
+        rng = rng or np.random.default_rng()
+        x = np.asarray(x, dtype=self.dtype)
+        n_rows = len(x)
+        x = np.tile(x, (n_samples + 1, 1))
+        for w, b, activation, rate, shift in zip(self.weights, self.biases, self.activations,
+                                                 self.dropout, self.dropout_shifts):
+            if rate:
+                mask = (rng.random(x.shape, dtype=np.float32) >= rate).astype(self.dtype)
+                mask /= 1.0 - rate
+                mask[:n_rows] = 1.0
+                out = (x * mask) @ w
+                mask -= 1.0
+                out += mask @ shift
+                x = out
+            else:
+                x = x @ w
+            x += b
+            x = ACTIVATIONS[activation](x)
+        return x.reshape(n_samples + 1, n_rows)
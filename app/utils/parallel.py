@@ -0,0 +1,41 @@
+import os
+import sys
+
+# Thread pools that NumPy/BLAS, OpenMP and scikit-learn size from the environment
+THREAD_ENV_VARS = (
+    'OMP_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'NUMEXPR_NUM_THREADS',
+    'TF_NUM_INTRAOP_THREADS',
+)
+
+def limit_threads(n_threads, tensorflow=False):
+    """
+    Cap the compute thread pools of the current process.
+    
+    Call this at the start of a pool worker so N workers x M threads does not
+    oversubscribe the host. TensorFlow only honours the limit if it is applied
+    before the first TensorFlow op runs.
+    
+    Args:
+        n_threads (int): Threads allowed per pool
+        tensorflow (bool): Also configure TensorFlow's intra/inter-op pools
+    """
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(n_threads)
+
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(n_threads)
+    except ImportError:
+        pass
+
+    if tensorflow or 'tensorflow' in sys.modules:
+        import tensorflow as tf
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+            tf.config.threading.set_inter_op_parallelism_threads(1)
+        except RuntimeError:
+            # TensorFlow was already initialised; the environment caps still apply
+            pass
@@ -1,21 +1,36 @@
 import numpy as np
 
+from .metrics import stage, timed
+
+FRANCHISE_MAP = {'No': 0, 'Yes': 1, 'Independent': 0, 'Franchised': 1}
+
+# Batch inputs may use either the form keys or the raw dataset column names
+COLUMN_ALIASES = {
+    'franchise': ('franchise', 'Franchise'),
+    'category': ('category', 'Category'),
+    'menu_size': ('menu_size', 'No_Of_Item'),
+    'orders': ('orders', 'Order_Placed'),
+}
+
+@timed('preprocess')
 def preprocess_input(inputs, feature_scaler):
     """
     Preprocess user inputs for model prediction.
     
     Args:
         inputs (dict): Dictionary of user inputs
-        feature_scaler: Fitted feature scaler
+        feature_scaler: FeatureTransform, or a fitted feature scaler (then
+            the category must already be a training code)
     
     Returns:
         np.array: Scaled and reshaped input array
     """
-    category_map = {'Fast Food': 0, 'Casual Dining': 1, 'Fine Dining': 2}
+    if _is_transform(feature_scaler):
+        return feature_scaler(inputs)
     
     processed = [
         inputs['franchise'],
-        category_map[inputs['category']],
+        _category_codes(np.asarray(inputs['category'])),
         inputs['menu_size'],
         inputs['orders'],
         inputs['orders'] / inputs['menu_size']
@@ -23,6 +38,7 @@ def preprocess_input(inputs, feature_scaler):
     
     return feature_scaler.transform(np.array(processed).reshape(1, -1))
 
+@timed('inverse_scale')
 def inverse_scale_prediction(scaled_prediction, target_scaler):
     """
     Convert scaled predictions back to original scale.
@@ -34,4 +50,147 @@ def inverse_scale_prediction(scaled_prediction, target_scaler):
     Returns:
         float: Prediction in original scale
     """
-    return target_scaler.inverse_transform(scaled_prediction)[0][0]
\ No newline at end of file
+    return target_scaler.inverse_transform(scaled_prediction)[0][0]
+
+def _is_transform(feature_scaler):
+    """True for a fused FeatureTransform (encodes raw inputs itself)."""
+    return callable(feature_scaler) and hasattr(feature_scaler, 'vocabularies')
+
+def category_options(feature_scaler):
+    """Category labels the loaded model understands, in code order."""
+    if not _is_transform(feature_scaler):
+        raise ValueError("Category labels come from the model's feature_transform.npz; "
+                         "retrain with 'python -m src.train' to write it")
+    return feature_scaler.vocabularies['Category'].tolist()
+
+def _column(data, key):
+    """Fetch a batch column by its form key or dataset column name."""
+    for name in COLUMN_ALIASES[key]:
+        if name in data:
+            return np.asarray(data[name])
+    raise KeyError(f"Missing input column '{key}' (accepted names: {COLUMN_ALIASES[key]})")
+
+def batch_length(data):
+    """Number of rows in a batch (a single input dict counts as one row)."""
+    return np.atleast_1d(_column(data, 'orders')).shape[0]
+
+def _encode(values, mapping, label):
+    """Map string labels to codes once per distinct value; numeric input passes through."""
+    if values.dtype.kind in 'biuf':
+        return values.astype(np.float64)
+    uniques, inverse = np.unique(values.astype(str), return_inverse=True)
+    unknown = [str(u) for u in uniques if u not in mapping]
+    if unknown:
+        raise ValueError(f"Unknown {label} value(s): {unknown}")
+    codes = np.array([mapping[u] for u in uniques], dtype=np.float64)
+    return codes[inverse]
+
+def _category_codes(values):
+    """Category codes pass through; labels need the training vocabulary of a FeatureTransform."""
+    if values.dtype.kind not in 'biuf':
+        raise ValueError("Category labels can only be encoded by the model's FeatureTransform "
+                         "(feature_transform.npz); pass training category codes to build_features")
+    return values.astype(np.float64)
+
+def build_features(data):
+    """
+    Build the model feature matrix for a batch of inputs.
+    
+    Args:
+        data: DataFrame or dict of column arrays keyed by the form names
+            (franchise, category, menu_size, orders) or the dataset names
+            (Franchise, Category, No_Of_Item, Order_Placed); categories as
+            training codes (``FeatureTransform`` encodes labels)
+    
+    Returns:
+        np.array: Unscaled feature matrix of shape (n_rows, 5)
+    """
+    menu_size = _column(data, 'menu_size').astype(np.float64)
+    orders = _column(data, 'orders').astype(np.float64)
+    
+    features = np.empty((len(orders), 5), dtype=np.float64)
+    features[:, 0] = _encode(_column(data, 'franchise'), FRANCHISE_MAP, 'franchise')
+    features[:, 1] = _category_codes(_column(data, 'category'))
+    features[:, 2] = menu_size
+    features[:, 3] = orders
+    np.divide(orders, menu_size, out=features[:, 4])
+    return features
+
+def scale_features(data, feature_scaler):
+    """
+    Encode and scale a batch into the network's input matrix.
+    
+    Scalers reject zero-row input, so an empty batch returns an empty
+    matrix without reaching them; callers skip the model for it.
+    
+    Args:
+        data: Single input dict, DataFrame or dict of column arrays (see build_features)
+        feature_scaler: Fitted feature scaler, or a FeatureTransform
+    
+    Returns:
+        np.array: Scaled features of shape (n_rows, 5)
+    """
+    if batch_length(data) == 0:
+        return np.empty((0, 5), dtype=np.float64)
+    if _is_transform(feature_scaler):
+        return feature_scaler(data)
+    if isinstance(data, dict):
+        data = {key: np.atleast_1d(value) for key, value in data.items()}
+    with stage('build_features'):
+        features = build_features(data)
+    with stage('feature_scale'):
+        return feature_scaler.transform(features)
+
+def predict_batch(data, model, feature_scaler, target_scaler, batch_size=4096):
+    """
+    Predict revenue for a whole batch of inputs in one scaled forward pass.
+    
+    Args:
+        data: DataFrame or dict of column arrays (see build_features)
+        model: Loaded model exposing ``predict``
+        feature_scaler: Fitted feature scaler, or a FeatureTransform that
+            encodes and scales the raw columns in one pass
+        target_scaler: Fitted target scaler
+        batch_size (int): Rows per model forward step
+    
+    Returns:
+        np.array: Predictions in original scale, one per input row
+    """
+    scaled = scale_features(data, feature_scaler)
+    if not len(scaled):
+        return np.empty(0, dtype=np.float64)
+    
+    with stage('model_predict_batch'):
+        scaled_predictions = model.predict(scaled, batch_size=batch_size, verbose=0)
+    with stage('inverse_scale_batch'):
+        scaled_predictions = np.asarray(scaled_predictions, dtype=np.float64).reshape(-1, 1)
+        return target_scaler.inverse_transform(scaled_predictions).ravel()
+
+def predict_grid(franchise, category, menu_sizes, orders, model, feature_scaler, target_scaler):
+    """
+    Revenue over every menu size x order level for one franchise and category.
+    
+    The grid is flattened into a single batch, so the whole response surface
+    costs one vectorized ``predict_batch`` call.
+    
+    Args:
+        franchise: Franchise status (label or code)
+        category (str): Cuisine category
+        menu_sizes: Menu item counts (grid rows)
+        orders: Order levels (grid columns)
+        model, feature_scaler, target_scaler: Loaded assets
+    
+    Returns:
+        np.array: Predictions of shape (len(menu_sizes), len(orders))
+    """
+    menu_sizes = np.asarray(menu_sizes)
+    orders = np.asarray(orders)
+    n_points = len(menu_sizes) * len(orders)
+    data = {
+        'franchise': np.full(n_points, franchise),
+        'category': np.full(n_points, category),
+        'menu_size': np.repeat(menu_sizes, len(orders)),
+        'orders': np.tile(orders, len(menu_sizes)),
+    }
+    predictions = predict_batch(data, model, feature_scaler, target_scaler, batch_size=16384)
+    return predictions.reshape(len(menu_sizes), len(orders))
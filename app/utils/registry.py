@@ -0,0 +1,276 @@
+"""
+Versioned model registry with an atomic ``CURRENT`` pointer.
+
+Layout under the model directory (``models/`` by default)::
+
+    models/
+        CURRENT                         id of the version being served
+        versions/
+            20261018T080000-1a2b3c4d/
+                metadata.json           created, source, metrics, file digests
+                neural_network_model.keras
+                feature_scaler.pkl
+                target_scaler.pkl
+                feature_transform.npz
+                neural_network_model.npz
+                neural_network_model.tflite       (optional, src/export_tflite.py)
+                feature_importance.json           (optional, src/importance.py)
+                engine/                 NumPy engine as .npy files (memory-mapped)
+
+A version directory is complete before it is renamed into place, and
+``CURRENT`` is swapped with ``os.replace``, so readers see either the old or
+the new version, never a mix of files. ``LiveModel`` polls the pointer from a
+background thread, loads a new version off the request path and swaps it in
+with a single reference assignment; predictions already running keep the
+assets they started with.
+
+Usage (from the repository root):
+    python -m app.utils.registry publish models/
+    python -m app.utils.registry list
+    python -m app.utils.registry activate 20261018T080000-1a2b3c4d
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+VERSIONS_DIR = 'versions'
+POINTER = 'CURRENT'
+METADATA = 'metadata.json'
+
+# Files copied from a training output directory into a version (when present)
+PUBLISHED_FILES = (
+    'neural_network_model.keras',
+    'feature_scaler.pkl',
+    'target_scaler.pkl',
+    'feature_transform.npz',
+    'neural_network_model.npz',
+    'neural_network_model.tflite',
+    'feature_importance.json',
+    'training_metrics.json',
+)
+
+def version_dir(version, model_dir='models'):
+    """Directory of registry ``version``."""
+    return os.path.join(model_dir, VERSIONS_DIR, version)
+
+def current_version(model_dir='models'):
+    """Version named by the ``CURRENT`` pointer, or None when there is no registry."""
+    try:
+        with open(os.path.join(model_dir, POINTER)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def list_versions(model_dir='models'):
+    """Published version ids, oldest first."""
+    root = os.path.join(model_dir, VERSIONS_DIR)
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root)
+                  if os.path.exists(os.path.join(root, name, METADATA)))
+
+def read_metadata(version, model_dir='models'):
+    with open(os.path.join(version_dir(version, model_dir), METADATA)) as f:
+        return json.load(f)
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _write_atomic(path, text):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def activate(version, model_dir='models'):
+    """Point ``CURRENT`` at ``version`` (atomic; serving processes pick it up on their next poll)."""
+    if version not in list_versions(model_dir):
+        raise ValueError(f"Unknown model version '{version}' in {model_dir}")
+    _write_atomic(os.path.join(model_dir, POINTER), version + '\n')
+
+def _find_version(files, content, model_dir):
+    """Newest published version holding exactly ``files`` (name -> digest), or None."""
+    for version in reversed(list_versions(model_dir)):
+        if version.endswith('-' + content[:8]) and read_metadata(version, model_dir).get('files') == files:
+            return version
+    return None
+
+def publish(source_dir, model_dir='models', metadata=None, make_current=True):
+    """
+    Snapshot the artifacts in ``source_dir`` as a new registry version.
+
+    Args:
+        source_dir (str): Directory with the flat training outputs
+        model_dir (str): Registry root
+        metadata (dict): Extra fields stored in metadata.json (training_metrics.json,
+            when present, is stored under 'metrics')
+        make_current (bool): Point ``CURRENT`` at the new version
+
+    Returns:
+        str: The version id (timestamp plus a digest of the artifact contents).
+        Artifacts identical to an already published version reuse that version.
+    """
+    files = {name: _file_digest(os.path.join(source_dir, name))
+             for name in PUBLISHED_FILES if os.path.exists(os.path.join(source_dir, name))}
+    if 'neural_network_model.keras' not in files and 'neural_network_model.npz' not in files:
+        raise FileNotFoundError(f"No model artifacts to publish in {source_dir}")
+    content = hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()
+    existing = _find_version(files, content, model_dir)
+    if existing:
+        if make_current:
+            activate(existing, model_dir)
+        return existing
+    version = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{content[:8]}"
+
+    target = version_dir(version, model_dir)
+    building = f'{target}.{os.getpid()}.building'
+    shutil.rmtree(building, ignore_errors=True)
+    os.makedirs(building)
+    for name in files:
+        shutil.copy2(os.path.join(source_dir, name), os.path.join(building, name))
+    if 'neural_network_model.npz' in files:
+        from .numpy_engine import NumpyModel
+        NumpyModel.load(os.path.join(building, 'neural_network_model.npz')).save_dir(os.path.join(building, 'engine'))
+
+    metrics = {}
+    if 'training_metrics.json' in files:
+        with open(os.path.join(source_dir, 'training_metrics.json')) as f:
+            metrics = json.load(f)
+    record = dict(metadata or {}, version=version, created=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                  source=os.path.abspath(source_dir), metrics=metrics, files=files)
+    with open(os.path.join(building, METADATA), 'w') as f:
+        json.dump(record, f, indent=2)
+    try:
+        os.replace(building, target)
+    except OSError:
+        # A concurrent publish of the same artifacts in the same second won the rename
+        shutil.rmtree(building, ignore_errors=True)
+        if _find_version(files, content, model_dir) != version:
+            raise
+
+    if make_current:
+        activate(version, model_dir)
+    return version
+
+class LiveModel:
+    """
+    The currently published model, reloaded in the background when it changes.
+
+    ``current()`` returns a ``(version, (model, feature_scaler, target_scaler))``
+    tuple that is replaced as a whole, so a caller that grabbed it keeps a
+    consistent set even if a swap happens mid-prediction.
+
+    Args:
+        backend (str): 'keras', 'numpy' or 'tflite' (defaults to REVENUE_MODEL_BACKEND)
+        model_dir (str): Registry root or flat model directory
+        poll_interval (float): Seconds between checks of the pointer
+    """
+
+    def __init__(self, backend=None, model_dir=None, poll_interval=2.0):
+        from .loader import DEFAULT_BACKEND, MODEL_DIR
+        self.backend = backend or DEFAULT_BACKEND
+        self.model_dir = model_dir or MODEL_DIR
+        self.poll_interval = poll_interval
+        self.swaps = 0
+        self.reload_errors = 0
+        self.last_error = None
+        self._state = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.reload()
+
+    def current(self):
+        return self._state
+
+    @property
+    def version(self):
+        return self._state[0]
+
+    @property
+    def assets(self):
+        return self._state[1]
+
+    def reload(self):
+        """Load and swap in the published version if it changed; True when swapped."""
+        from .loader import load_assets, resolve_artifacts
+        with self._reload_lock:
+            version, directory = resolve_artifacts(self.backend, self.model_dir)
+            if self._state is not None and version == self._state[0]:
+                return False
+            assets = load_assets(self.backend, directory)
+            swapped = self._state is not None
+            self._state = (version, assets)
+            self.swaps += swapped
+            return True
+
+    def start(self):
+        """Start polling for new versions on a daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name='model-watch', daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.reload()
+            except Exception as exc:  # Keep serving the previous version; retry on the next poll
+                self.reload_errors += 1
+                self.last_error = f'{type(exc).__name__}: {exc}'
+
+    def stats(self):
+        return {
+            'model_version': self.version,
+            'model_swaps': self.swaps,
+            'model_reload_errors': self.reload_errors,
+            'model_last_error': self.last_error,
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-dir', default='models', help='registry root')
+    commands = parser.add_subparsers(dest='command', required=True)
+    publish_parser = commands.add_parser('publish', help='snapshot flat artifacts as a new version')
+    publish_parser.add_argument('source_dir')
+    publish_parser.add_argument('--no-activate', action='store_true', help='publish without moving CURRENT')
+    activate_parser = commands.add_parser('activate', help='point CURRENT at a version (also used to roll back)')
+    activate_parser.add_argument('version')
+    commands.add_parser('list', help='list versions')
+    args = parser.parse_args(argv)
+
+    if args.command == 'publish':
+        version = publish(args.source_dir, args.model_dir, make_current=not args.no_activate)
+        print(f"Published {version}{'' if args.no_activate else ' (current)'}")
+    elif args.command == 'activate':
+        activate(args.version, args.model_dir)
+        print(f"{args.version} is now current")
+    else:
+        current = current_version(args.model_dir)
+        for version in list_versions(args.model_dir):
+            metadata = read_metadata(version, args.model_dir)
+            mae = metadata['metrics'].get('mae')
+            print(f"{'*' if version == current else ' '} {version}  {metadata['created']}"
+                  + (f"  MAE {mae:,.0f}" if mae is not None else ''))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Per-segment model zoo with a global fallback.
+
+``src/train_segments.py`` writes one NumPy engine per segment (for example
+per City) under ``<model dir>/segments/`` with a manifest::
+
+    segments/
+        manifest.json       segment columns, vocabulary and per-segment metrics
+        Bengaluru.npz
+        Mumbai.npz
+
+``SegmentRouter`` groups a batch by segment, runs each segment's model once
+over its rows, and sends rows of unknown or too-sparse segments to the
+global model. Segment engines are loaded on demand and kept in a bounded
+LRU, so memory stays flat however many segments the zoo holds.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .metrics import stage
+
+SEGMENTS_DIR = 'segments'
+MANIFEST = 'manifest.json'
+
+# Input column names accepted for each segment column
+SEGMENT_ALIASES = {
+    'City': ('city', 'City'),
+    'Category': ('category', 'Category'),
+    'Franchise': ('franchise', 'Franchise'),
+}
+
+def segment_key(values):
+    """Manifest key of one segment, e.g. ('Pune',) -> 'Pune' and ('Pune', 'Pizza') -> 'Pune|Pizza'."""
+    return '|'.join(str(value) for value in values)
+
+def segment_filename(key):
+    """Filesystem-safe engine file name for a segment key."""
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', key) + '.npz'
+
+def segment_keys(data, columns):
+    """
+    Segment key per input row.
+
+    Rows of a batch without one of the segment columns get '' (the fallback).
+    """
+    keys = None
+    for column in columns:
+        values = next((np.atleast_1d(np.asarray(data[name])).astype(str)
+                       for name in SEGMENT_ALIASES.get(column, (column,)) if name in data), None)
+        if values is None:
+            return None
+        keys = values if keys is None else np.char.add(np.char.add(keys, '|'), values)
+    return keys
+
+class SegmentRouter:
+    """
+    Route each row to its segment's model; unknown segments use the global model.
+
+    Args:
+        zoo_dir (str): Directory with manifest.json and the segment engines
+        fallback: (model, feature_scaler, target_scaler) of the global model
+        transform: FeatureTransform used to build raw features for every row
+        max_resident (int): Segment engines kept in memory at once
+    """
+
+    def __init__(self, zoo_dir, fallback, transform, max_resident=16):
+        with open(os.path.join(zoo_dir, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        self.zoo_dir = zoo_dir
+        self.columns = self.manifest['segment_by']
+        self.segments = self.manifest['segments']
+        self.fallback = fallback
+        self.transform = transform.unscaled()
+        self.max_resident = max_resident
+        self._resident = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+        self.fallback_rows = 0
+
+    def _engine(self, key):
+        """Segment engine from the LRU, loading (and evicting the coldest) on a miss."""
+        with self._lock:
+            engine = self._resident.get(key)
+            if engine is not None:
+                self._resident.move_to_end(key)
+                self.hits += 1
+                return engine
+
+        from .numpy_engine import NumpyModel
+        engine = NumpyModel.load(os.path.join(self.zoo_dir, self.segments[key]['file']))
+        with self._lock:
+            self.loads += 1
+            self._resident[key] = engine
+            self._resident.move_to_end(key)
+            while len(self._resident) > self.max_resident:
+                self._resident.popitem(last=False)
+                self.evictions += 1
+        return engine
+
+    def _predict_fallback(self, features):
+        model, feature_scaler, target_scaler = self.fallback
+        scaled = model.predict(feature_scaler.transform(features), verbose=0)
+        return target_scaler.inverse_transform(np.asarray(scaled, dtype=np.float64).reshape(-1, 1)).ravel()
+
+    def predict_batch(self, data):
+        """
+        Predict revenue for a batch, one vectorized pass per segment present.
+
+        Args:
+            data: DataFrame or dict of columns (see build_features), plus the
+                segment columns (e.g. 'city' / 'City')
+
+        Returns:
+            np.array: Predictions in original scale, one per input row
+        """
+        with stage('segment_features'):
+            features = self.transform.features(data)
+            keys = segment_keys(data, self.columns)
+        predictions = np.empty(len(features), dtype=np.float64)
+        if keys is None:
+            keys = np.full(len(features), '')
+
+        uniques, inverse = np.unique(keys, return_inverse=True)
+        fallback_rows = []
+        with stage('segment_predict'):
+            for index, key in enumerate(uniques):
+                rows = np.flatnonzero(inverse == index)
+                if key in self.segments:
+                    predictions[rows] = self._engine(key).predict(features[rows]).ravel()
+                else:
+                    fallback_rows.append(rows)
+            if fallback_rows:
+                rows = np.concatenate(fallback_rows)
+                predictions[rows] = self._predict_fallback(features[rows])
+                self.fallback_rows += len(rows)
+        return predictions
+
+    def stats(self):
+        with self._lock:
+            return {
+                'segments': len(self.segments),
+                'resident': len(self._resident),
+                'max_resident': self.max_resident,
+                'hits': self.hits,
+                'loads': self.loads,
+                'evictions': self.evictions,
+                'fallback_rows': self.fallback_rows,
+            }
+
+def load_router(backend=None, directory=None, max_resident=16, assets=None):
+    """
+    Router over the zoo next to the served model, with that model as fallback.
+
+    Args:
+        backend (str): Backend of the global (fallback) model
+        directory (str): Artifact directory (defaults to the served one)
+        max_resident (int): Segment engines kept in memory at once
+        assets: Already loaded (model, feature_scaler, target_scaler) of the
+            global model, e.g. a LiveModel's, to avoid loading it twice
+
+    Returns:
+        SegmentRouter, or None when no segment zoo has been trained
+    """
+    from .loader import FEATURE_TRANSFORM_FILE, load_assets, load_feature_transform, resolve_artifacts
+    directory = directory or resolve_artifacts(backend)[1]
+    zoo_dir = os.path.join(directory, SEGMENTS_DIR)
+    if not os.path.exists(os.path.join(zoo_dir, MANIFEST)):
+        return None
+    transform = load_feature_transform(os.path.join(directory, FEATURE_TRANSFORM_FILE))
+    return SegmentRouter(zoo_dir, assets or load_assets(backend, directory), transform, max_resident)
@@ -0,0 +1,117 @@
+"""
+Cold-start report for a serving process.
+
+Run in a fresh interpreter so nothing is already imported:
+
+    python -m app.utils.startup --backend numpy --json
+    python -m app.utils.startup --backend keras --budget 5
+
+Phases are timed separately: import (app.utils serving helpers plus the
+backend runtime), model load (model and scalers from disk, plus the Keras
+warm-up) and first predict (one single-row prediction), followed by a
+steady-state predict for comparison. For Keras the warm-up's own trace,
+first-call and steady-state timings are reported too: the first predict
+should cost about the same as the steady one because the first call was
+already paid during load.
+"""
+
+import argparse
+import importlib
+import json
+import resource
+import sys
+import time
+
+# Runtime module each backend needs before its model can be loaded
+BACKEND_MODULES = {
+    'keras': 'tensorflow',
+    'numpy': 'app.utils.numpy_engine',
+    'tflite': 'app.utils.tflite_engine',
+}
+
+# Heavy dependencies worth reporting when they end up imported
+HEAVY_MODULES = ('tensorflow', 'keras', 'joblib', 'sklearn', 'pandas', 'plotly')
+
+# Category is filled in with the first label the loaded feature encoder knows
+SAMPLE_INPUT = {'franchise': 1, 'menu_size': 25, 'orders': 4}
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def measure_cold_start(backend=None):
+    """
+    Time the import, model load and first predict phases in this process.
+    
+    Args:
+        backend (str): 'keras', 'numpy' or 'tflite' (defaults to REVENUE_MODEL_BACKEND)
+    
+    Returns:
+        dict: Seconds per phase, total, peak RSS and heavy modules imported
+    """
+    def import_phase():
+        from app.utils import load_assets, preprocess_input, inverse_scale_prediction, loader
+        importlib.import_module(BACKEND_MODULES[backend or loader.DEFAULT_BACKEND])
+        return load_assets, preprocess_input, inverse_scale_prediction, loader
+
+    (load_assets, preprocess_input, inverse_scale_prediction, loader), import_seconds = _timed(import_phase)
+    backend = backend or loader.DEFAULT_BACKEND
+
+    (model, feature_scaler, target_scaler), load_seconds = _timed(lambda: load_assets(backend))
+
+    from app.utils.predictor import category_options
+    sample = dict(SAMPLE_INPUT, category=category_options(feature_scaler)[0])
+
+    def predict_once():
+        processed = preprocess_input(sample, feature_scaler)
+        return inverse_scale_prediction(model.predict(processed, verbose=0), target_scaler)
+
+    _, first_predict_seconds = _timed(predict_once)
+    _, steady_predict_seconds = _timed(predict_once)
+
+    return {
+        'backend': backend,
+        'import_s': import_seconds,
+        'model_load_s': load_seconds,
+        'first_predict_s': first_predict_seconds,
+        'steady_predict_s': steady_predict_seconds,
+        'total_s': import_seconds + load_seconds + first_predict_seconds,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'heavy_modules': [name for name in HEAVY_MODULES if name in sys.modules],
+        'warmup': getattr(model, 'warmup_report', None),
+    }
+
+def format_report(report):
+    """Render a cold-start report as a small text table."""
+    lines = [f"Cold start ({report['backend']} backend)"]
+    for label, key in [('import', 'import_s'), ('model load', 'model_load_s'),
+                       ('first predict', 'first_predict_s'), ('total', 'total_s'),
+                       ('steady predict', 'steady_predict_s')]:
+        lines.append(f"  {label:<15} {report[key] * 1000:10.1f} ms")
+    if report.get('warmup'):
+        warmup = report['warmup']
+        lines.append(f"  warm-up (during model load, buckets {warmup['buckets']})")
+        for label, key in [('trace', 'trace_s'), ('first call', 'first_call_s'), ('steady call', 'steady_call_s')]:
+            lines.append(f"    {label:<13} {warmup[key] * 1000:10.1f} ms")
+    lines.append(f"  {'peak RSS':<15} {report['peak_rss_mb']:10.1f} MB")
+    lines.append(f"  {'imported':<15} {', '.join(report['heavy_modules']) or '-'}")
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=sorted(BACKEND_MODULES))
+    parser.add_argument('--json', action='store_true', help='print the report as one JSON line')
+    parser.add_argument('--budget', type=float, help='fail if total cold start exceeds this many seconds')
+    args = parser.parse_args(argv)
+
+    report = measure_cold_start(args.backend)
+    print(json.dumps(report) if args.json else format_report(report))
+
+    if args.budget is not None and report['total_s'] > args.budget:
+        print(f"Cold start {report['total_s']:.2f}s exceeds budget {args.budget:.2f}s", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
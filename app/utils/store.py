@@ -0,0 +1,335 @@
+"""
+Persistent prediction store (SQLite in WAL mode).
+
+Every prediction the apps and services make can be appended here with its
+inputs, output, model version and timestamp. Writes never happen on the
+request path: ``record`` / ``record_batch`` put rows on a bounded queue and
+a writer thread bulk-inserts them, one transaction per flush. WAL mode lets
+dashboards read while the writer appends.
+
+Besides the raw ``predictions`` table (indexed on category, city,
+franchise and time) each flush folds its rows into ``prediction_rollup``,
+hourly count/sum/min/max per category, city, franchise and model version.
+Dashboard aggregates read the rollup, so they cost the same whether the
+store holds thousands or millions of predictions.
+"""
+
+import contextlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from .predictor import COLUMN_ALIASES, FRANCHISE_MAP
+
+PREDICTION_DB = os.environ.get('REVENUE_PREDICTION_DB', 'data/predictions.sqlite3')
+
+# Width of one rollup bucket in seconds
+ROLLUP_SECONDS = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    source TEXT NOT NULL,
+    model_version TEXT,
+    franchise INTEGER,
+    category TEXT,
+    city TEXT,
+    menu_size REAL,
+    orders REAL,
+    prediction REAL NOT NULL,
+    lower REAL,
+    upper REAL
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_ts ON predictions (ts);
+CREATE INDEX IF NOT EXISTS idx_predictions_category ON predictions (category, ts);
+CREATE INDEX IF NOT EXISTS idx_predictions_city ON predictions (city, ts);
+CREATE INDEX IF NOT EXISTS idx_predictions_franchise ON predictions (franchise, ts);
+CREATE TABLE IF NOT EXISTS prediction_rollup (
+    bucket INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    city TEXT NOT NULL,
+    franchise INTEGER NOT NULL,
+    model_version TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    total REAL NOT NULL,
+    minimum REAL NOT NULL,
+    maximum REAL NOT NULL,
+    PRIMARY KEY (bucket, category, city, franchise, model_version)
+) WITHOUT ROWID;
+"""
+
+INSERT = """
+INSERT INTO predictions (ts, source, model_version, franchise, category, city, menu_size, orders,
+                         prediction, lower, upper)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPSERT_ROLLUP = """
+INSERT INTO prediction_rollup (bucket, category, city, franchise, model_version, n, total, minimum, maximum)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (bucket, category, city, franchise, model_version) DO UPDATE SET
+    n = n + excluded.n,
+    total = total + excluded.total,
+    minimum = min(minimum, excluded.minimum),
+    maximum = max(maximum, excluded.maximum)
+"""
+
+# Rollup columns that summaries and filters may use
+ROLLUP_DIMENSIONS = ('category', 'city', 'franchise', 'model_version')
+
+def connect(path, readonly=False):
+    """SQLite connection tuned for one writer and many concurrent readers."""
+    connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.execute('PRAGMA busy_timeout=30000')
+    if readonly:
+        connection.execute('PRAGMA query_only=ON')
+    return connection
+
+def _franchise_code(value):
+    if isinstance(value, str):
+        return FRANCHISE_MAP.get(value.strip(), None)
+    return None if value is None else int(value)
+
+def _values(data, key, n_rows):
+    """Batch column by form key or dataset name, or None per row when absent."""
+    for name in COLUMN_ALIASES.get(key, (key, key.capitalize())):
+        if name in data:
+            return np.asarray(data[name]).tolist()
+    return [None] * n_rows
+
+def _where(filters, since=None):
+    clauses, params = [], []
+    for column, value in filters.items():
+        if value is None:
+            continue
+        if column not in ROLLUP_DIMENSIONS:
+            raise ValueError(f"Cannot filter on '{column}' (one of {ROLLUP_DIMENSIONS})")
+        clauses.append(f'{column} = ?')
+        params.append(_franchise_code(value) if column == 'franchise' else value)
+    if since is not None:
+        clauses.append('bucket >= ?')
+        params.append(int(since // ROLLUP_SECONDS) * ROLLUP_SECONDS)
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+class PredictionStore:
+    """
+    Append-only prediction log with a background bulk writer.
+
+    Args:
+        path (str): SQLite database file (created with its schema if missing)
+        flush_rows (int): Rows that trigger a flush
+        flush_interval (float): Longest a queued row waits before being written
+        max_queued (int): Rows waiting to be written before new predictions
+            are dropped instead of blocking the caller
+    """
+
+    def __init__(self, path=PREDICTION_DB, flush_rows=5000, flush_interval=0.5, max_queued=1000000):
+        self.path = path
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        self.written = 0
+        self.flushes = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self.last_error = None
+        self._queue = queue.Queue()
+        self._queued_rows = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with contextlib.closing(connect(path)) as connection:
+            connection.executescript(SCHEMA)
+        self._thread = threading.Thread(target=self._write_loop, name='prediction-store', daemon=True)
+        self._thread.start()
+
+    def record(self, inputs, prediction, model_version=None, source='app', lower=None, upper=None):
+        """
+        Queue one prediction; returns False if it had to be dropped.
+
+        Args:
+            inputs (dict): Prediction inputs (franchise, category, menu_size,
+                orders, optionally city)
+            prediction (float): Predicted revenue
+            model_version (str): Version of the model that made it
+            source (str): Which app or service made it
+            lower, upper (float): Optional prediction interval
+        """
+        row = (time.time(), source, model_version, _franchise_code(inputs.get('franchise')),
+               inputs.get('category'), inputs.get('city'), inputs.get('menu_size'), inputs.get('orders'),
+               float(prediction), None if lower is None else float(lower), None if upper is None else float(upper))
+        return self._put([row])
+
+    def record_batch(self, data, predictions, model_version=None, source='batch', lower=None, upper=None):
+        """
+        Queue a batch of predictions as one record.
+
+        Args:
+            data: DataFrame or dict of column arrays (see build_features),
+                optionally with a 'city' / 'City' column
+            predictions: Predicted revenue per row
+            lower, upper: Optional interval bounds per row
+        """
+        predictions = np.asarray(predictions, dtype=np.float64).ravel().tolist()
+        n_rows = len(predictions)
+        now = time.time()
+        franchise = [_franchise_code(value) for value in _values(data, 'franchise', n_rows)]
+        lower = [None] * n_rows if lower is None else np.asarray(lower, dtype=np.float64).tolist()
+        upper = [None] * n_rows if upper is None else np.asarray(upper, dtype=np.float64).tolist()
+        rows = list(zip([now] * n_rows, [source] * n_rows, [model_version] * n_rows, franchise,
+                        _values(data, 'category', n_rows), _values(data, 'city', n_rows),
+                        _values(data, 'menu_size', n_rows), _values(data, 'orders', n_rows),
+                        predictions, lower, upper))
+        return self._put(rows)
+
+    def _put(self, rows):
+        with self._lock:
+            if self._queued_rows + len(rows) > self.max_queued:
+                self.dropped += len(rows)
+                return False
+            self._queued_rows += len(rows)
+        self._queue.put(rows)
+        return True
+
+    def _write_loop(self):
+        connection = connect(self.path)
+        while True:
+            batches = [self._queue.get()]
+            pending = len(batches[0])
+            deadline = time.monotonic() + self.flush_interval
+            while pending < self.flush_rows:
+                try:
+                    batches.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+                pending += len(batches[-1])
+            try:
+                self._write(connection, [row for batch in batches for row in batch])
+            except Exception as exc:  # Keep the writer alive (flush() waits on it); the rows of this flush are lost
+                self.write_errors += 1
+                self.last_error = f'{type(exc).__name__}: {exc}'
+            finally:
+                with self._lock:
+                    self._queued_rows -= pending
+                for _ in batches:
+                    self._queue.task_done()
+
+    def _write(self, connection, rows):
+        rollup = {}
+        for row in rows:
+            key = (int(row[0] // ROLLUP_SECONDS) * ROLLUP_SECONDS, row[4] or '', row[5] or '',
+                   -1 if row[3] is None else row[3], row[2] or '')
+            value = row[8]
+            entry = rollup.get(key)
+            if entry is None:
+                rollup[key] = [1, value, value, value]
+            else:
+                entry[0] += 1
+                entry[1] += value
+                entry[2] = min(entry[2], value)
+                entry[3] = max(entry[3], value)
+        connection.execute('BEGIN')
+        try:
+            connection.executemany(INSERT, rows)
+            connection.executemany(UPSERT_ROLLUP, [key + tuple(entry) for key, entry in rollup.items()])
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        self.written += len(rows)
+        self.flushes += 1
+
+    def flush(self):
+        """Block until every queued prediction has been written."""
+        self._queue.join()
+
+    def trend(self, freq='hour', since=None, **filters):
+        """
+        Prediction count and mean revenue per hour or day, from the rollup.
+
+        Args:
+            freq (str): 'hour' or 'day'
+            since (float): Only buckets from this Unix time on
+            **filters: Equality filters on category, city, franchise or model_version
+
+        Returns:
+            pd.DataFrame: 'time' (datetime64), 'predictions' and 'mean_revenue', sorted by time
+        """
+        import pandas as pd
+        width = {'hour': ROLLUP_SECONDS, 'day': 86400}[freq]
+        where, params = _where(filters, since)
+        with contextlib.closing(connect(self.path, readonly=True)) as connection:
+            rows = connection.execute(
+                f'SELECT bucket / {width} * {width} AS t, SUM(n), SUM(total) / SUM(n) '
+                f'FROM prediction_rollup{where} GROUP BY t ORDER BY t', params).fetchall()
+        frame = pd.DataFrame(rows, columns=['time', 'predictions', 'mean_revenue'])
+        frame['time'] = pd.to_datetime(frame['time'], unit='s')
+        return frame
+
+    def summary(self, by='category', since=None, **filters):
+        """
+        Prediction count and mean/min/max revenue per category, city, franchise or model version.
+
+        Returns:
+            pd.DataFrame: One row per group, largest count first
+        """
+        import pandas as pd
+        if by not in ROLLUP_DIMENSIONS:
+            raise ValueError(f"Cannot group by '{by}' (one of {ROLLUP_DIMENSIONS})")
+        where, params = _where(filters, since)
+        with contextlib.closing(connect(self.path, readonly=True)) as connection:
+            rows = connection.execute(
+                f'SELECT {by}, SUM(n) AS predictions, SUM(total) / SUM(n), MIN(minimum), MAX(maximum) '
+                f'FROM prediction_rollup{where} GROUP BY {by} ORDER BY predictions DESC', params).fetchall()
+        return pd.DataFrame(rows, columns=[by, 'predictions', 'mean_revenue', 'min_revenue', 'max_revenue'])
+
+    def history(self, limit=1000, since=None, **filters):
+        """
+        Most recent raw predictions, newest first, using the per-column time indexes.
+
+        Returns:
+            pd.DataFrame: The stored columns of up to ``limit`` predictions
+        """
+        import pandas as pd
+        where, params = _where(filters)
+        if since is not None:
+            where += (' AND' if where else ' WHERE') + ' ts >= ?'
+            params.append(since)
+        with contextlib.closing(connect(self.path, readonly=True)) as connection:
+            return pd.read_sql_query(f'SELECT * FROM predictions{where} ORDER BY ts DESC LIMIT ?',
+                                     connection, params=params + [limit])
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'written': self.written,
+            'flushes': self.flushes,
+            'queued': self._queued_rows,
+            'dropped': self.dropped,
+            'write_errors': self.write_errors,
+            'last_error': self.last_error,
+        }
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store(path=PREDICTION_DB):
+    """
+    The process-wide store for ``path``, created on first use.
+
+    Queued predictions are flushed when the interpreter exits.
+    """
+    with _stores_lock:
+        if path not in _stores:
+            import atexit
+            _stores[path] = store = PredictionStore(path)
+            atexit.register(store.flush)
+        return _stores[path]
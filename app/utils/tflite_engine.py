@@ -0,0 +1,82 @@
+import threading
+
+import numpy as np
+
+# Batches up to this size are padded to the next power of two, so a stream of
+# varying micro-batch sizes only ever resizes the interpreter a few times
+MAX_PADDED_ROWS = 4096
+
+def _interpreter_class():
+    """Smallest available TFLite interpreter: LiteRT, tflite-runtime, then TensorFlow's own."""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+    return Interpreter
+
+class TFLiteModel:
+    """
+    ``keras.Model.predict``-compatible wrapper around a TFLite interpreter.
+
+    The model takes scaled features and returns the scaled target, like the
+    Keras network it was converted from. Small batches are zero-padded to a
+    power-of-two length so the input tensor is rarely reallocated, and calls
+    are serialized because an interpreter is not thread-safe.
+
+    Args:
+        model_content (bytes): Serialized ``.tflite`` flatbuffer
+        num_threads (int): Interpreter threads (None for the runtime default)
+    """
+
+    def __init__(self, model_content, num_threads=None):
+        self.model_content = model_content
+        self._interpreter = _interpreter_class()(model_content=model_content, num_threads=num_threads)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._rows = int(self._input['shape'][0])
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path, num_threads=None):
+        with open(path, 'rb') as f:
+            return cls(f.read(), num_threads)
+
+    def _invoke(self, x):
+        n_rows = len(x)
+        rows = n_rows if n_rows > MAX_PADDED_ROWS else 1 << max(n_rows - 1, 0).bit_length()
+        if rows != self._rows:
+            self._interpreter.resize_tensor_input(self._input['index'], [rows, x.shape[1]])
+            self._interpreter.allocate_tensors()
+            self._rows = rows
+        if rows != n_rows:
+            padded = np.zeros((rows, x.shape[1]), dtype=np.float32)
+            padded[:n_rows] = x
+            x = padded
+        self._interpreter.set_tensor(self._input['index'], x)
+        self._interpreter.invoke()
+        return self._interpreter.get_tensor(self._output['index'])[:n_rows].copy()
+
+    def predict(self, x, batch_size=None, verbose=0):
+        """
+        Run the interpreter, mirroring ``keras.Model.predict``.
+
+        Args:
+            x: Scaled feature matrix of shape (n_rows, n_features)
+            batch_size (int): Rows per invocation (None for all at once)
+            verbose: Ignored; accepted for Keras compatibility
+
+        Returns:
+            np.array: Scaled predictions of shape (n_rows, 1)
+        """
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        with self._lock:
+            if batch_size is None or len(x) <= batch_size:
+                return self._invoke(x)
+            return np.concatenate([
+                self._invoke(x[start:start + batch_size])
+                for start in range(0, len(x), batch_size)
+            ])
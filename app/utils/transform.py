@@ -0,0 +1,119 @@
+import numpy as np
+
+from .metrics import timed
+
+FEATURE_NAMES = ['Franchise', 'Category', 'No_Of_Item', 'Order_Placed', 'Order_Item_Ratio']
+
+# Input column names accepted for each raw field (form keys or dataset names)
+INPUT_ALIASES = {
+    'Franchise': ('franchise', 'Franchise'),
+    'Category': ('category', 'Category'),
+    'No_Of_Item': ('menu_size', 'No_Of_Item'),
+    'Order_Placed': ('orders', 'Order_Placed'),
+}
+
+# UI labels that mean the same as a training label
+LABEL_ALIASES = {
+    'Franchise': {'Franchised': 'Yes', 'Independent': 'No'},
+}
+
+class FeatureTransform:
+    """
+    Training-time feature encoding, ratio derivation and scaling as one artifact.
+
+    Vocabularies are stored as sorted string arrays, so labels are encoded
+    with a vectorized ``np.searchsorted`` (the same codes as pandas
+    ``cat.codes`` at training time), ``Order_Item_Ratio`` is derived with the
+    training divide-by-zero guard, and scaling uses the fitted feature scaler's
+    coefficients. The object also exposes ``transform``/``inverse_transform``
+    so it can stand in for the feature scaler in the prediction helpers.
+
+    Args:
+        vocabularies (dict): Column name -> list of labels, in code order
+        mean: Per-feature scaler mean (zeros when scaling is folded elsewhere)
+        scale: Per-feature scaler scale (ones when scaling is folded elsewhere)
+    """
+
+    def __init__(self, vocabularies, mean, scale):
+        self.vocabularies = {column: np.asarray(labels, dtype=str) for column, labels in vocabularies.items()}
+        for column, labels in self.vocabularies.items():
+            if np.any(labels[1:] <= labels[:-1]):
+                raise ValueError(f"Vocabulary for {column} must be sorted and unique")
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+
+    @classmethod
+    def from_training(cls, vocabularies, feature_scaler):
+        """Build the artifact from training vocabularies and a fitted StandardScaler."""
+        return cls(vocabularies, feature_scaler.mean_, feature_scaler.scale_)
+
+    @classmethod
+    def load(cls, path):
+        """Load a transform written by ``save``."""
+        with np.load(path, allow_pickle=False) as data:
+            vocabularies = {key[len('vocab_'):]: data[key] for key in data.files if key.startswith('vocab_')}
+            return cls(vocabularies, data['mean'], data['scale'])
+
+    def save(self, path):
+        """Write vocabularies and scaler coefficients to a ``.npz`` file."""
+        arrays = {f'vocab_{column}': labels for column, labels in self.vocabularies.items()}
+        np.savez(path, mean=self.mean, scale=self.scale, feature_names=np.array(FEATURE_NAMES), **arrays)
+
+    def unscaled(self):
+        """Copy that encodes and derives features but leaves scaling to the model."""
+        return FeatureTransform(self.vocabularies, np.zeros_like(self.mean), np.ones_like(self.scale))
+
+    def encode(self, column, values):
+        """Map labels to training codes; numeric input is taken as codes already."""
+        values = np.asarray(values)
+        vocabulary = self.vocabularies[column]
+        if values.dtype.kind in 'biuf':
+            codes = values.astype(np.float64)
+            if codes.size and (codes.min() < 0 or codes.max() >= len(vocabulary)):
+                raise ValueError(f"{column} codes must be in [0, {len(vocabulary) - 1}]")
+            return codes
+
+        labels = values.astype(str)
+        for alias, label in LABEL_ALIASES.get(column, {}).items():
+            labels = np.where(labels == alias, label, labels)
+        codes = np.searchsorted(vocabulary, labels)
+        codes = np.minimum(codes, len(vocabulary) - 1)
+        unknown = vocabulary[codes] != labels
+        if unknown.any():
+            raise ValueError(f"Unknown {column} value(s): {sorted(set(labels[unknown].tolist()))}")
+        return codes.astype(np.float64)
+
+    @staticmethod
+    def _column(data, field):
+        for name in INPUT_ALIASES[field]:
+            if name in data:
+                return np.atleast_1d(np.asarray(data[name]))
+        raise KeyError(f"Missing input column '{INPUT_ALIASES[field][0]}' (accepted names: {INPUT_ALIASES[field]})")
+
+    def features(self, data):
+        """Raw (unscaled) feature matrix for a DataFrame, dict of columns or single input dict."""
+        menu_size = self._column(data, 'No_Of_Item').astype(np.float64)
+        orders = self._column(data, 'Order_Placed').astype(np.float64)
+
+        features = np.empty((len(orders), len(FEATURE_NAMES)), dtype=np.float64)
+        features[:, 0] = self.encode('Franchise', self._column(data, 'Franchise'))
+        features[:, 1] = self.encode('Category', self._column(data, 'Category'))
+        features[:, 2] = np.where(menu_size == 0, 1.0, menu_size)  # Prevent division by zero, as in training
+        features[:, 3] = orders
+        np.divide(orders, features[:, 2], out=features[:, 4])
+        return features
+
+    def transform(self, X):
+        """Scale an already-built feature matrix (StandardScaler-compatible)."""
+        return (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+
+    def inverse_transform(self, X):
+        return np.asarray(X, dtype=np.float64) * self.scale + self.mean
+
+    @timed('feature_transform')
+    def __call__(self, data):
+        """Encode, derive and scale raw inputs in one vectorized pass."""
+        features = self.features(data)
+        features -= self.mean
+        features /= self.scale
+        return features
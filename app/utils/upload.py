@@ -0,0 +1,216 @@
+"""
+Background scoring of uploaded outlet files (CSV or Excel) for the app.
+
+A ``ScoringJob`` reads the upload in fixed-size chunks, scores each chunk
+with one vectorized ``predict_batch`` call on a worker thread, and appends
+it to a temporary CSV on disk. The page only polls ``status()``: progress,
+a bounded preview of the first scored rows and running per-category
+totals. So the session stays responsive, and memory stays at a few chunks
+however many rows the file has.
+"""
+
+import itertools
+import os
+import tempfile
+import threading
+import time
+import weakref
+
+import numpy as np
+
+from .metrics import stage
+from .predictor import COLUMN_ALIASES, predict_batch
+
+# Same output column as src/batch_score.py
+PREDICTION_COLUMN = 'Predicted_Revenue'
+
+UPLOAD_CHUNK_ROWS = 20000
+PREVIEW_ROWS = 1000
+UPLOAD_TYPES = ('csv', 'xlsx')
+
+def _csv_chunks(file, chunk_size):
+    import pandas as pd
+    size = file.seek(0, os.SEEK_END) or 1
+    file.seek(0)
+    with pd.read_csv(file, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            yield chunk, min(file.tell() / size, 1.0)
+
+def _excel_chunks(file, chunk_size):
+    import pandas as pd
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("Excel uploads need openpyxl (pip install openpyxl)") from None
+    # Read-only mode streams rows instead of building the whole sheet in memory
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(cell) for cell in next(rows, ())]
+        total = max((sheet.max_row or 0) - 1, 1)
+        done = 0
+        while True:
+            block = list(itertools.islice(rows, chunk_size))
+            if not block:
+                break
+            done += len(block)
+            yield pd.DataFrame.from_records(block, columns=header), min(done / total, 1.0)
+    finally:
+        workbook.close()
+
+def iter_upload_chunks(file, name, chunk_size=UPLOAD_CHUNK_ROWS):
+    """
+    Parse an uploaded CSV or Excel file chunk by chunk.
+
+    Args:
+        file: Binary file object (e.g. Streamlit's UploadedFile)
+        name (str): File name; its extension picks the parser
+        chunk_size (int): Rows per chunk
+
+    Yields:
+        tuple: (DataFrame chunk, fraction of the file read so far)
+    """
+    extension = os.path.splitext(name)[1].lower().lstrip('.')
+    if extension == 'csv':
+        return _csv_chunks(file, chunk_size)
+    if extension == 'xlsx':
+        return _excel_chunks(file, chunk_size)
+    raise ValueError(f"Unsupported file type '.{extension}' (upload one of: {', '.join(UPLOAD_TYPES)})")
+
+def _remove(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+class ScoringJob:
+    """
+    Score an uploaded file on a background thread, one chunk at a time.
+
+    Args:
+        file: Binary file object of the upload
+        name (str): Upload file name (.csv or .xlsx)
+        assets: (model, feature_scaler, target_scaler) pinned for the whole job
+        model_version (str): Version of those assets
+        chunk_size (int): Rows scored per forward pass
+        store: Optional PredictionStore every scored chunk is recorded in
+    """
+
+    def __init__(self, file, name, assets, model_version, chunk_size=UPLOAD_CHUNK_ROWS, store=None):
+        self.file = file
+        self.name = name
+        self.assets = assets
+        self.model_version = model_version
+        self.chunk_size = chunk_size
+        self.store = store
+        fd, self.output_path = tempfile.mkstemp(prefix='scored_', suffix='.csv')
+        os.close(fd)
+        self._cleanup = weakref.finalize(self, _remove, self.output_path)
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread = None
+        self.state = 'pending'
+        self.error = None
+        self.rows = 0
+        self.chunks = 0
+        self.progress = 0.0
+        self.started = None
+        self.finished = None
+        self._preview = []
+        self._preview_rows = 0
+        self._totals = {}
+
+    @property
+    def running(self):
+        return self.state in ('pending', 'running')
+
+    @property
+    def download_name(self):
+        return os.path.splitext(self.name)[0] + '_scored.csv'
+
+    def start(self):
+        self.state = 'running'
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='upload-scoring', daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def close(self):
+        """Stop the job and delete its output file."""
+        self.cancel()
+        if self._thread is not None:
+            self._thread.join()
+        self._cleanup()
+
+    def _run(self):
+        model, feature_scaler, target_scaler = self.assets
+        try:
+            with open(self.output_path, 'w', newline='') as out:
+                for chunk, progress in iter_upload_chunks(self.file, self.name, self.chunk_size):
+                    if self._cancel.is_set():
+                        self.state = 'cancelled'
+                        break
+                    with stage('upload_chunk'):
+                        chunk[PREDICTION_COLUMN] = predict_batch(chunk, model, feature_scaler, target_scaler,
+                                                                 batch_size=8192)
+                    chunk.to_csv(out, header=self.chunks == 0, index=False)
+                    if self.store is not None:
+                        self.store.record_batch(chunk, chunk[PREDICTION_COLUMN].to_numpy(), self.model_version,
+                                                'app/main.py upload')
+                    self._update(chunk, progress)
+            if self.state == 'running':
+                self.state = 'done'
+        except Exception as exc:  # Shown on the page; the partial output is kept
+            self.error = f'{type(exc).__name__}: {exc}'
+            self.state = 'failed'
+        finally:
+            self.finished = time.perf_counter()
+
+    def _update(self, chunk, progress):
+        category = next(name for name in COLUMN_ALIASES['category'] if name in chunk)
+        groups = chunk.groupby(chunk[category].astype(str))[PREDICTION_COLUMN].agg(['count', 'sum'])
+        with self._lock:
+            if self._preview_rows < PREVIEW_ROWS:
+                head = chunk.head(PREVIEW_ROWS - self._preview_rows)
+                self._preview.append(head)
+                self._preview_rows += len(head)
+            for label, (count, total) in groups.iterrows():
+                entry = self._totals.setdefault(label, [0, 0.0])
+                entry[0] += int(count)
+                entry[1] += float(total)
+            self.rows += len(chunk)
+            self.chunks += 1
+            self.progress = progress
+
+    def status(self):
+        """
+        Snapshot of the job for the page.
+
+        Returns:
+            dict: 'state', 'rows', 'chunks', 'progress' (0-1), 'seconds',
+            'rows_per_second', 'error', 'preview' (the first scored rows)
+            and 'summary' (outlets and mean prediction per category)
+        """
+        import pandas as pd
+        with self._lock:
+            preview = pd.concat(self._preview, ignore_index=True) if self._preview else pd.DataFrame()
+            summary = pd.DataFrame(
+                [(label, count, total / count) for label, (count, total) in self._totals.items()],
+                columns=['Category', 'Outlets', 'Mean Predicted Revenue']
+            ).sort_values('Outlets', ascending=False, ignore_index=True)
+            rows, chunks, progress = self.rows, self.chunks, self.progress
+        end = self.finished or time.perf_counter()
+        seconds = end - self.started if self.started else 0.0
+        return {
+            'state': self.state,
+            'rows': rows,
+            'chunks': chunks,
+            'progress': 1.0 if self.state == 'done' else float(np.clip(progress, 0.0, 1.0)),
+            'seconds': seconds,
+            'rows_per_second': rows / seconds if seconds else 0.0,
+            'error': self.error,
+            'preview': preview,
+            'summary': summary,
+        }
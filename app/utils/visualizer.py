@@ -1,23 +1,205 @@
+import functools
+import os
+import threading
+
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
+
+from .metrics import timed
+
+TRAINING_DATA = os.environ.get('REVENUE_TRAINING_DATA', 'data/raw/revenue_prediction.csv')
+
+# Points sent to the browser for one time series; longer histories are downsampled
+MAX_TREND_POINTS = 1000
+
+def data_version(path):
+    """Cheap version stamp of a data file (path, size and modification time)."""
+    stat = os.stat(path)
+    return f'{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}'
+
+@functools.lru_cache(maxsize=8)
+def _aggregates(path, version):
+    import pandas as pd
+    df = pd.read_csv(path, usecols=['Category', 'City', 'Revenue'])
+    summary = lambda column: (df.groupby(column, observed=True)['Revenue']
+                              .agg(total='sum', mean='mean', outlets='count')
+                              .sort_values('total', ascending=False)
+                              .reset_index())
+    return {
+        'version': version,
+        'rows': len(df),
+        'by_category': summary('Category'),
+        'by_city': summary('City'),
+    }
+
+def revenue_aggregates(path=TRAINING_DATA):
+    """
+    Revenue totals, means and outlet counts by Category and by City.
+
+    Computed once per version of the data file and cached in-process, so a
+    rerun only pays for an ``os.stat``.
+
+    Returns:
+        dict: 'version', 'rows', and 'by_category' / 'by_city' DataFrames
+    """
+    return _aggregates(path, data_version(path))
+
+def memoize_figure(func):
+    """
+    Reuse a chart's figure while its data version is unchanged.
+
+    The first argument must carry a 'version' key (see revenue_aggregates);
+    the figure is keyed on that version plus the remaining arguments.
+    """
+    figures = {}
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def wrapper(data, *args, **kwargs):
+        key = (data['version'], args, tuple(sorted(kwargs.items())))
+        with lock:
+            if key in figures:
+                return figures[key]
+        figure = func(data, *args, **kwargs)
+        with lock:
+            figures.clear()  # Only the latest data version is worth keeping
+            figures[key] = figure
+        return figure
+    return wrapper
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling of a time series.
 
-def create_pie_chart():
-    """Create a pie chart for model accuracy."""
+    Keeps the first and last points and, from each of ``n_out - 2`` equal
+    buckets in between, the point forming the largest triangle with the
+    point kept from the previous bucket and the mean of the next bucket, so
+    peaks and dips survive while the point count drops.
+
+    Args:
+        x: Sorted x values (numeric or datetime64)
+        y: Values
+        n_out (int): Points to keep
+
+    Returns:
+        np.array: Indices of the kept points
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x)
+    x = (x.astype('datetime64[ns]').astype(np.int64) if x.dtype.kind == 'M' else x).astype(np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x, next_y = x[stop:next_stop].mean(), y[stop:next_stop].mean()
+        area = np.abs((x[previous] - next_x) * (y[start:stop] - y[previous])
+                      - (x[previous] - x[start:stop]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        kept[bucket + 1] = previous
+    return kept
+
+@timed('chart_pie')
+@memoize_figure
+def create_pie_chart(aggregates):
+    """Create a pie chart of revenue share by cuisine category."""
+    by_category = aggregates['by_category']
     return px.pie(
-        values=[85, 15],
-        names=['Model Accuracy', 'Error Margin'],
-        title='Prediction Accuracy Breakdown'
+        by_category,
+        values='total',
+        names='Category',
+        title=f"Revenue Share by Category ({aggregates['rows']:,} outlets)"
     )
 
-def create_trend_chart():
-    """Create a line chart for revenue trends."""
-    trend_data = {
-        'Month': ['Jan', 'Feb', 'Mar', 'Apr', 'May'],
-        'Revenue': [2.5, 2.8, 3.1, 2.9, 3.2]
-    }
-    return px.line(
-        trend_data,
-        x='Month',
-        y='Revenue',
-        title='Monthly Revenue Trend',
-        markers=True
-    )
\ No newline at end of file
+@timed('chart_city')
+@memoize_figure
+def create_city_chart(aggregates):
+    """Create a bar chart of average outlet revenue by city."""
+    return px.bar(
+        aggregates['by_city'].sort_values('mean', ascending=False),
+        x='City',
+        y='mean',
+        hover_data=['outlets'],
+        labels={'mean': 'Average Revenue (₹)', 'outlets': 'Outlets'},
+        title='Average Revenue by City'
+    )
+
+@timed('chart_importance')
+def create_importance_chart(report):
+    """Create a bar chart of permutation importance (held-out MAE increase per feature)."""
+    importance = report['importance'][::-1]  # Largest at the top
+    fig = go.Figure(go.Bar(
+        x=[item['mae_increase'] for item in importance],
+        y=[item['feature'] for item in importance],
+        error_x={'type': 'data', 'array': [item['mae_increase_std'] for item in importance]},
+        orientation='h',
+        hovertemplate='%{y}: MAE +₹ %{x:,.0f}<extra></extra>'
+    ))
+    fig.update_layout(title='Revenue Drivers (Permutation Importance)',
+                      xaxis_title='Held-out MAE increase when shuffled (₹)')
+    return fig
+
+@timed('chart_trend')
+def create_trend_chart(timestamps, revenue, max_points=MAX_TREND_POINTS, title='Revenue Trend', weights=None):
+    """
+    Create a line chart of a revenue history with its monthly mean.
+
+    The raw series is reduced to at most ``max_points`` with LTTB before it
+    is handed to Plotly, so the payload stays small however long the
+    history grows.
+
+    Args:
+        timestamps: Sorted datetime64 values
+        revenue: Revenue per timestamp
+        max_points (int): Largest number of raw points to draw
+        title (str): Chart title
+        weights: Optional row count behind each point (e.g. when ``revenue``
+            holds hourly means), used to weight the monthly mean
+    """
+    import pandas as pd
+    timestamps = np.asarray(timestamps, dtype='datetime64[ns]')
+    revenue = np.asarray(revenue, dtype=np.float64)
+    kept = lttb(timestamps, revenue, max_points)
+    weights = np.ones_like(revenue) if weights is None else np.asarray(weights, dtype=np.float64)
+    sums = pd.DataFrame({'total': revenue * weights, 'n': weights}, index=timestamps).resample('MS').sum()
+    monthly = (sums['total'] / sums['n']).dropna()
+
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=timestamps[kept], y=revenue[kept], mode='lines', name='Predictions',
+                               line={'width': 1}, opacity=0.5))
+    fig.add_trace(go.Scatter(x=monthly.index, y=monthly.to_numpy(), mode='lines+markers', name='Monthly mean'))
+    fig.update_layout(title=title, xaxis_title='Date', yaxis_title='Revenue (₹)')
+    return fig
+
+@timed('chart_scenario')
+def create_scenario_heatmap(menu_sizes, orders, grid, marker=None):
+    """
+    Create a heatmap of predicted revenue over menu size x monthly orders.
+
+    Args:
+        menu_sizes: Grid rows (y axis)
+        orders: Grid columns (x axis)
+        grid (np.array): Predictions of shape (len(menu_sizes), len(orders))
+        marker (tuple): Optional (orders, menu_size) point to highlight
+    """
+    fig = go.Figure(go.Heatmap(
+        x=orders,
+        y=menu_sizes,
+        z=grid,
+        colorscale='Viridis',
+        colorbar={'title': 'Revenue (₹)'},
+        hovertemplate='Orders %{x}<br>Menu items %{y}<br>₹ %{z:,.0f}<extra></extra>'
+    ))
+    if marker is not None:
+        fig.add_trace(go.Scatter(x=[marker[0]], y=[marker[1]], mode='markers', name='Current inputs',
+                                 marker={'color': 'white', 'size': 10, 'line': {'color': 'black', 'width': 1}}))
+    fig.update_layout(title='Revenue Sensitivity Surface', xaxis_title='Monthly Orders (×1000)',
+                      yaxis_title='Menu Items', showlegend=False)
+    return fig
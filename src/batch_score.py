@@ -0,0 +1,254 @@
+# src/batch_score.py
+"""
+Stream a large outlet CSV through the revenue model in fixed-size chunks.
+
+Input uses the dataset schema (Franchise, Category, City, No_Of_Item,
+Order_Placed, plus any passthrough columns); the output is the same rows
+with a Predicted_Revenue column appended. Chunks are scored on a process
+pool whose workers each load the model once, written in input order, and
+recorded in a checkpoint so a crashed job resumes after the last finished
+chunk. Memory is bounded by chunk size x in-flight chunks, not file size.
+With --from-cache the input is read through the columnar ingest cache
+(src/ingest.py): parsed once, then memory-mapped, so reruns and resumes
+skip CSV parsing entirely. With --intervals N each row also gets a 90%
+Monte-Carlo dropout interval (Predicted_Revenue_Lower/_Upper) drawn from N
+stochastic passes, computed in the same tiled forward pass as the prediction.
+With --segments rows are routed by City to the segment model zoo
+(src/train_segments.py), falling back to the global model. With --record
+every prediction is also appended to the prediction store (app/utils/store.py).
+
+Usage (from the repository root):
+    python -m src.batch_score input.csv scored.csv --chunk-size 100000 --workers 8
+    python -m src.batch_score input.csv scored.csv --intervals 50
+"""
+
+import argparse
+import collections
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import pandas as pd
+
+# Label columns are parsed as strings; numeric columns keep their inferred dtype
+INPUT_DTYPES = {
+    'Franchise': str,
+    'Category': str,
+    'City': str,
+}
+MODEL_COLUMNS = ['Franchise', 'Category', 'No_Of_Item', 'Order_Placed']
+PREDICTION_COLUMN = 'Predicted_Revenue'
+INTERVAL_COLUMNS = ('Predicted_Revenue_Lower', 'Predicted_Revenue_Upper')
+
+# Per-process model state, populated once by the pool initializer
+_assets = None
+_router = None
+_store = None
+
+def _init_worker(backend, model_directory, threads_per_worker, segments=False, record=False):
+    global _assets, _router, _store
+    from app.utils.parallel import limit_threads
+    from app.utils.loader import load_assets
+
+    limit_threads(threads_per_worker, tensorflow=backend == 'keras')
+    if record:
+        from app.utils.store import get_store
+        _store = get_store()
+    if segments:
+        from app.utils.segments import load_router
+        _router = load_router(backend, model_directory)
+        if _router is None:
+            raise FileNotFoundError(f"No segment zoo in {model_directory}; run python -m src.train_segments")
+        _assets = _router.fallback
+    else:
+        _assets = load_assets(backend, model_directory)
+
+def _score_chunk(chunk, batch_size, header, interval_samples=0, model_version=None):
+    """Score one chunk and return it already encoded as CSV, so the writer only does I/O."""
+    from app.utils.predictor import predict_batch
+    model, feature_scaler, target_scaler = _assets
+    columns = {name: chunk[name].to_numpy() for name in MODEL_COLUMNS}
+    if _router is not None:
+        columns['City'] = chunk['City'].to_numpy()
+        chunk[PREDICTION_COLUMN] = _router.predict_batch(columns)
+    elif interval_samples:
+        from app.utils.intervals import predict_interval
+        result = predict_interval(columns, model, feature_scaler, target_scaler, n_samples=interval_samples)
+        chunk[PREDICTION_COLUMN] = result['prediction']
+        chunk[INTERVAL_COLUMNS[0]] = result['lower']
+        chunk[INTERVAL_COLUMNS[1]] = result['upper']
+    else:
+        chunk[PREDICTION_COLUMN] = predict_batch(columns, model, feature_scaler, target_scaler, batch_size=batch_size)
+    if _store is not None:
+        bounds = [chunk[name].to_numpy() if interval_samples else None for name in INTERVAL_COLUMNS]
+        _store.record_batch(chunk, chunk[PREDICTION_COLUMN].to_numpy(), model_version, 'src/batch_score.py', *bounds)
+        # Stored before the chunk counts as done, so a resumed job never misses rows
+        _store.flush()
+    return chunk.to_csv(index=False, header=header).encode(), len(chunk)
+
+def _read_checkpoint(path, input_path, chunk_size, interval_samples=0):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if (checkpoint['input'] != os.path.abspath(input_path) or checkpoint['chunk_size'] != chunk_size
+            or checkpoint.get('interval_samples', 0) != interval_samples):
+        raise ValueError(f"Checkpoint {path} belongs to a different job; pass --restart to discard it")
+    return checkpoint
+
+def _write_checkpoint(path, checkpoint):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+def score_csv(input_path, output_path, chunk_size=100_000, workers=None, backend=None,
+              threads_per_worker=1, max_in_flight=None, batch_size=8192,
+              checkpoint_path=None, restart=False, from_cache=False, interval_samples=0, segments=False,
+              record=False, log=sys.stderr):
+    """
+    Score a CSV file chunk by chunk on a process pool.
+    
+    Args:
+        input_path (str): CSV with the dataset schema
+        output_path (str): CSV to write (input columns + Predicted_Revenue)
+        chunk_size (int): Rows per chunk
+        workers (int): Worker processes (defaults to the CPU count)
+        backend (str): Model backend for the workers ('keras', 'numpy' or 'tflite')
+        threads_per_worker (int): BLAS/TensorFlow threads per worker
+        max_in_flight (int): Chunks read ahead of the writer (defaults to 2 x workers)
+        batch_size (int): Rows per model forward step inside a worker
+        checkpoint_path (str): Resume file (defaults to <output>.checkpoint.json)
+        restart (bool): Ignore an existing checkpoint and start from scratch
+        from_cache (bool): Read the input through the columnar ingest cache
+        interval_samples (int): Monte-Carlo dropout passes per row for the
+            interval columns (0 for point predictions only)
+        segments (bool): Route rows by City through the segment model zoo
+        record (bool): Append every prediction to the prediction store
+        log: Stream for progress lines (None to silence)
+    
+    Returns:
+        dict: Rows and chunks scored, elapsed seconds and rows per second
+    """
+    from app.utils.loader import DEFAULT_BACKEND, resolve_artifacts
+
+    if segments and interval_samples:
+        raise ValueError("Prediction intervals are not available with segment routing")
+    workers = workers or os.cpu_count()
+    max_in_flight = max_in_flight or 2 * workers
+    checkpoint_path = checkpoint_path or output_path + '.checkpoint.json'
+    # Pin one model version for the whole job, even if a new one is published meanwhile
+    backend = backend or DEFAULT_BACKEND
+    version, model_directory = resolve_artifacts(backend)
+
+    checkpoint = None if restart else _read_checkpoint(checkpoint_path, input_path, chunk_size, interval_samples)
+    if checkpoint is not None and checkpoint.get('model_version', version) != version:
+        raise ValueError(f"Checkpoint {checkpoint_path} was scored with model {checkpoint['model_version']}, "
+                         f"but {version} is current; pass --restart to rescore")
+    if checkpoint is None:
+        checkpoint = {'input': os.path.abspath(input_path), 'chunk_size': chunk_size, 'model_version': version,
+                      'interval_samples': interval_samples, 'chunks_done': 0, 'rows_done': 0, 'output_bytes': 0}
+    resumed_chunks = checkpoint['chunks_done']
+
+    # Drop anything written after the last checkpointed chunk
+    out = open(output_path, 'r+b' if resumed_chunks else 'wb')
+    out.truncate(checkpoint['output_bytes'])
+    out.seek(checkpoint['output_bytes'])
+
+    def write_chunk(future):
+        data, n_rows = future.result()
+        out.write(data)
+        out.flush()
+        os.fsync(out.fileno())
+        checkpoint['chunks_done'] += 1
+        checkpoint['rows_done'] += n_rows
+        checkpoint['output_bytes'] = out.tell()
+        _write_checkpoint(checkpoint_path, checkpoint)
+
+        if log is not None:
+            elapsed = time.perf_counter() - start
+            rate = (checkpoint['rows_done'] - resumed_rows) / elapsed if elapsed else 0.0
+            print(f"chunk {checkpoint['chunks_done']:>6}  rows {checkpoint['rows_done']:>12,}  "
+                  f"{rate:>12,.0f} rows/s  {elapsed:8.1f}s", file=log)
+
+    resumed_rows = checkpoint['rows_done']
+    start = time.perf_counter()
+    if from_cache:
+        from src.ingest import iter_frames
+        reader = iter_frames(input_path, chunk_size, start_chunk=resumed_chunks)
+        first_index = resumed_chunks
+    else:
+        reader = pd.read_csv(input_path, chunksize=chunk_size, dtype=INPUT_DTYPES)
+        first_index = 0
+    pending = collections.deque()
+    context = multiprocessing.get_context('spawn')
+
+    try:
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(backend, model_directory, threads_per_worker, segments, record)) as pool:
+            for index, chunk in enumerate(reader, first_index):
+                if index < resumed_chunks:
+                    continue
+                pending.append(pool.submit(_score_chunk, chunk, batch_size, index == 0, interval_samples, version))
+                if len(pending) >= max_in_flight:
+                    write_chunk(pending.popleft())
+            while pending:
+                write_chunk(pending.popleft())
+    finally:
+        out.close()
+        reader.close()
+
+    elapsed = time.perf_counter() - start
+    rows = checkpoint['rows_done'] - resumed_rows
+    return {
+        'rows': rows,
+        'chunks': checkpoint['chunks_done'] - resumed_chunks,
+        'resumed_from_chunk': resumed_chunks,
+        'model_version': version,
+        'seconds': elapsed,
+        'rows_per_second': rows / elapsed if elapsed else 0.0,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input')
+    parser.add_argument('output')
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--threads-per-worker', type=int, default=1)
+    parser.add_argument('--max-in-flight', type=int, help='chunks read ahead of the writer (default: 2 x workers)')
+    parser.add_argument('--batch-size', type=int, default=8192, help='rows per model forward step')
+    parser.add_argument('--backend', choices=['keras', 'numpy', 'tflite'], help='default: REVENUE_MODEL_BACKEND')
+    parser.add_argument('--checkpoint', help='resume file (default: <output>.checkpoint.json)')
+    parser.add_argument('--restart', action='store_true', help='ignore an existing checkpoint')
+    parser.add_argument('--from-cache', action='store_true', help='read input through the columnar ingest cache')
+    parser.add_argument('--intervals', type=int, default=0, metavar='N',
+                        help='add a 90%% Monte-Carlo dropout interval from N passes per row (keras/numpy backends)')
+    parser.add_argument('--segments', action='store_true', help='route rows by City through the segment model zoo')
+    parser.add_argument('--record', action='store_true', help='append every prediction to the prediction store')
+    args = parser.parse_args(argv)
+
+    summary = score_csv(
+        args.input, args.output,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        backend=args.backend,
+        threads_per_worker=args.threads_per_worker,
+        max_in_flight=args.max_in_flight,
+        batch_size=args.batch_size,
+        checkpoint_path=args.checkpoint,
+        restart=args.restart,
+        from_cache=args.from_cache,
+        interval_samples=args.intervals,
+        segments=args.segments,
+        record=args.record
+    )
+    print(f"Scored {summary['rows']:,} rows in {summary['chunks']} chunks "
+          f"({summary['seconds']:.1f}s, {summary['rows_per_second']:,.0f} rows/s)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,231 @@
+# src/benchmark.py
+"""
+Benchmark the inference hot path across stages, backends and batch sizes.
+
+Stages timed per batch size:
+    preprocess_input        single-row helper, looped over the batch
+    build_features          vectorized feature construction (category codes)
+    feature_transform       fused encode + derive + scale
+    feature_scaler          feature_scaler.transform
+    keras_predict           warmed KerasModel.predict (traced once, bucketed batches)
+    keras_model_predict     keras.Model.predict on the same model
+    keras_call              model(x, training=False)
+    numpy_predict           exported NumPy engine
+    tflite_predict          quantized TFLite model
+    inverse_scale           inverse_scale_prediction, looped over the batch
+    target_inverse          target_scaler.inverse_transform on the whole batch
+    predict_batch_<backend> end-to-end predict_batch
+
+Rows are synthetic, drawn from the data/raw/revenue_prediction.csv
+distributions. Results are written as JSON; --compare flags stages whose
+median time regressed beyond --threshold against a stored baseline.
+
+Usage (from the repository root):
+    python -m src.benchmark --output bench.json
+    python -m src.benchmark --output bench.json --compare baseline.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from app.utils.loader import (
+    FEATURE_TRANSFORM_FILE, load_assets, load_feature_transform, load_target_scaler,
+    model_version, resolve_artifacts
+)
+from app.utils.predictor import (
+    build_features, category_options, inverse_scale_prediction, predict_batch, preprocess_input
+)
+
+DEFAULT_BATCH_SIZES = [1, 10, 100, 1000, 10000, 100000]
+
+# Row-at-a-time helpers are only looped up to this batch size
+MAX_LOOPED_BATCH = 10000
+
+def synthetic_rows(n_rows, seed=0, data_path='data/raw/revenue_prediction.csv', categories=None):
+    """
+    Draw synthetic prediction inputs from the dataset's distributions.
+    
+    Franchise follows the dataset's Yes/No mix; menu size and orders are
+    resampled from the observed values with small multiplicative jitter.
+    Category labels are drawn uniformly from ``categories`` (by default the
+    labels the served feature encoder knows).
+    
+    Returns:
+        pd.DataFrame: Columns franchise, category, menu_size, orders
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.read_csv(data_path)
+    categories = categories or category_options(_feature_encoder())
+    franchise_rate = (df['Franchise'] == 'Yes').mean()
+    jitter = lambda size: rng.normal(1.0, 0.05, size)
+    return pd.DataFrame({
+        'franchise': (rng.random(n_rows) < franchise_rate).astype(int),
+        'category': rng.choice(categories, n_rows),
+        'menu_size': np.maximum(1, np.round(rng.choice(df['No_Of_Item'].to_numpy(), n_rows) * jitter(n_rows))).astype(int),
+        'orders': np.maximum(0.1, rng.choice(df['Order_Placed'].to_numpy(), n_rows) * jitter(n_rows)).round(1),
+    })
+
+def time_call(func, repeats, min_seconds=0.2):
+    """Time ``func`` at least ``repeats`` times (and for at least ``min_seconds``)."""
+    func()  # warm-up
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < repeats or (time.perf_counter() - started < min_seconds and len(timings) < 1000):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def _feature_encoder():
+    """The served fused feature transform."""
+    return load_feature_transform(os.path.join(resolve_artifacts('keras')[1], FEATURE_TRANSFORM_FILE))
+
+def _stage_functions(rows, backends):
+    """Yield (stage, callable) pairs for one batch of rows."""
+    feature_scaler = _feature_encoder()
+    target_scaler = load_target_scaler(os.path.join(resolve_artifacts('keras')[1], 'target_scaler.pkl'))
+    records = rows.to_dict('records')
+    features = feature_scaler.features(rows)
+    scaled = feature_scaler.transform(features)
+    scaled_targets = np.zeros((len(rows), 1))
+
+    if len(rows) <= MAX_LOOPED_BATCH:
+        yield 'preprocess_input', lambda: [preprocess_input(r, feature_scaler) for r in records]
+        yield 'inverse_scale', lambda: [inverse_scale_prediction(scaled_targets[i:i + 1], target_scaler)
+                                        for i in range(len(rows))]
+    yield 'feature_transform', lambda: feature_scaler(rows)
+    encoded = rows.assign(category=feature_scaler.encode('Category', rows['category']))
+    yield 'build_features', lambda: build_features(encoded)
+    yield 'feature_scaler', lambda: feature_scaler.transform(features)
+    yield 'target_inverse', lambda: target_scaler.inverse_transform(scaled_targets)
+
+    for backend, (model, backend_features, backend_targets) in backends.items():
+        if backend == 'keras':
+            import tensorflow as tf
+            tensor = tf.convert_to_tensor(scaled, dtype=tf.float32)
+            yield 'keras_predict', lambda: model.predict(scaled, batch_size=4096, verbose=0)
+            yield 'keras_model_predict', lambda: model.keras_model.predict(scaled, batch_size=4096, verbose=0)
+            yield 'keras_call', lambda: model(tensor, training=False)
+        elif backend == 'numpy':
+            yield 'numpy_predict', lambda: model.predict(features, batch_size=4096)
+        elif backend == 'tflite':
+            yield 'tflite_predict', lambda: model.predict(scaled, batch_size=4096)
+        yield f'predict_batch_{backend}', lambda m=model, f=backend_features, t=backend_targets: predict_batch(rows, m, f, t)
+
+def run_benchmarks(batch_sizes=DEFAULT_BATCH_SIZES, backends=('keras', 'numpy', 'tflite'), repeats=5, seed=0,
+                   log=sys.stderr):
+    """
+    Time every stage for every batch size.
+    
+    Returns:
+        dict: Environment metadata and one result record per (stage, batch size)
+    """
+    loaded = {}
+    for backend in backends:
+        try:
+            loaded[backend] = load_assets(backend)
+        except (ImportError, FileNotFoundError) as exc:
+            print(f"Skipping {backend} backend: {exc}", file=log)
+
+    all_rows = synthetic_rows(max(batch_sizes), seed)
+    results = []
+    for batch_size in batch_sizes:
+        rows = all_rows.iloc[:batch_size].reset_index(drop=True)
+        for stage, func in _stage_functions(rows, loaded):
+            timings = time_call(func, repeats)
+            median = statistics.median(timings)
+            results.append({
+                'stage': stage,
+                'batch_size': batch_size,
+                'median_s': median,
+                'min_s': min(timings),
+                'rows_per_s': batch_size / median if median else None,
+                'repeats': len(timings),
+            })
+            if log is not None:
+                print(f"{stage:<24} {batch_size:>7}  {median * 1000:10.3f} ms  {batch_size / median:>14,.0f} rows/s", file=log)
+
+    return {'meta': environment_metadata(list(loaded)), 'results': results}
+
+def environment_metadata(backends):
+    """Versions and model identity needed to interpret a benchmark file."""
+    meta = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'model_versions': {backend: model_version(backend) for backend in backends},
+    }
+    if 'tensorflow' in sys.modules:
+        meta['tensorflow'] = sys.modules['tensorflow'].__version__
+    return meta
+
+def compare(current, baseline, threshold=0.2):
+    """
+    Flag stages whose median time grew by more than ``threshold`` over the baseline.
+    
+    Returns:
+        list: One dict per regressed (stage, batch size) with both timings and the ratio
+    """
+    reference = {(r['stage'], r['batch_size']): r for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        base = reference.get((result['stage'], result['batch_size']))
+        if base is None:
+            continue
+        ratio = result['median_s'] / base['median_s']
+        if ratio > 1 + threshold:
+            regressions.append({
+                'stage': result['stage'],
+                'batch_size': result['batch_size'],
+                'baseline_s': base['median_s'],
+                'current_s': result['median_s'],
+                'ratio': ratio,
+            })
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--batch-sizes', default=','.join(map(str, DEFAULT_BATCH_SIZES)))
+    parser.add_argument('--backends', default='keras,numpy,tflite')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compare', metavar='BASELINE', help='baseline JSON from a previous run')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed relative slowdown before a stage is flagged (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        batch_sizes=[int(size) for size in args.batch_sizes.split(',')],
+        backends=args.backends.split(','),
+        repeats=args.repeats,
+        seed=args.seed
+    )
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(report['results'])} results to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['stage']} @ {r['batch_size']}: "
+                  f"{r['baseline_s'] * 1000:.3f} ms -> {r['current_s'] * 1000:.3f} ms ({r['ratio']:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+# src/export_numpy.py
+"""
+Compile models/neural_network_model.keras into a TensorFlow-free NumPy engine.
+
+The feature scaler is folded into the first Dense layer, each
+BatchNormalization into the Dense layer that follows it, and the target
+scaler into the output layer. Dropout does nothing at inference; its rates
+are kept (with the bias share that passes through dropped units) so the
+engine can draw Monte-Carlo dropout samples for prediction intervals. The
+result is verified against ``model.predict`` before it is written.
+
+Usage (from the repository root):
+    python -m src.export_numpy [--output models/neural_network_model.npz]
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from app.utils.loader import load_feature_scaler, load_keras_model, load_target_scaler
+from app.utils.numpy_engine import NumpyModel
+
+# A row matches when |numpy - keras| <= ATOL * target std + RTOL * |keras|. float32
+# rounding dominates: ~₹300 absolute near typical revenues, 1e-5 relative on the
+# extrapolated outputs far outside the training range.
+DEFAULT_ATOL = 1e-4
+DEFAULT_RTOL = 1e-5
+
+def fold_model(model, feature_scaler, target_scaler, dtype=np.float32):
+    """
+    Fold scalers and BatchNormalization into a stack of affine layers.
+    
+    Args:
+        model: Loaded Keras Sequential model (Dense/BatchNormalization/Dropout)
+        feature_scaler: Fitted StandardScaler applied to model inputs
+        target_scaler: Fitted StandardScaler applied to the model target
+        dtype: Floating point type of the exported weights
+    
+    Returns:
+        NumpyModel: Engine taking raw features and returning raw revenue
+    """
+    # Pending input affine x -> x * scale + shift, applied to the next Dense layer
+    scale = 1.0 / feature_scaler.scale_
+    shift = -feature_scaler.mean_ / feature_scaler.scale_
+
+    # Pending dropout before the next Dense layer: rate and the part of the
+    # pending shift that the dropout mask multiplies
+    rate, dropped_shift = 0.0, None
+
+    weights, biases, activations, dropout, dropout_shifts = [], [], [], [], []
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind == 'InputLayer':
+            continue
+        if kind == 'Dropout':
+            if rate:
+                raise ValueError(f"Cannot fold consecutive Dropout layers ('{layer.name}')")
+            rate, dropped_shift = float(layer.rate), shift.copy()
+        elif kind == 'Dense':
+            kernel, bias = (w.astype(np.float64) for w in layer.get_weights())
+            weights.append(scale[:, None] * kernel)
+            biases.append(shift @ kernel + bias)
+            activations.append(layer.get_config()['activation'])
+            dropout.append(rate)
+            dropout_shifts.append(dropped_shift[:, None] * kernel if rate else None)
+            rate, dropped_shift = 0.0, None
+            scale = np.ones(kernel.shape[1])
+            shift = np.zeros(kernel.shape[1])
+        elif kind == 'BatchNormalization':
+            variance = layer.moving_variance.numpy().astype(np.float64)
+            mean = layer.moving_mean.numpy().astype(np.float64)
+            gamma = layer.gamma.numpy().astype(np.float64) if layer.scale else 1.0
+            beta = layer.beta.numpy().astype(np.float64) if layer.center else 0.0
+            bn_scale = gamma / np.sqrt(variance + layer.epsilon)
+            scale = scale * bn_scale
+            shift = shift * bn_scale + beta - mean * bn_scale
+            if rate:
+                dropped_shift = dropped_shift * bn_scale
+        else:
+            raise ValueError(f"Cannot fold layer '{layer.name}' of type {kind}")
+
+    if not weights or activations[-1] != 'linear':
+        raise ValueError("Model must end in a linear Dense layer to fold the target scaler")
+    if np.any(scale != 1.0) or np.any(shift != 0.0):
+        raise ValueError("Model ends with a BatchNormalization layer that has no Dense layer to fold into")
+
+    weights[-1] = weights[-1] * target_scaler.scale_
+    biases[-1] = biases[-1] * target_scaler.scale_ + target_scaler.mean_
+    if dropout[-1]:
+        dropout_shifts[-1] = dropout_shifts[-1] * target_scaler.scale_
+
+    return NumpyModel(
+        [w.astype(dtype) for w in weights],
+        [b.astype(dtype) for b in biases],
+        activations,
+        dropout,
+        [s.astype(dtype) if s is not None else None for s in dropout_shifts]
+    )
+
+def verification_inputs(feature_scaler, n_rows=10000, seed=42):
+    """Raw feature rows around the training distribution plus the app's input domain."""
+    rng = np.random.default_rng(seed)
+    half = n_rows // 2
+
+    around_training = feature_scaler.mean_ + feature_scaler.scale_ * rng.normal(size=(half, 5))
+
+    menu_size = rng.integers(1, 201, n_rows - half)
+    orders = rng.integers(1, 501, n_rows - half)
+    app_domain = np.column_stack([
+        rng.integers(0, 2, n_rows - half),
+        rng.integers(0, 3, n_rows - half),
+        menu_size,
+        orders,
+        orders / menu_size
+    ])
+    return np.vstack([around_training, app_domain])
+
+def verify(engine, model, feature_scaler, target_scaler, atol=DEFAULT_ATOL, rtol=DEFAULT_RTOL):
+    """
+    Compare the engine against ``model.predict`` on verification inputs.
+    
+    Returns:
+        dict: Max absolute/relative error and whether every row is within tolerance
+    """
+    raw = verification_inputs(feature_scaler)
+    expected = target_scaler.inverse_transform(
+        model.predict(feature_scaler.transform(raw), batch_size=4096, verbose=0)
+    ).ravel()
+    actual = engine.predict(raw).ravel()
+
+    abs_error = np.abs(actual - expected)
+    abs_limit = atol * float(target_scaler.scale_[0])
+    return {
+        'rows': len(raw),
+        'max_abs_error': float(abs_error.max()),
+        'max_rel_error': float((abs_error / np.maximum(np.abs(expected), 1.0)).max()),
+        'atol': abs_limit,
+        'rtol': rtol,
+        'passed': bool(np.all(abs_error <= abs_limit + rtol * np.abs(expected))),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='models/neural_network_model.keras')
+    parser.add_argument('--feature-scaler', default='models/feature_scaler.pkl')
+    parser.add_argument('--target-scaler', default='models/target_scaler.pkl')
+    parser.add_argument('--output', default='models/neural_network_model.npz')
+    parser.add_argument('--dtype', choices=['float32', 'float64'], default='float32')
+    parser.add_argument('--atol', type=float, default=DEFAULT_ATOL,
+                        help='absolute tolerance as a fraction of the target std (default: %(default)s)')
+    parser.add_argument('--rtol', type=float, default=DEFAULT_RTOL,
+                        help='relative tolerance (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    model = load_keras_model(args.model)
+    feature_scaler = load_feature_scaler(args.feature_scaler)
+    target_scaler = load_target_scaler(args.target_scaler)
+
+    engine = fold_model(model, feature_scaler, target_scaler, dtype=np.dtype(args.dtype))
+    report = verify(engine, model, feature_scaler, target_scaler, args.atol, args.rtol)
+
+    print(f"Verified on {report['rows']} rows: max abs error ₹{report['max_abs_error']:,.2f} "
+          f"(max rel {report['max_rel_error']:.2e}; atol ₹{report['atol']:,.2f}, rtol {report['rtol']:.0e})")
+    if not report['passed']:
+        print("Export aborted: NumPy engine does not match model.predict within tolerance.")
+        return 1
+
+    engine.save(args.output)
+    print(f"Saved NumPy engine to {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
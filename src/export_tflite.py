@@ -0,0 +1,170 @@
+# src/export_tflite.py
+"""
+Convert models/neural_network_model.keras into a quantized TFLite model.
+
+Modes:
+    float16   weights stored as float16, computed in float32
+    dynamic   int8 weights, activations quantized on the fly
+    int8      full integer kernels, calibrated on representative rows
+              (float32 input/output, so the served scalers stay unchanged)
+
+Representative rows are the training pipeline's train split (cached data
+stages of src/train.py) or the rows of --data, scaled exactly as at serving
+time. The converted model is scored against the float Keras model on the
+pipeline's held-out split, which neither the network nor the int8
+calibration has seen, and is only written when its revenue MAE is within
+--max-mae-drift (relative) of the float model's. Size and single-row / batch
+latency of both are reported.
+
+Usage (from the repository root):
+    python -m src.export_tflite --mode dynamic
+    python -m src.export_tflite --mode int8 --max-mae-drift 0.005 --report tflite_report.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.utils.loader import MODEL_DIR, load_assets
+from app.utils.tflite_engine import TFLiteModel
+from src.train import DEFAULT_CONFIG, FEATURE_COLUMNS, run_data_stages
+
+MODES = ('float16', 'dynamic', 'int8')
+
+# Largest accepted relative increase of the revenue MAE over the float model
+DEFAULT_MAX_MAE_DRIFT = 0.01
+
+def representative_rows(feature_scaler, data_path='data/raw/revenue_prediction.csv'):
+    """Scaled float32 feature rows and revenue targets from a raw dataset."""
+    df = pd.read_csv(data_path)
+    return feature_scaler(df).astype(np.float32), df['Revenue'].to_numpy(dtype=np.float64)
+
+def split_rows(feature_scaler, config=DEFAULT_CONFIG):
+    """
+    Scaled float32 rows of the training pipeline's train and held-out splits.
+
+    Returns:
+        dict: 'train' and 'test' -> (scaled features, revenue targets)
+    """
+    outputs, _ = run_data_stages(config, log=lambda message: None)
+    split = outputs['split']
+    return {part: (feature_scaler.transform(split[f'X_{part}'][FEATURE_COLUMNS].to_numpy(dtype=np.float64))
+                   .astype(np.float32), split[f'y_{part}'].to_numpy(dtype=np.float64))
+            for part in ('train', 'test')}
+
+def convert(model, mode, representative=None):
+    """
+    Convert a Keras model to a TFLite flatbuffer.
+
+    Args:
+        model: Loaded Keras model
+        mode (str): One of MODES
+        representative (np.array): Scaled rows used to calibrate 'int8'
+
+    Returns:
+        bytes: The ``.tflite`` model
+    """
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if mode == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    elif mode == 'int8':
+        converter.representative_dataset = lambda: ([row[None, :]] for row in representative)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    elif mode != 'dynamic':
+        raise ValueError(f"Unknown quantization mode '{mode}' (expected one of {MODES})")
+    return converter.convert()
+
+def median_latency_ms(func, repeats=50):
+    func()  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+def compare(model, quantized, target_scaler, X, y, batch_rows=256, seed=0):
+    """
+    Accuracy, size and latency of the quantized model against the float one.
+
+    Returns:
+        dict: MAE of both, relative MAE drift, max prediction difference and
+        single-row / batch latency in ms
+    """
+    revenue = lambda scaled: target_scaler.inverse_transform(np.asarray(scaled, dtype=np.float64)).ravel()
+    float_pred = revenue(model.predict(X, verbose=0))
+    quant_pred = revenue(quantized.predict(X))
+    float_mae = float(np.mean(np.abs(float_pred - y)))
+    quant_mae = float(np.mean(np.abs(quant_pred - y)))
+
+    batch = X[np.random.default_rng(seed).integers(0, len(X), batch_rows)]
+    return {
+        'rows': len(X),
+        'float_mae': float_mae,
+        'quantized_mae': quant_mae,
+        'mae_drift': (quant_mae - float_mae) / float_mae,
+        'max_abs_diff': float(np.max(np.abs(quant_pred - float_pred))),
+        'latency_ms': {
+            'keras_row': median_latency_ms(lambda: model.predict(X[:1], verbose=0)),
+            'keras_call_row': median_latency_ms(lambda: model(X[:1], training=False)),
+            'tflite_row': median_latency_ms(lambda: quantized.predict(X[:1])),
+            f'keras_batch{batch_rows}': median_latency_ms(lambda: model.predict(batch, verbose=0)),
+            f'tflite_batch{batch_rows}': median_latency_ms(lambda: quantized.predict(batch)),
+        },
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=MODES, default='dynamic')
+    parser.add_argument('--model-dir', default=MODEL_DIR, help='flat artifact directory to convert and write to')
+    parser.add_argument('--data', help='raw CSV of representative rows (default: the training pipeline\'s train split)')
+    parser.add_argument('--max-mae-drift', type=float, default=DEFAULT_MAX_MAE_DRIFT,
+                        help='largest relative MAE increase over the float model (default: %(default)s)')
+    parser.add_argument('--output', help='default: <model dir>/neural_network_model.tflite')
+    parser.add_argument('--report', help='also write the comparison as JSON')
+    args = parser.parse_args(argv)
+
+    model_dir = args.model_dir
+    model, feature_scaler, target_scaler = load_assets('keras', model_dir)
+    model = model.keras_model  # The converter needs the Keras model itself, not the warmed wrapper
+    splits = split_rows(feature_scaler)
+    representative = representative_rows(feature_scaler, args.data)[0] if args.data else splits['train'][0]
+
+    quantized = TFLiteModel(convert(model, args.mode, representative))
+    report = compare(model, quantized, target_scaler, *splits['test'])
+    keras_path = os.path.join(model_dir, 'neural_network_model.keras')
+    report.update(mode=args.mode, max_mae_drift=args.max_mae_drift,
+                  keras_bytes=os.path.getsize(keras_path), tflite_bytes=len(quantized.model_content))
+    report['passed'] = report['mae_drift'] <= args.max_mae_drift
+
+    print(f"{args.mode} TFLite model: {report['tflite_bytes'] / 1024:,.1f} KB "
+          f"(Keras {report['keras_bytes'] / 1024:,.1f} KB, {report['keras_bytes'] / report['tflite_bytes']:.1f}x smaller)")
+    print(f"  MAE on {report['rows']} held-out rows: float ₹{report['float_mae']:,.0f}, quantized ₹{report['quantized_mae']:,.0f} "
+          f"(drift {report['mae_drift']:+.3%}, limit {args.max_mae_drift:.3%}); "
+          f"max prediction difference ₹{report['max_abs_diff']:,.0f}")
+    for name, ms in report['latency_ms'].items():
+        print(f"  {name:<20} {ms:8.3f} ms")
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if not report['passed']:
+        print("Export aborted: quantized MAE drifted beyond --max-mae-drift.")
+        return 1
+    output = args.output or os.path.join(model_dir, 'neural_network_model.tflite')
+    with open(output, 'wb') as f:
+        f.write(quantized.model_content)
+    print(f"Saved {args.mode} TFLite model to {output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+# src/importance.py
+"""
+Permutation feature importance and held-out metrics for the served model.
+
+The held-out split of the training pipeline (cached data stages of
+``src/train.py``) is scored once as a baseline, then every model input is
+shuffled ``--repeats`` times and the increase in revenue MAE is recorded.
+All (feature, repeat) permutations are built as one stacked matrix per
+worker and predicted in a single batched call; the permutations are spread
+over a process pool whose workers each load the model once.
+
+The result is written as feature_importance.json next to the served model
+artifacts, where the app reads it instead of computing anything per request.
+
+Usage (from the repository root):
+    python -m src.importance --repeats 50 --workers 4
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.utils.loader import FEATURE_IMPORTANCE_FILE
+from src.train import DEFAULT_CONFIG, FEATURE_COLUMNS, regression_metrics, run_data_stages
+
+# Per-process state, populated once by the pool initializer
+_worker = None
+
+def _init_worker(backend, model_directory, X, y, threads_per_worker):
+    global _worker
+    from app.utils.parallel import limit_threads
+    from app.utils.loader import load_assets
+
+    limit_threads(threads_per_worker, tensorflow=backend == 'keras')
+    _worker = {'assets': load_assets(backend, model_directory), 'X': X, 'y': y}
+
+def predict_revenue(assets, X):
+    """Revenue for a raw (encoded, unscaled) feature matrix with any backend's assets."""
+    model, feature_scaler, target_scaler = assets
+    scaled = model.predict(feature_scaler.transform(X), batch_size=8192, verbose=0)
+    return target_scaler.inverse_transform(np.asarray(scaled, dtype=np.float64).reshape(-1, 1)).ravel()
+
+def _score_baseline():
+    return predict_revenue(_worker['assets'], _worker['X'])
+
+def _score_permutations(tasks):
+    """
+    MAE for each (feature index, repeat seed) task, all in one forward pass.
+
+    Returns:
+        list: (feature index, MAE) per task
+    """
+    X, y = _worker['X'], _worker['y']
+    stacked = np.tile(X, (len(tasks), 1))
+    for i, (column, seed) in enumerate(tasks):
+        block = stacked[i * len(X):(i + 1) * len(X)]
+        block[:, column] = np.random.default_rng(seed).permutation(X[:, column])
+    errors = np.abs(predict_revenue(_worker['assets'], stacked).reshape(len(tasks), len(X)) - y)
+    return [(column, float(mae)) for (column, _), mae in zip(tasks, errors.mean(axis=1))]
+
+def permutation_importance(backend, model_directory, X, y, repeats=30, workers=None, seed=42,
+                           threads_per_worker=1):
+    """
+    Permutation importance of each model input on a held-out set.
+
+    Args:
+        backend (str): Model backend to evaluate
+        model_directory (str): Artifact directory (see resolve_artifacts)
+        X (np.array): Raw held-out feature matrix, columns in FEATURE_COLUMNS order
+        y (np.array): Held-out revenue
+        repeats (int): Shuffles per feature
+        workers (int): Worker processes (defaults to the CPU count)
+        seed (int): Base seed of the shuffles
+        threads_per_worker (int): BLAS/TensorFlow threads per worker
+
+    Returns:
+        tuple: (baseline metrics dict, list of per-feature importance dicts
+        sorted by decreasing MAE increase)
+    """
+    workers = workers or os.cpu_count()
+    rng = np.random.default_rng(seed)
+    tasks = [(column, int(task_seed)) for column in range(X.shape[1])
+             for task_seed in rng.integers(0, 2**31, repeats)]
+    groups = [group for group in np.array_split(np.arange(len(tasks)), workers) if len(group)]
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(len(groups), mp_context=context, initializer=_init_worker,
+                             initargs=(backend, model_directory, X, y, threads_per_worker)) as pool:
+        baseline = pool.submit(_score_baseline).result()
+        results = pool.map(_score_permutations, [[tasks[i] for i in group] for group in groups])
+        scores = [score for group in results for score in group]
+
+    metrics = dict(regression_metrics(y, baseline), mape=float(np.mean(np.abs(baseline - y) / np.abs(y))))
+    increases = {column: [] for column in range(X.shape[1])}
+    for column, mae in scores:
+        increases[column].append(mae - metrics['mae'])
+    positive_total = sum(max(np.mean(values), 0.0) for values in increases.values()) or 1.0
+    importance = [{
+        'feature': FEATURE_COLUMNS[column],
+        'mae_increase': float(np.mean(values)),
+        'mae_increase_std': float(np.std(values)),
+        'share': float(max(np.mean(values), 0.0) / positive_total),
+    } for column, values in increases.items()]
+    importance.sort(key=lambda item: item['mae_increase'], reverse=True)
+    return metrics, importance
+
+def main(argv=None):
+    from app.utils.loader import DEFAULT_BACKEND, resolve_artifacts
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=['keras', 'numpy', 'tflite'], help='default: REVENUE_MODEL_BACKEND')
+    parser.add_argument('--model-dir', help='registry root or flat model directory (default: REVENUE_MODEL_DIR)')
+    parser.add_argument('--repeats', type=int, default=30, help='shuffles per feature')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--threads-per-worker', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help=f'default: <model directory>/{FEATURE_IMPORTANCE_FILE}')
+    args = parser.parse_args(argv)
+
+    backend = args.backend or DEFAULT_BACKEND
+    version, model_directory = resolve_artifacts(backend, args.model_dir)
+    outputs, _ = run_data_stages(DEFAULT_CONFIG, log=lambda message: None)
+    X = outputs['split']['X_test'][FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    y = outputs['split']['y_test'].to_numpy(dtype=np.float64)
+
+    start = time.perf_counter()
+    metrics, importance = permutation_importance(backend, model_directory, X, y, args.repeats,
+                                                 args.workers, args.seed, args.threads_per_worker)
+    elapsed = time.perf_counter() - start
+
+    report = {
+        'model_version': version,
+        'backend': backend,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'rows': len(X),
+        'repeats': args.repeats,
+        'seed': args.seed,
+        'metrics': metrics,
+        'importance': importance,
+    }
+    output = args.output or os.path.join(model_directory, FEATURE_IMPORTANCE_FILE)
+    tmp_path = output + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, output)
+
+    print(f"Held-out ({len(X)} rows): MAE ₹{metrics['mae']:,.0f}  RMSE ₹{metrics['rmse']:,.0f}  "
+          f"R² {metrics['r2']:.3f}  MAPE {metrics['mape']:.1%}")
+    for item in importance:
+        print(f"  {item['feature']:<18} MAE +₹{item['mae_increase']:>12,.0f} ± {item['mae_increase_std']:>10,.0f}  "
+              f"({item['share']:.0%})")
+    print(f"{len(importance) * args.repeats} permutations in {elapsed:.1f}s; saved to {output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+# src/ingest.py
+"""
+Columnar ingest cache for raw outlet CSVs.
+
+A raw CSV is parsed once, in chunks, with an explicit dtype schema.
+Categorical columns are dictionary-encoded to int32 codes (vocabulary sorted,
+matching ``astype('category').cat.codes``), and every column is written as
+a ``.npy`` file under ``<cache_dir>/<source sha256>/``. Later loads
+memory-map the arrays, so they are zero-copy and take milliseconds regardless
+of file size, and no object-dtype column is ever materialised for the
+whole file.
+
+Usage (from the repository root):
+    python -m src.ingest data/raw/revenue_prediction.csv
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'ingest')
+
+# Column -> storage dtype; 'category' columns are stored as int32 codes (-1 = missing)
+SCHEMA = {
+    'Id': 'int64',
+    'Name': 'category',
+    'Franchise': 'category',
+    'Category': 'category',
+    'City': 'category',
+    'No_Of_Item': 'float64',
+    'Order_Placed': 'float64',
+    'Revenue': 'float64',
+}
+
+MANIFEST = 'manifest.json'
+
+def _file_digest(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def source_digest(source, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Content hash of ``source``, memoized by path, size and mtime.
+
+    Re-hashing a multi-GB file on every load would defeat the cache, so
+    digests are remembered in ``<cache_dir>/digests.json`` until the file's
+    size or modification time changes.
+    """
+    stat = os.stat(source)
+    stamp = f'{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}'
+    index_path = os.path.join(cache_dir, 'digests.json')
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+    if stamp not in index:
+        index[stamp] = _file_digest(source)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f'{index_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+    return index[stamp]
+
+def dataset_dir(source, cache_dir=DEFAULT_CACHE_DIR):
+    """Cache directory for ``source``, keyed by the hash of its contents."""
+    return os.path.join(cache_dir, source_digest(source, cache_dir)[:16])
+
+def ingest(source, cache_dir=DEFAULT_CACHE_DIR, chunk_size=1_000_000, force=False):
+    """
+    Parse ``source`` into the columnar cache (a no-op when already cached).
+
+    Args:
+        source (str): Raw CSV path
+        cache_dir (str): Root of the ingest cache
+        chunk_size (int): Rows parsed per chunk (bounds peak memory)
+        force (bool): Rebuild even if a cached copy exists
+
+    Returns:
+        str: Directory holding the column arrays and manifest
+    """
+    target = dataset_dir(source, cache_dir)
+    if os.path.exists(os.path.join(target, MANIFEST)) and not force:
+        return target
+
+    building = target + '.building'
+    shutil.rmtree(building, ignore_errors=True)
+    os.makedirs(building)
+
+    header = pd.read_csv(source, nrows=0).columns
+    columns = [c for c in header if c in SCHEMA]
+    read_dtypes = {c: str if SCHEMA[c] == 'category' else SCHEMA[c] for c in columns}
+
+    # Pass 1: append raw column bytes, growing each vocabulary in first-seen order
+    vocabularies = {c: {} for c in columns if SCHEMA[c] == 'category'}
+    raw_files = {c: open(os.path.join(building, f'{c}.bin'), 'wb') for c in columns}
+    rows = 0
+    try:
+        for chunk in pd.read_csv(source, usecols=columns, dtype=read_dtypes, chunksize=chunk_size):
+            for column in columns:
+                if column in vocabularies:
+                    local_codes, uniques = pd.factorize(chunk[column])
+                    vocabulary = vocabularies[column]
+                    lookup = np.array([vocabulary.setdefault(u, len(vocabulary)) for u in uniques] + [-1],
+                                      dtype=np.int32)
+                    values = lookup[local_codes]  # factorize marks missing as -1 -> lookup[-1] == -1
+                else:
+                    values = chunk[column].to_numpy(dtype=SCHEMA[column])
+                raw_files[column].write(values.tobytes())
+            rows += len(chunk)
+    finally:
+        for f in raw_files.values():
+            f.close()
+
+    # Pass 2: convert to .npy, remapping codes so the vocabulary is sorted
+    manifest = {'source': os.path.abspath(source), 'rows': rows, 'columns': {}}
+    for column in columns:
+        raw_path = os.path.join(building, f'{column}.bin')
+        if column in vocabularies:
+            labels = sorted(vocabularies[column])
+            remap = np.empty(len(labels) + 1, dtype=np.int32)
+            remap[[vocabularies[column][label] for label in labels]] = np.arange(len(labels), dtype=np.int32)
+            remap[-1] = -1
+            dtype = np.dtype(np.int32)
+            manifest['columns'][column] = {'dtype': 'category', 'vocabulary': labels}
+        else:
+            remap = None
+            dtype = np.dtype(SCHEMA[column])
+            manifest['columns'][column] = {'dtype': SCHEMA[column]}
+
+        raw = np.memmap(raw_path, dtype=dtype, mode='r', shape=(rows,)) if rows else np.empty(0, dtype)
+        out = np.lib.format.open_memmap(os.path.join(building, f'{column}.npy'), mode='w+', dtype=dtype, shape=(rows,))
+        for start in range(0, rows, chunk_size):
+            block = raw[start:start + chunk_size]
+            out[start:start + chunk_size] = remap[block] if remap is not None else block
+        out.flush()
+        del raw, out
+        os.remove(raw_path)
+
+    with open(os.path.join(building, MANIFEST), 'w') as f:
+        json.dump(manifest, f)
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(building, target)
+    return target
+
+def load_columns(source, columns=None, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Memory-map cached columns of ``source``, ingesting it first if needed.
+
+    Returns:
+        tuple: (dict of column -> read-only array, dict of column -> vocabulary list)
+    """
+    directory = ingest(source, cache_dir)
+    with open(os.path.join(directory, MANIFEST)) as f:
+        manifest = json.load(f)
+    columns = columns or list(manifest['columns'])
+    arrays = {c: np.load(os.path.join(directory, f'{c}.npy'), mmap_mode='r') for c in columns}
+    vocabularies = {c: manifest['columns'][c]['vocabulary']
+                    for c in columns if manifest['columns'][c]['dtype'] == 'category'}
+    return arrays, vocabularies
+
+def _to_frame(arrays, vocabularies, start=0, stop=None):
+    data = {}
+    for column, values in arrays.items():
+        values = values[start:stop]
+        if column in vocabularies:
+            data[column] = pd.Categorical.from_codes(values, categories=vocabularies[column])
+        else:
+            data[column] = values
+    return pd.DataFrame(data)
+
+def load_frame(source, columns=None, cache_dir=DEFAULT_CACHE_DIR):
+    """Load ``source`` as a DataFrame with pandas categoricals built over the cached codes."""
+    return _to_frame(*load_columns(source, columns, cache_dir))
+
+def iter_frames(source, chunk_size, start_chunk=0, columns=None, cache_dir=DEFAULT_CACHE_DIR):
+    """Yield ``source`` in row chunks from the cache; skipping chunks costs nothing."""
+    arrays, vocabularies = load_columns(source, columns, cache_dir)
+    rows = len(next(iter(arrays.values()))) if arrays else 0
+    for start in range(start_chunk * chunk_size, rows, chunk_size):
+        yield _to_frame(arrays, vocabularies, start, start + chunk_size)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--chunk-size', type=int, default=1_000_000)
+    parser.add_argument('--force', action='store_true', help='rebuild even if cached')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    directory = ingest(args.source, args.cache_dir, args.chunk_size, args.force)
+    ingest_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    arrays, vocabularies = load_columns(args.source, cache_dir=args.cache_dir)
+    load_seconds = time.perf_counter() - start
+
+    rows = len(next(iter(arrays.values())))
+    print(f"{args.source}: {rows:,} rows cached in {directory} ({ingest_seconds:.2f}s); "
+          f"memory-mapped load {load_seconds * 1000:.1f} ms")
+    for column, vocabulary in vocabularies.items():
+        print(f"  {column:<12} {len(vocabulary):>8,} distinct values")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
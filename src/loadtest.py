@@ -0,0 +1,434 @@
+# src/loadtest.py
+"""
+Load-test the app and the scoring service with concurrent simulated users.
+
+Targets:
+    http        N keep-alive HTTP clients posting to /predict of a local
+                scoring server, started here (--server prefork|single) or
+                already running (--url)
+    streamlit   N concurrent Streamlit sessions of app/main.py (AppTest), each
+                filling the form and clicking "Predict Revenue"; latency is
+                the click-to-result rerun
+
+Every client is closed-loop: it sends the next request as soon as the
+previous one returns. Inputs are outlets resampled from
+data/raw/revenue_prediction.csv, with small jitter on menu size and orders.
+Concurrency is ramped through --concurrency. Each level runs for --duration
+seconds and records throughput, latency percentiles, errors, and CPU and
+memory per worker process (read from /proc). The saturation point is the
+first level whose throughput gains less than --min-gain over the previous
+one, or whose p99 exceeds --slo-ms.
+
+The JSON report carries the environment, model version and serving
+configuration, so runs can be compared across releases and configurations.
+--compare flags levels whose throughput dropped or p99 latency grew beyond
+--threshold against a stored report.
+
+Usage (from the repository root):
+    python -m src.loadtest http --server prefork --workers 4 --backend numpy --output load_http.json
+    python -m src.loadtest streamlit --concurrency 1,2,4,8 --duration 20 --output load_app.json
+    python -m src.loadtest http --url http://127.0.0.1:8000 --compare load_http.json
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from app.prefork import read_smaps_rollup
+from src.benchmark import environment_metadata
+
+DEFAULT_CONCURRENCY = [1, 2, 4, 8, 16, 32]
+APP_SCRIPT = 'app/main.py'
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+
+def input_mix(n_rows, seed=0, data_path='data/raw/revenue_prediction.csv', jitter=0.05):
+    """
+    Prediction requests resampled from the dataset's outlets.
+
+    Franchise, category and city keep their joint distribution; menu size
+    and orders get multiplicative jitter so repeated outlets are not
+    identical requests.
+
+    Returns:
+        list: Dicts with franchise, category, city, menu_size and orders
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.read_csv(data_path)
+    rows = df.iloc[rng.integers(0, len(df), n_rows)]
+    menu_size = np.maximum(1, np.round(rows['No_Of_Item'].to_numpy() * rng.normal(1.0, jitter, n_rows)))
+    orders = np.maximum(0.1, rows['Order_Placed'].to_numpy() * rng.normal(1.0, jitter, n_rows)).round(1)
+    return [{'franchise': int(franchise == 'Yes'), 'category': category, 'city': city,
+             'menu_size': int(size), 'orders': float(order)}
+            for franchise, category, city, size, order in zip(rows['Franchise'], rows['Category'], rows['City'],
+                                                              menu_size, orders)]
+
+def cpu_seconds(pid):
+    """User plus system CPU time of a process, from /proc/<pid>/stat."""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rpartition(')')[2].split()
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+def child_pids(pid):
+    """Direct children of a process."""
+    children = []
+    for task in os.listdir(f'/proc/{pid}/task'):
+        with open(f'/proc/{pid}/task/{task}/children') as f:
+            children.extend(int(child) for child in f.read().split())
+    return children
+
+class HttpClient:
+    """One keep-alive connection posting single-row predictions."""
+
+    def __init__(self, url):
+        parsed = urllib.parse.urlsplit(url)
+        self.connection = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=60)
+
+    def predict(self, row):
+        self.connection.request('POST', '/predict', json.dumps(row), {'Content-Type': 'application/json'})
+        response = self.connection.getresponse()
+        body = response.read()
+        if response.status != 200:
+            raise RuntimeError(f'HTTP {response.status}: {body[:200].decode(errors="replace")}')
+
+    def close(self):
+        self.connection.close()
+
+class StreamlitSession:
+    """One simulated analyst session of the Streamlit app."""
+
+    def __init__(self, script=APP_SCRIPT, timeout=120):
+        from streamlit.testing.v1 import AppTest
+        # Sessions run on plain threads, which Streamlit warns about on every rerun
+        logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').setLevel(logging.ERROR)
+        self.app = AppTest.from_file(os.path.abspath(script), default_timeout=timeout)
+        self.app.run()
+        self._raise_exceptions()
+
+    def _raise_exceptions(self):
+        if self.app.exception:
+            raise RuntimeError(self.app.exception[0].value)
+
+    def predict(self, row):
+        app = self.app
+        app.selectbox[0].set_value('Franchised' if row['franchise'] else 'Independent')
+        if row['category'] in app.selectbox[1].options:
+            app.selectbox[1].set_value(row['category'])
+        app.number_input[0].set_value(row['menu_size'])
+        app.slider[0].set_value(int(np.clip(round(row['orders']), 1, 500)))
+        app.button[0].click().run()
+        self._raise_exceptions()
+
+    def close(self):
+        pass
+
+def run_level(make_client, rows, concurrency, duration, worker_pids, seed=0):
+    """
+    Run ``concurrency`` closed-loop clients for ``duration`` seconds.
+
+    Clients are created (connections opened, sessions loaded) before the
+    measurement window opens, so only steady-state requests are timed.
+
+    Returns:
+        dict: Throughput, latency percentiles, errors and per-worker CPU/memory
+    """
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    first_error = []
+    ready = threading.Barrier(concurrency + 1)
+    stop = threading.Event()
+    window = {}
+
+    def client_loop(index):
+        try:
+            client = make_client()
+        except Exception as exc:
+            first_error.append(f'{type(exc).__name__}: {exc}')
+            ready.abort()
+            return
+        rng = np.random.default_rng(seed + index)
+        try:
+            ready.wait()
+            while not stop.is_set():
+                row = rows[rng.integers(len(rows))]
+                start = time.perf_counter()
+                try:
+                    client.predict(row)
+                except Exception as exc:
+                    errors[index] += 1
+                    if not first_error:
+                        first_error.append(f'{type(exc).__name__}: {exc}')
+                    continue
+                end = time.perf_counter()
+                if end <= window.get('end', float('inf')):
+                    latencies[index].append(end - start)
+        except threading.BrokenBarrierError:
+            pass
+        finally:
+            client.close()
+
+    threads = [threading.Thread(target=client_loop, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    try:
+        ready.wait()
+    except threading.BrokenBarrierError:
+        raise RuntimeError(f'Could not start {concurrency} clients: {first_error[0]}') from None
+
+    pids = [os.getpid()] + [pid for pid in worker_pids if pid != os.getpid()]
+    cpu_before = {pid: cpu_seconds(pid) for pid in pids}
+    start = time.perf_counter()
+    time.sleep(duration)
+    elapsed = time.perf_counter() - start
+    window['end'] = start + elapsed
+    cpu_after = {pid: cpu_seconds(pid) for pid in pids}
+    memory = {pid: read_smaps_rollup(pid) for pid in pids}
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    timings = np.array([value for client in latencies for value in client]) * 1000
+    percentile = lambda q: float(np.percentile(timings, q)) if len(timings) else None
+    workers = [{'pid': pid, 'cpu_percent': 100 * (cpu_after[pid] - cpu_before[pid]) / elapsed,
+                'rss_mb': memory[pid]['rss_mb'], 'pss_mb': memory[pid]['pss_mb']}
+               for pid in worker_pids]
+    generator = {'cpu_percent': 100 * (cpu_after[os.getpid()] - cpu_before[os.getpid()]) / elapsed,
+                 'rss_mb': memory[os.getpid()]['rss_mb']}
+    return {
+        'concurrency': concurrency,
+        'seconds': elapsed,
+        'requests': len(timings),
+        'errors': sum(errors),
+        'first_error': first_error[0] if first_error else None,
+        'throughput_rps': len(timings) / elapsed,
+        'latency_ms': {'mean': float(timings.mean()) if len(timings) else None, 'p50': percentile(50),
+                       'p90': percentile(90), 'p99': percentile(99), 'max': percentile(100)},
+        'workers': workers,
+        'worker_cpu_percent_total': sum(worker['cpu_percent'] for worker in workers),
+        'worker_rss_mb_total': sum(worker['rss_mb'] for worker in workers),
+        'generator': generator,
+    }
+
+def find_saturation(levels, min_gain=0.1, slo_ms=None):
+    """
+    First concurrency level past the knee of the throughput curve.
+
+    Returns:
+        dict: The last level worth running ('concurrency', 'throughput_rps',
+        'p99_ms'), the level that saturated and why; None when throughput
+        kept scaling over the whole ramp
+    """
+    best = None
+    for level in levels:
+        p99 = level['latency_ms']['p99']
+        reason = None
+        if slo_ms is not None and (p99 is None or p99 > slo_ms):
+            reason = f'p99 {p99:.1f} ms above the {slo_ms:g} ms SLO' if p99 is not None else 'no successful requests'
+        elif best is not None and level['throughput_rps'] < (1 + min_gain) * best['throughput_rps']:
+            reason = f"throughput gained less than {min_gain:.0%} over {best['concurrency']} clients"
+        if reason is not None:
+            return {
+                'concurrency': best['concurrency'] if best else None,
+                'throughput_rps': best['throughput_rps'] if best else None,
+                'p99_ms': best['latency_ms']['p99'] if best else None,
+                'saturated_at': level['concurrency'],
+                'reason': reason,
+            }
+        best = level
+    return None
+
+def compare(current, baseline, threshold=0.2):
+    """
+    Flag concurrency levels that got slower than the baseline report.
+
+    Returns:
+        list: One dict per regressed (concurrency, metric) with both values and the ratio
+    """
+    reference = {level['concurrency']: level for level in baseline['levels']}
+    regressions = []
+    for level in current['levels']:
+        base = reference.get(level['concurrency'])
+        if base is None:
+            continue
+        checks = [('throughput_rps', base['throughput_rps'] / max(level['throughput_rps'], 1e-9))]
+        if level['latency_ms']['p99'] and base['latency_ms']['p99']:
+            checks.append(('p99_ms', level['latency_ms']['p99'] / base['latency_ms']['p99']))
+        for metric, ratio in checks:
+            if ratio > 1 + threshold:
+                regressions.append({
+                    'concurrency': level['concurrency'],
+                    'metric': metric,
+                    'baseline': base['throughput_rps'] if metric == 'throughput_rps' else base['latency_ms']['p99'],
+                    'current': level['throughput_rps'] if metric == 'throughput_rps' else level['latency_ms']['p99'],
+                    'ratio': ratio,
+                })
+    return regressions
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(kind, backend, workers, timeout=120.0):
+    """
+    Start a local scoring server in a subprocess and wait until it serves.
+
+    Returns:
+        tuple: (Popen, base URL, worker pids)
+    """
+    port = _free_port()
+    module = 'app.prefork' if kind == 'prefork' else 'app.server'
+    command = [sys.executable, '-m', module, '--port', str(port), '--backend', backend]
+    if kind == 'prefork':
+        command += ['--workers', str(workers)]
+    process = subprocess.Popen(command, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            urllib.request.urlopen(url + '/healthz', timeout=2).read()
+            break
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError(f'{module} did not start serving on {url}') from None
+            time.sleep(0.2)
+    pids = child_pids(process.pid) if kind == 'prefork' else [process.pid]
+    while kind == 'prefork' and len(pids) < workers and time.monotonic() < deadline:
+        time.sleep(0.2)
+        pids = child_pids(process.pid)
+    return process, url, pids
+
+def run_load_test(target, concurrency=DEFAULT_CONCURRENCY, duration=10.0, rows=None, url=None, server='prefork',
+                  backend=None, workers=None, worker_pids=(), min_gain=0.1, slo_ms=None, seed=0, log=sys.stderr):
+    """
+    Ramp concurrency against one target and build the report.
+
+    Args:
+        target (str): 'http' or 'streamlit'
+        concurrency (list): Client counts to run, ascending
+        duration (float): Measured seconds per level
+        rows (list): Request inputs (default: input_mix(10000))
+        url (str): Running scoring server; None starts one (http target)
+        server (str): 'prefork' or 'single' server to start
+        backend (str): Model backend of the started server or app
+        workers (int): Prefork workers to start
+        worker_pids: Processes to measure for an already running server
+
+    Returns:
+        dict: 'meta', 'config', 'levels' and 'saturation'
+    """
+    from app.utils.loader import DEFAULT_BACKEND
+    backend = backend or DEFAULT_BACKEND
+    workers = workers or os.cpu_count()
+    rows = rows or input_mix(10000, seed)
+    process = None
+    if target == 'http':
+        if url is None:
+            process, url, worker_pids = start_server(server, backend, workers)
+        make_client = lambda: HttpClient(url)
+        config = {'target': 'http', 'url': url, 'server': server if process else 'external',
+                  'backend': backend if process else None, 'workers': len(worker_pids)}
+    else:
+        # Sessions share this process, as they share one Streamlit server process
+        os.environ['REVENUE_MODEL_BACKEND'] = backend
+        os.environ.setdefault('REVENUE_PREDICTION_DB', os.path.join(tempfile.gettempdir(), 'loadtest_predictions.sqlite3'))
+        make_client = StreamlitSession
+        worker_pids = [os.getpid()]
+        config = {'target': 'streamlit', 'script': APP_SCRIPT, 'backend': backend, 'workers': 1}
+    config.update(duration_s=duration, cpu_count=os.cpu_count(), input_rows=len(rows))
+
+    levels = []
+    try:
+        for clients in concurrency:
+            level = run_level(make_client, rows, clients, duration, list(worker_pids), seed)
+            levels.append(level)
+            if log is not None:
+                latency = level['latency_ms']
+                print(f"{clients:>5} clients  {level['throughput_rps']:>10,.1f} req/s  "
+                      f"p50 {latency['p50'] or 0:>9.1f} ms  p99 {latency['p99'] or 0:>9.1f} ms  "
+                      f"errors {level['errors']:>5}  worker CPU {level['worker_cpu_percent_total']:>6.0f}%  "
+                      f"RSS {level['worker_rss_mb_total']:>8.0f} MB", file=log)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    return {
+        'meta': environment_metadata([backend]),
+        'config': config,
+        'levels': levels,
+        'saturation': find_saturation(levels, min_gain, slo_ms),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('target', choices=['http', 'streamlit'])
+    parser.add_argument('--concurrency', default=','.join(map(str, DEFAULT_CONCURRENCY)),
+                        help='comma-separated client counts to ramp through')
+    parser.add_argument('--duration', type=float, default=10.0, help='measured seconds per concurrency level')
+    parser.add_argument('--url', help='load an already running scoring server instead of starting one')
+    parser.add_argument('--pids', default='', help='comma-separated worker pids to measure with --url')
+    parser.add_argument('--server', choices=['prefork', 'single'], default='prefork', help='server to start (http)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='prefork workers to start')
+    parser.add_argument('--backend', choices=['keras', 'numpy', 'tflite'], help='default: REVENUE_MODEL_BACKEND')
+    parser.add_argument('--min-gain', type=float, default=0.1,
+                        help='throughput gain per level below which the ramp counts as saturated')
+    parser.add_argument('--slo-ms', type=float, help='p99 latency above which a level counts as saturated')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='loadtest_results.json')
+    parser.add_argument('--compare', metavar='BASELINE', help='report from a previous run')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed relative throughput drop / p99 growth (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    report = run_load_test(
+        args.target,
+        concurrency=[int(clients) for clients in args.concurrency.split(',')],
+        duration=args.duration,
+        rows=input_mix(10000, args.seed),
+        url=args.url,
+        server=args.server,
+        backend=args.backend,
+        workers=args.workers,
+        worker_pids=[int(pid) for pid in args.pids.split(',') if pid],
+        min_gain=args.min_gain,
+        slo_ms=args.slo_ms,
+        seed=args.seed
+    )
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    saturation = report['saturation']
+    if saturation is None:
+        print(f"Throughput kept scaling up to {report['levels'][-1]['concurrency']} clients")
+    else:
+        print(f"Saturated at {saturation['saturated_at']} clients ({saturation['reason']}); "
+              f"best: {saturation['concurrency']} clients, {saturation['throughput_rps'] or 0:,.1f} req/s, "
+              f"p99 {saturation['p99_ms'] or 0:.1f} ms")
+    print(f"Wrote {len(report['levels'])} levels to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['metric']} @ {r['concurrency']} clients: "
+                  f"{r['baseline']:,.1f} -> {r['current']:,.1f} ({r['ratio']:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
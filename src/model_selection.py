@@ -0,0 +1,238 @@
+# src/model_selection.py
+"""
+Cross-validated model comparison across linear, tree-ensemble and neural candidates.
+
+Every (candidate, hyperparameter set, fold) is an independent task on a
+process pool; each worker caps its BLAS/OpenMP/TensorFlow threads so
+workers x threads matches the host instead of oversubscribing it. Data comes
+from the cached data stages of ``src/train.py`` (load -> features), and each
+fold fits its own scalers so nothing leaks from the held-out fold.
+
+The leaderboard reports mean/std MAE, RMSE and R² across folds plus
+wall-clock fit time, batch predict time and single-row predict latency, so
+models can be chosen on accuracy and serving cost together.
+
+Usage (from the repository root):
+    python -m src.model_selection --folds 5 --workers 4 --output model_selection.csv
+    python -m src.model_selection --candidates linear,gradient_boosting --grid grid.json
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from src.train import DEFAULT_CONFIG, merge_config, regression_metrics, run_data_stages
+
+# Hyperparameter grids per candidate; each value list is expanded as a product
+DEFAULT_GRID = {
+    'linear': {},
+    'random_forest': {
+        'n_estimators': [200],
+        'max_depth': [None, 6],
+    },
+    'gradient_boosting': {
+        'n_estimators': [100, 300],
+        'learning_rate': [0.05, 0.1],
+        'max_depth': [2, 3],
+    },
+    'neural_network': {
+        'units': [[128, 64, 32], [64, 32]],
+        'epochs': [100],
+    },
+}
+
+# Rows timed one at a time to estimate single-request serving latency
+LATENCY_SAMPLES = 20
+
+class NetworkRegressor:
+    """Scale features and target, then fit the training pipeline's Keras network."""
+
+    def __init__(self, **params):
+        self.config = merge_config(DEFAULT_CONFIG['model'], params)
+        if len(self.config['units']) != len(self.config['dropout']):
+            # Trim or pad per-layer settings to the requested depth
+            depth = len(self.config['units'])
+            for key, fill in (('dropout', 0.0), ('batch_norm', False), ('l2', 0.0)):
+                values = list(self.config[key])[:depth]
+                self.config[key] = values + [fill] * (depth - len(values))
+
+    def fit(self, X, y):
+        from sklearn.preprocessing import StandardScaler
+        from src.train import train_step
+
+        self.feature_scaler = StandardScaler().fit(X)
+        self.target_scaler = StandardScaler().fit(y.reshape(-1, 1))
+        self.model = train_step({
+            'X_train': self.feature_scaler.transform(X),
+            'y_train': self.target_scaler.transform(y.reshape(-1, 1)),
+        }, self.config)
+        return self
+
+    def predict(self, X):
+        scaled = self.model.predict(self.feature_scaler.transform(X), verbose=0)
+        return self.target_scaler.inverse_transform(scaled).ravel()
+
+def make_estimator(name, params):
+    """Instantiate candidate ``name`` with ``params``."""
+    if name == 'neural_network':
+        return NetworkRegressor(**params)
+
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    if name == 'linear':
+        from sklearn.linear_model import LinearRegression
+        model = LinearRegression(**params)
+    elif name == 'random_forest':
+        from sklearn.ensemble import RandomForestRegressor
+        model = RandomForestRegressor(random_state=42, n_jobs=1, **params)
+    elif name == 'gradient_boosting':
+        from sklearn.ensemble import GradientBoostingRegressor
+        model = GradientBoostingRegressor(random_state=42, **params)
+    else:
+        raise ValueError(f"Unknown candidate '{name}'")
+    return make_pipeline(StandardScaler(), model)
+
+def expand_grid(grid):
+    """Yield every parameter combination of a ``{name: [values]}`` grid."""
+    names = sorted(grid)
+    for values in itertools.product(*(grid[name] for name in names)):
+        yield dict(zip(names, values))
+
+# Per-process dataset, populated once by the pool initializer
+_data = None
+
+def _init_worker(X, y, threads_per_worker, uses_tensorflow):
+    global _data
+    from app.utils.parallel import limit_threads
+    limit_threads(threads_per_worker, tensorflow=uses_tensorflow)
+    _data = (X, y)
+
+def _evaluate_fold(name, params, fold, train_index, test_index):
+    X, y = _data
+    estimator = make_estimator(name, params)
+
+    start = time.perf_counter()
+    estimator.fit(X[train_index], y[train_index])
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictions = estimator.predict(X[test_index])
+    predict_seconds = time.perf_counter() - start
+
+    row_timings = []
+    for i in test_index[:LATENCY_SAMPLES]:
+        start = time.perf_counter()
+        estimator.predict(X[i:i + 1])
+        row_timings.append(time.perf_counter() - start)
+
+    return dict(
+        regression_metrics(y[test_index], predictions),
+        candidate=name,
+        params=params,
+        fold=fold,
+        fit_s=fit_seconds,
+        predict_s=predict_seconds,
+        predict_row_ms=statistics.median(row_timings) * 1000,
+    )
+
+def summarize(fold_results):
+    """Aggregate per-fold results into one leaderboard row per (candidate, params)."""
+    groups = {}
+    for result in fold_results:
+        key = (result['candidate'], json.dumps(result['params'], sort_keys=True))
+        groups.setdefault(key, []).append(result)
+
+    rows = []
+    for (candidate, params), results in groups.items():
+        row = {'candidate': candidate, 'params': params, 'folds': len(results)}
+        for metric in ('mae', 'rmse', 'r2'):
+            values = [r[metric] for r in results]
+            row[f'{metric}_mean'] = float(np.mean(values))
+            row[f'{metric}_std'] = float(np.std(values))
+        for timing in ('fit_s', 'predict_s', 'predict_row_ms'):
+            row[f'{timing}_mean'] = float(np.mean([r[timing] for r in results]))
+        rows.append(row)
+    return pd.DataFrame(rows).sort_values('rmse_mean').reset_index(drop=True)
+
+def run_model_selection(grid=DEFAULT_GRID, folds=5, workers=None, threads_per_worker=1,
+                        config=DEFAULT_CONFIG, seed=42, log=print):
+    """
+    Evaluate every candidate configuration with k-fold CV on a process pool.
+
+    Returns:
+        pd.DataFrame: Leaderboard sorted by mean RMSE
+    """
+    from sklearn.model_selection import KFold
+
+    outputs, _ = run_data_stages(config, log=lambda message: None)
+    X = outputs['features']['X'].to_numpy(dtype=np.float64)
+    y = outputs['features']['y'].to_numpy(dtype=np.float64)
+    splits = list(KFold(n_splits=folds, shuffle=True, random_state=seed).split(X))
+
+    tasks = [
+        (name, params, fold, train_index, test_index)
+        for name, candidate_grid in grid.items()
+        for params in expand_grid(candidate_grid)
+        for fold, (train_index, test_index) in enumerate(splits)
+    ]
+    workers = workers or os.cpu_count()
+    log(f"Evaluating {len(tasks)} fits ({len(tasks) // folds} configs x {folds} folds) "
+        f"on {workers} workers x {threads_per_worker} threads")
+
+    fold_results = []
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                             initargs=(X, y, threads_per_worker, 'neural_network' in grid)) as pool:
+        futures = [pool.submit(_evaluate_fold, *task) for task in tasks]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            fold_results.append(result)
+            log(f"  [{done:>3}/{len(tasks)}] {result['candidate']:<18} fold {result['fold']}  "
+                f"RMSE {result['rmse']:>12,.0f}  fit {result['fit_s']:6.2f}s")
+
+    return summarize(fold_results)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--threads-per-worker', type=int, default=1)
+    parser.add_argument('--candidates', help=f"comma-separated subset of {','.join(DEFAULT_GRID)}")
+    parser.add_argument('--grid', help='JSON file of {candidate: {param: [values]}} replacing the default grids')
+    parser.add_argument('--config', help='training pipeline config JSON (data stages)')
+    parser.add_argument('--output', default='model_selection.csv')
+    args = parser.parse_args(argv)
+
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid) as f:
+            grid = json.load(f)
+    if args.candidates:
+        grid = {name: grid[name] for name in args.candidates.split(',')}
+
+    config = DEFAULT_CONFIG
+    if args.config:
+        with open(args.config) as f:
+            config = merge_config(config, json.load(f))
+
+    leaderboard = run_model_selection(grid, args.folds, args.workers, args.threads_per_worker, config)
+    leaderboard.to_csv(args.output, index=False)
+
+    columns = ['candidate', 'params', 'mae_mean', 'rmse_mean', 'r2_mean', 'fit_s_mean', 'predict_row_ms_mean']
+    with pd.option_context('display.max_colwidth', 60, 'display.width', 200):
+        print(leaderboard[columns].to_string(index=False, float_format=lambda v: f'{v:,.3f}'))
+    print(f"Leaderboard written to {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
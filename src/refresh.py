@@ -0,0 +1,222 @@
+# src/refresh.py
+"""
+Incrementally refresh the served model with a batch of new outlet records.
+
+Instead of retraining on the full history, the refresh:
+  1. trims the new rows' revenue to the same quantiles the training
+     pipeline trims (features.target_quantiles), then folds them into the
+     existing feature and target scalers with running statistics
+     (StandardScaler.partial_fit),
+  2. warm-starts the existing network for a few epochs on the new rows at
+     a reduced learning rate, and
+  3. compares the previous and refreshed artifacts on a held-out slice of
+     the new data (at least --min-holdout-rows rows), refusing to publish a
+     regression unless --force is given.
+
+Cost scales with the size of the new batch, not the history.
+
+Usage (from the repository root):
+    python -m src.refresh data/raw/new_outlets.csv --epochs 5 --output-dir models
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from app.utils.loader import load_feature_scaler, load_keras_model, load_target_scaler, resolve_artifacts
+from src.train import (
+    DEFAULT_CONFIG, FEATURE_COLUMNS, TARGET_COLUMN, clean_step, regression_metrics, run_data_stages, save_artifacts
+)
+
+def training_vocabularies(model_dir='models', config=DEFAULT_CONFIG):
+    """
+    Category vocabularies the served model was trained with.
+
+    Read from the model's feature-transform artifact when present, otherwise
+    recovered from the cached encode step of the training pipeline.
+    """
+    path = os.path.join(model_dir, 'feature_transform.npz')
+    if os.path.exists(path):
+        from app.utils.transform import FeatureTransform
+        return {column: labels.tolist() for column, labels in FeatureTransform.load(path).vocabularies.items()}
+    outputs, _ = run_data_stages(config, log=lambda message: None)
+    return outputs['encode']['vocabularies']
+
+def encode_with_vocabularies(df, vocabularies):
+    """
+    Encode categorical columns with fixed training vocabularies.
+
+    Rows whose labels are not in the vocabulary cannot be represented by the
+    existing model and are dropped.
+
+    Returns:
+        tuple: (encoded frame, number of rows dropped)
+    """
+    df = df.copy()
+    known = np.ones(len(df), dtype=bool)
+    for column, vocabulary in vocabularies.items():
+        codes = pd.Index(vocabulary).get_indexer(df[column])
+        known &= codes >= 0
+        df[column] = codes
+    return df[known].reset_index(drop=True), int((~known).sum())
+
+# Fewest held-out new rows the publish decision may rest on
+MIN_HOLDOUT_ROWS = 10
+
+def trim_target(df, quantiles):
+    """
+    Drop rows whose revenue lies outside ``quantiles``, as features_step does for training.
+
+    Extreme revenues would otherwise move the scalers' running statistics
+    and the fine-tuning towards outliers the model was never trained on.
+
+    Returns:
+        tuple: (trimmed frame, number of rows dropped)
+    """
+    low, high = df[TARGET_COLUMN].quantile(quantiles)
+    keep = (df[TARGET_COLUMN] > low) & (df[TARGET_COLUMN] < high)
+    return df[keep].reset_index(drop=True), int((~keep).sum())
+
+def build_xy(df):
+    """Derive Order_Item_Ratio and return model features and target."""
+    df = df.copy()
+    df['No_Of_Item'] = df['No_Of_Item'].replace(0, 1)  # Prevent division by zero
+    df['Order_Item_Ratio'] = df['Order_Placed'] / df['No_Of_Item']
+    return df[FEATURE_COLUMNS].to_numpy(dtype=np.float64), df[TARGET_COLUMN].to_numpy(dtype=np.float64)
+
+def evaluate(model, feature_scaler, target_scaler, X, y):
+    """Metrics of a (model, scalers) artifact set on raw features and revenue."""
+    scaled = model.predict(feature_scaler.transform(X), verbose=0)
+    return regression_metrics(y, target_scaler.inverse_transform(scaled).ravel())
+
+def refresh(new_data, model, feature_scaler, target_scaler, vocabularies,
+            epochs=5, learning_rate=1e-4, batch_size=32, holdout=0.2, seed=42,
+            min_holdout_rows=MIN_HOLDOUT_ROWS):
+    """
+    Fold new records into the scalers and fine-tune the model on them.
+
+    Args:
+        new_data (pd.DataFrame): New records with the raw dataset schema (incl. Revenue)
+        model: Current Keras model (left untouched; a copy is fine-tuned)
+        feature_scaler: Current fitted feature StandardScaler
+        target_scaler: Current fitted target StandardScaler
+        vocabularies (dict): Category vocabularies used at training time
+        epochs (int): Fine-tuning epochs
+        learning_rate (float): Fine-tuning learning rate
+        batch_size (int): Fine-tuning batch size
+        holdout (float): Fraction of new rows held out to compare old vs new artifacts
+        seed (int): Random seed for the holdout split and fine-tuning
+        min_holdout_rows (int): Fewest held-out rows to compare on (ValueError below)
+
+    Returns:
+        dict: Refreshed model and scalers plus before/after metrics and row counts
+    """
+    from sklearn.model_selection import train_test_split
+    from tensorflow.keras.models import clone_model
+    from tensorflow.keras.optimizers import Adam
+    from tensorflow.keras.utils import set_random_seed
+
+    encoded, dropped = encode_with_vocabularies(clean_step(new_data, DEFAULT_CONFIG['clean']), vocabularies)
+    encoded, trimmed = trim_target(encoded, DEFAULT_CONFIG['features']['target_quantiles'])
+    X, y = build_xy(encoded)
+    n_holdout = int(np.ceil(holdout * len(X)))
+    if n_holdout < min_holdout_rows or n_holdout >= len(X):
+        raise ValueError(f"{len(X)} usable new rows ({dropped} dropped for unknown categories, {trimmed} outside "
+                         f"the target quantiles) give {n_holdout} held-out rows; need at least {min_holdout_rows} "
+                         f"held out and some left to fine-tune on")
+    X_fit, X_holdout, y_fit, y_holdout = train_test_split(X, y, test_size=n_holdout, random_state=seed)
+
+    before = evaluate(model, feature_scaler, target_scaler, X_holdout, y_holdout)
+
+    # Running-statistics update: mean/variance combine with n_samples_seen_
+    new_feature_scaler = copy.deepcopy(feature_scaler)
+    new_target_scaler = copy.deepcopy(target_scaler)
+    new_feature_scaler.partial_fit(pd.DataFrame(X_fit, columns=FEATURE_COLUMNS)
+                                   if hasattr(feature_scaler, 'feature_names_in_') else X_fit)
+    new_target_scaler.partial_fit(y_fit.reshape(-1, 1))
+
+    set_random_seed(seed)
+    new_model = clone_model(model)
+    new_model.set_weights(model.get_weights())
+    new_model.compile(optimizer=Adam(learning_rate=learning_rate), loss='mean_squared_error', metrics=['mae'])
+    new_model.fit(
+        new_feature_scaler.transform(X_fit),
+        new_target_scaler.transform(y_fit.reshape(-1, 1)),
+        epochs=epochs,
+        batch_size=batch_size,
+        verbose=0
+    )
+
+    after = evaluate(new_model, new_feature_scaler, new_target_scaler, X_holdout, y_holdout)
+    return {
+        'model': new_model,
+        'feature_scaler': new_feature_scaler,
+        'target_scaler': new_target_scaler,
+        'before': before,
+        'after': after,
+        'rows_fit': len(X_fit),
+        'rows_holdout': len(X_holdout),
+        'rows_dropped': dropped,
+        'rows_trimmed': trimmed,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('new_data', nargs='+', help='CSV file(s) of new records with Revenue')
+    parser.add_argument('--model-dir', default='models', help='model registry (or flat artifact directory) to refresh')
+    parser.add_argument('--output-dir', default='models', help='where to write the refreshed artifacts')
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--learning-rate', type=float, default=1e-4)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--holdout', type=float, default=0.2)
+    parser.add_argument('--min-holdout-rows', type=int, default=MIN_HOLDOUT_ROWS,
+                        help='refuse to compare on fewer held-out rows (default: %(default)s)')
+    parser.add_argument('--force', action='store_true', help='publish even if holdout MAE got worse')
+    args = parser.parse_args(argv)
+
+    new_data = pd.concat([pd.read_csv(path) for path in args.new_data], ignore_index=True)
+    version, model_dir = resolve_artifacts('keras', args.model_dir)
+    print(f"Refreshing model {version}")
+    vocabularies = training_vocabularies(model_dir)
+    try:
+        result = refresh(
+            new_data,
+            load_keras_model(os.path.join(model_dir, 'neural_network_model.keras')),
+            load_feature_scaler(os.path.join(model_dir, 'feature_scaler.pkl')),
+            load_target_scaler(os.path.join(model_dir, 'target_scaler.pkl')),
+            vocabularies,
+            epochs=args.epochs,
+            learning_rate=args.learning_rate,
+            batch_size=args.batch_size,
+            holdout=args.holdout,
+            min_holdout_rows=args.min_holdout_rows
+        )
+    except ValueError as exc:
+        print(f"Refresh not run: {exc}")
+        return 1
+
+    before, after = result['before'], result['after']
+    print(f"Fine-tuned on {result['rows_fit']} rows, evaluated on {result['rows_holdout']} held-out rows "
+          f"({result['rows_dropped']} dropped for unknown categories, "
+          f"{result['rows_trimmed']} outside the target quantiles)")
+    for metric in ('mae', 'rmse', 'r2'):
+        print(f"  {metric.upper():<5} {before[metric]:>16,.3f} -> {after[metric]:>16,.3f}  "
+              f"({after[metric] - before[metric]:+,.3f})")
+
+    if after['mae'] > before['mae'] and not args.force:
+        print("Refresh not published: holdout MAE got worse (use --force to publish anyway)")
+        return 1
+
+    metrics = dict(after, previous=before, refreshed_rows=result['rows_fit'], refreshed_from=version)
+    save_artifacts({'dir': args.output_dir, 'export_numpy': True, 'publish': True}, result['model'], result, metrics,
+                   vocabularies=vocabularies)
+    print(json.dumps({'before': before, 'after': after}))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,95 +1,409 @@
 # src/train.py
+"""
+Staged, cached training pipeline for the revenue model.
+
+Steps run in order: load -> clean -> encode -> features -> split -> scale ->
+train -> evaluate. Each step's output is cached under ``cache.dir`` keyed by
+a hash of the step's code, its config section and the upstream key (the
+load step hashes the raw file), so changing only ``model`` hyperparameters
+reuses every data stage and re-runs train/evaluate alone.
+
+Artifacts written to ``output.dir``: feature_scaler.pkl, target_scaler.pkl,
+neural_network_model.keras, training_metrics.json, feature_transform.npz and
+(optionally) the NumPy engine neural_network_model.npz. With
+``output.publish`` they are then snapshotted as a new version of the model
+registry in that directory and made current, so running servers swap to it
+without a restart.
+
+Usage (from the repository root):
+    python -m src.train                          # defaults below
+    python -m src.train --config configs/train.json
+    python -m src.train --set model.epochs=20 --set output.dir=/tmp/models
+"""
+
+import argparse
+import copy
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
 
-import pandas as pd
-import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LinearRegression
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense, Dropout
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import joblib
+import numpy as np
+import pandas as pd
+
+FEATURE_COLUMNS = ['Franchise', 'Category', 'No_Of_Item', 'Order_Placed', 'Order_Item_Ratio']
+TARGET_COLUMN = 'Revenue'
+
+DEFAULT_CONFIG = {
+    'data': {
+        'path': os.path.join('data', 'raw', 'revenue_prediction.csv'),
+        # Read through the columnar ingest cache (src/ingest.py) instead of re-parsing the CSV
+        'ingest_cache': True,
+    },
+    'clean': {
+        'drop_duplicates': True,
+    },
+    'encode': {
+        'columns': ['Franchise', 'Category'],
+    },
+    'features': {
+        # Revenue outside these quantiles is dropped before training
+        'target_quantiles': [0.05, 0.95],
+    },
+    'split': {
+        'test_size': 0.2,
+        'random_state': 42,
+    },
+    'scale': {},
+    'model': {
+        'units': [128, 64, 32],
+        'dropout': [0.3, 0.2, 0.0],
+        'batch_norm': [True, True, False],
+        'l2': [0.0, 0.01, 0.0],
+        'learning_rate': 0.001,
+        'epochs': 100,
+        'batch_size': 32,
+        'validation_split': 0.2,
+        'patience': 10,
+        'seed': 42,
+    },
+    'output': {
+        'dir': 'models',
+        'export_numpy': True,
+        'publish': True,
+    },
+    'cache': {
+        'dir': os.path.join('.cache', 'pipeline'),
+        'enabled': True,
+    },
+}
+
+# ---------------------------------------------------------------------------
+# Steps
+# ---------------------------------------------------------------------------
+
+def load_step(config):
+    """Read the raw dataset."""
+    if config.get('ingest_cache'):
+        from src.ingest import load_frame
+        return load_frame(config['path'])
+    return pd.read_csv(config['path'])
+
+def clean_step(df, config):
+    """Drop incomplete and duplicate rows."""
+    df = df.dropna()
+    if config['drop_duplicates']:
+        df = df.drop_duplicates()
+    return df.reset_index(drop=True)
+
+def encode_step(df, config):
+    """Encode categorical columns as sorted category codes (as the served scalers expect)."""
+    df = df.copy()
+    vocabularies = {}
+    for column in config['columns']:
+        categorical = df[column].astype('category').cat.remove_unused_categories()
+        vocabularies[column] = list(categorical.cat.categories)
+        df[column] = categorical.cat.codes
+    return {'frame': df, 'vocabularies': vocabularies}
+
+def features_step(encoded, config):
+    """Derive Order_Item_Ratio, trim target outliers and select model columns."""
+    df = encoded['frame'].copy()
+    df['No_Of_Item'] = df['No_Of_Item'].replace(0, 1)  # Prevent division by zero
+    df['Order_Item_Ratio'] = df['Order_Placed'] / df['No_Of_Item']
+
+    low, high = df[TARGET_COLUMN].quantile(config['target_quantiles'])
+    df = df[(df[TARGET_COLUMN] > low) & (df[TARGET_COLUMN] < high)]
+    return {'X': df[FEATURE_COLUMNS], 'y': df[TARGET_COLUMN], 'vocabularies': encoded['vocabularies']}
+
+def split_step(features, config):
+    """Hold out a test set."""
+    from sklearn.model_selection import train_test_split
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        features['X'], features['y'],
+        test_size=config['test_size'],
+        random_state=config['random_state']
+    )
+    return {'X_train': X_train, 'X_test': X_test, 'y_train': y_train, 'y_test': y_test}
+
+def scale_step(split, config):
+    """Fit feature and target scalers on the training split."""
+    from sklearn.preprocessing import StandardScaler
+
+    feature_scaler = StandardScaler()
+    target_scaler = StandardScaler()
+    return {
+        'feature_scaler': feature_scaler.fit(split['X_train']),
+        'target_scaler': target_scaler.fit(split['y_train'].values.reshape(-1, 1)),
+        'X_train': feature_scaler.transform(split['X_train']),
+        'X_test': feature_scaler.transform(split['X_test']),
+        'y_train': target_scaler.transform(split['y_train'].values.reshape(-1, 1)),
+        'y_test': split['y_test'].to_numpy(),
+    }
+
+def build_network(n_features, config):
+    """Build and compile the Dense/BatchNormalization/Dropout regression network."""
+    from tensorflow.keras.layers import BatchNormalization, Dense, Dropout, Input
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.optimizers import Adam
+    from tensorflow.keras.regularizers import l2
+
+    layers = [Input(shape=(n_features,))]
+    for units, dropout, batch_norm, penalty in zip(config['units'], config['dropout'],
+                                                    config['batch_norm'], config['l2']):
+        layers.append(Dense(units, activation='relu', kernel_regularizer=l2(penalty) if penalty else None))
+        if batch_norm:
+            layers.append(BatchNormalization())
+        if dropout:
+            layers.append(Dropout(dropout))
+    layers.append(Dense(1))
+
+    model = Sequential(layers)
+    model.compile(optimizer=Adam(learning_rate=config['learning_rate']), loss='mean_squared_error', metrics=['mae'])
+    return model
+
+def train_step(scaled, config):
+    """Train the network with early stopping on a validation split."""
+    from tensorflow.keras.callbacks import EarlyStopping
+    from tensorflow.keras.utils import set_random_seed
+
+    set_random_seed(config['seed'])
+    model = build_network(scaled['X_train'].shape[1], config)
+    model.fit(
+        scaled['X_train'], scaled['y_train'],
+        epochs=config['epochs'],
+        batch_size=config['batch_size'],
+        validation_split=config['validation_split'],
+        callbacks=[EarlyStopping(patience=config['patience'], restore_best_weights=True)],
+        verbose=0
+    )
+    return model
+
+def regression_metrics(y_true, y_pred):
+    """MAE, RMSE and R² in original revenue units."""
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+    return {
+        'mae': float(mean_absolute_error(y_true, y_pred)),
+        'rmse': float(np.sqrt(mean_squared_error(y_true, y_pred))),
+        'r2': float(r2_score(y_true, y_pred)),
+    }
+
+def evaluate_step(model, scaled):
+    """Score the held-out test set in original revenue units."""
+    predictions = scaled['target_scaler'].inverse_transform(
+        model.predict(scaled['X_test'], verbose=0)
+    ).ravel()
+    return regression_metrics(scaled['y_test'], predictions)
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+# Bump when a change the step sources below do not show (a library upgrade,
+# the data contract, ...) must invalidate every cached step.
+PIPELINE_VERSION = 1
+
+# Module-level helpers whose source is part of a cached step's key, so editing
+# them invalidates the step too (evaluate is not cached: it always re-runs)
+STEP_HELPERS = {
+    'train_step': ('build_network',),
+}
+
+class StepCache:
+    """
+    On-disk cache of step outputs.
+
+    A step's key hashes PIPELINE_VERSION, the source of the step and of the
+    helpers it calls (STEP_HELPERS), the model columns, its config section and
+    the upstream key, so editing a step, a helper or its config invalidates it
+    and everything after it.
+    """
+
+    def __init__(self, directory, enabled=True):
+        self.directory = directory
+        self.enabled = enabled
+        if enabled:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(func, config, upstream_key):
+        helpers = [globals()[name] for name in STEP_HELPERS.get(func.__name__, ())]
+        payload = json.dumps({
+            'pipeline_version': PIPELINE_VERSION,
+            'code': inspect.getsource(func),
+            'helpers': [inspect.getsource(helper) for helper in helpers],
+            'columns': [FEATURE_COLUMNS, TARGET_COLUMN],
+            'config': config,
+            'upstream': upstream_key,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    def _path(self, name, key, suffix):
+        return os.path.join(self.directory, f'{name}-{key}{suffix}')
+
+    def run(self, name, func, config, upstream_key, *inputs):
+        """Return ``(output, key, cached)`` for a step, computing it on a cache miss."""
+        key = self.key(func, config, upstream_key)
+        keras_output = name == 'train'
+        path = self._path(name, key, '.keras' if keras_output else '.joblib')
+
+        if self.enabled and os.path.exists(path):
+            if keras_output:
+                from tensorflow.keras.models import load_model
+                return load_model(path), key, True
+            return joblib.load(path), key, True
+
+        output = func(*inputs, config)
+        if self.enabled:
+            tmp_path = self._path(name, key, '.tmp' + os.path.splitext(path)[1])
+            if keras_output:
+                output.save(tmp_path)
+            else:
+                joblib.dump(output, tmp_path)
+            os.replace(tmp_path, path)
+        return output, key, False
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+def merge_config(base, overrides):
+    """Recursively merge ``overrides`` into a copy of ``base``."""
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+def run_data_stages(config, cache=None, log=print):
+    """
+    Run load -> clean -> encode -> features -> split -> scale through the cache.
+
+    Returns:
+        tuple: (outputs dict keyed by step name, upstream key of the scale step)
+    """
+    cache = cache or StepCache(config['cache']['dir'], config['cache']['enabled'])
+    outputs = {}
+
+    def run(name, func, section, upstream_key, *inputs):
+        start = time.perf_counter()
+        output, key, cached = cache.run(name, func, section, upstream_key, *inputs)
+        log(f"[{name:<8}] {'cached' if cached else 'ran'} in {time.perf_counter() - start:6.2f}s  ({key})")
+        outputs[name] = output
+        return key
+
+    from src.ingest import source_digest
+    key = run('load', load_step, config['data'], source_digest(config['data']['path']))
+    key = run('clean', clean_step, config['clean'], key, outputs['load'])
+    key = run('encode', encode_step, config['encode'], key, outputs['clean'])
+    key = run('features', features_step, config['features'], key, outputs['encode'])
+    key = run('split', split_step, config['split'], key, outputs['features'])
+    key = run('scale', scale_step, config['scale'], key, outputs['split'])
+    return outputs, key
+
+def run_pipeline(config, log=print):
+    """
+    Run every step, save the serving artifacts and return the test metrics.
+
+    Args:
+        config (dict): Full pipeline config (see DEFAULT_CONFIG)
+        log: Callable used for progress lines
+
+    Returns:
+        dict: Test-set MAE/RMSE/R² plus the step cache keys
+    """
+    cache = StepCache(config['cache']['dir'], config['cache']['enabled'])
+    outputs, scale_key = run_data_stages(config, cache, log)
+
+    start = time.perf_counter()
+    model, train_key, cached = cache.run('train', train_step, config['model'], scale_key, outputs['scale'])
+    log(f"[{'train':<8}] {'cached' if cached else 'ran'} in {time.perf_counter() - start:6.2f}s  ({train_key})")
+
+    start = time.perf_counter()
+    metrics = evaluate_step(model, outputs['scale'])
+    log(f"[{'evaluate':<8}] ran in {time.perf_counter() - start:6.2f}s  "
+        f"MAE {metrics['mae']:,.0f}  RMSE {metrics['rmse']:,.0f}  R² {metrics['r2']:.3f}")
+
+    save_artifacts(config['output'], model, outputs['scale'], dict(metrics, model_key=train_key), log,
+                   vocabularies=outputs['features']['vocabularies'])
+    return dict(metrics, model_key=train_key)
+
+def save_artifacts(config, model, scaled, metrics, log=print, vocabularies=None):
+    """
+    Write the model, scalers, metrics and (optionally) the NumPy engine to ``config['dir']``.
+
+    When the category ``vocabularies`` are given, the fused feature transform
+    (vocabularies + feature scaler coefficients) is written next to them so
+    serving encodes inputs exactly as training did.
+    """
+    directory = config['dir']
+    os.makedirs(directory, exist_ok=True)
+    joblib.dump(scaled['feature_scaler'], os.path.join(directory, 'feature_scaler.pkl'))
+    joblib.dump(scaled['target_scaler'], os.path.join(directory, 'target_scaler.pkl'))
+    model.save(os.path.join(directory, 'neural_network_model.keras'))
+    with open(os.path.join(directory, 'training_metrics.json'), 'w') as f:
+        json.dump(metrics, f, indent=2)
+    if vocabularies is not None:
+        from app.utils.transform import FeatureTransform
+        FeatureTransform.from_training(vocabularies, scaled['feature_scaler']).save(
+            os.path.join(directory, 'feature_transform.npz'))
+
+    if config.get('export_numpy'):
+        from src.export_numpy import fold_model, verify
+        engine = fold_model(model, scaled['feature_scaler'], scaled['target_scaler'])
+        report = verify(engine, model, scaled['feature_scaler'], scaled['target_scaler'])
+        if report['passed']:
+            engine.save(os.path.join(directory, 'neural_network_model.npz'))
+        else:
+            log(f"NumPy engine not exported: max abs error ₹{report['max_abs_error']:,.2f} exceeds tolerance")
+    log(f"Saved artifacts to {directory}")
+
+    if config.get('publish'):
+        from app.utils.registry import publish
+        log(f"Published model version {publish(directory, directory)}")
+
+def parse_override(text):
+    """Turn ``section.key=value`` into a nested dict (value parsed as JSON when possible)."""
+    path, _, raw = text.partition('=')
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        value = raw
+    for part in reversed(path.split('.')):
+        value = {part: value}
+    return value
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--config', help='JSON file merged over the defaults')
+    parser.add_argument('--set', action='append', default=[], metavar='SECTION.KEY=VALUE',
+                        help='override one config value, e.g. model.epochs=20')
+    parser.add_argument('--no-cache', action='store_true', help='recompute every step')
+    parser.add_argument('--print-config', action='store_true', help='print the merged config and exit')
+    args = parser.parse_args(argv)
+
+    config = DEFAULT_CONFIG
+    if args.config:
+        with open(args.config) as f:
+            config = merge_config(config, json.load(f))
+    for override in args.set:
+        config = merge_config(config, parse_override(override))
+    if args.no_cache:
+        config = merge_config(config, {'cache': {'enabled': False}})
+
+    if args.print_config:
+        print(json.dumps(config, indent=2))
+        return 0
+
+    run_pipeline(config)
+    return 0
 
-# Load dataset
-df = pd.read_csv('data\raw\revenue_prediction.csv')
-
-# Basic data inspection
-print("\nFirst 5 rows:")
-print(df.head())
-print("\nData Summary:")
-print(df.info())
-print("\nDescriptive Stats:")
-print(df.describe())
-
-# Handle missing values
-df = df.dropna()
-
-# Remove duplicates
-df = df.drop_duplicates()
-
-# Convert categorical features to numeric
-df['Franchise'] = df['Franchise'].astype('category').cat.codes
-df['Category'] = df['Category'].astype('category').cat.codes
-
-# Create interaction features
-df['Order_Item_Ratio'] = df['Order_Placed'] / df['No_Of_Item']
-
-# Split data into features and target variable
-X = df[['Franchise', 'Category', 'No_Of_Item', 'Order_Placed', 'Order_Item_Ratio']]
-y = df['Revenue']
-
-# Split data into training and testing sets
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# Standardize features
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
-
-# Save the scaler
-joblib.dump(scaler, '../models/scaler.pkl')
-
-# Train and save the Linear Regression model
-lr_model = LinearRegression()
-lr_model.fit(X_train_scaled, y_train)
-joblib.dump(lr_model, '../models/linear_regression_model.pkl')
-
-# Train and save the Neural Network model
-nn_model = Sequential([
-    Dense(128, activation='relu', input_shape=(X_train_scaled.shape[1],)),
-    Dropout(0.3),
-    Dense(64, activation='relu'),
-    Dropout(0.2),
-    Dense(32, activation='relu'),
-    Dense(1)
-])
-nn_model.compile(optimizer='adam', loss='mean_squared_error', metrics=['mae'])
-nn_model.fit(X_train_scaled, y_train, epochs=100, batch_size=32, validation_split=0.2)
-nn_model.save('../models/neural_network_model.h5')
-
-# Evaluate models
-lr_predictions = lr_model.predict(X_test_scaled)
-nn_predictions = nn_model.predict(X_test_scaled).flatten()
-
-# Linear Regression Model Evaluation
-print('Linear Regression MAE:', mean_absolute_error(y_test, lr_predictions))
-print('Linear Regression MSE:', mean_squared_error(y_test, lr_predictions))
-print('Linear Regression R²:', r2_score(y_test, lr_predictions))
-
-# Neural Network Model Evaluation
-print('Neural Network MAE:', mean_absolute_error(y_test, nn_predictions))
-print('Neural Network MSE:', mean_squared_error(y_test, nn_predictions))
-print('Neural Network R²:', r2_score(y_test, nn_predictions))
-
-# Visualize model performance comparison
-model_performance = pd.DataFrame({
-    'Model': ['Linear Regression', 'Neural Network'],
-    'MAE': [mean_absolute_error(y_test, lr_predictions), mean_absolute_error(y_test, nn_predictions)],
-    'MSE': [mean_squared_error(y_test, lr_predictions), mean_squared_error(y_test, nn_predictions)],
-    'R²': [r2_score(y_test, lr_predictions), r2_score(y_test, nn_predictions)]
-})
-
-model_performance.plot(x='Model', y=['MAE', 'MSE', 'R²'], kind='bar', figsize=(10, 6))
-plt.title('Model Performance Comparison')
-plt.ylabel('Error / Score')
-plt.show()
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,195 @@
+# src/train_segments.py
+"""
+Train one revenue model per segment (City by default) on a process pool.
+
+Rows come from the cached data stages of src/train.py, so categories get the
+same codes as the global model and every row keeps its place in the global
+train/held-out split. Every segment with at least --min-rows rows, and
+--min-test-rows of them held out, gets the training pipeline's network,
+fitted on its rows of the global train split with its own scalers, in a pool
+worker (one TensorFlow runtime per worker, threads capped). The trained
+network is folded into a NumPy engine (src/export_numpy.py), so the serving
+router loads segments without TensorFlow.
+
+A segment model is only kept when it beats the global model on the
+segment's rows of the global held-out split, which neither model trained
+on; sparse segments and segments that lose are served by the global model. Engines and a manifest are written to
+<model dir>/segments/ (see app/utils/segments.py).
+
+Usage (from the repository root):
+    python -m src.train_segments --workers 4
+    python -m src.train_segments --segment-by City,Franchise --min-rows 40
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from app.utils.segments import MANIFEST, SEGMENTS_DIR, segment_filename, segment_key
+from src.train import DEFAULT_CONFIG, FEATURE_COLUMNS, TARGET_COLUMN, regression_metrics, run_data_stages
+
+def segment_frames(config, segment_by):
+    """
+    The global pipeline's train and held-out rows, grouped by segment.
+
+    Rows keep their place in the global split, so a segment's held-out rows
+    are ones the global model (trained with the same config) never saw.
+
+    Returns:
+        dict: Segment key -> {'train': DataFrame, 'test': DataFrame} of
+        FEATURE_COLUMNS plus TARGET_COLUMN
+    """
+    outputs, _ = run_data_stages(config, log=lambda message: None)
+    encoded = outputs['encode']['frame']
+    vocabularies = outputs['encode']['vocabularies']
+    decode = {column: vocabularies[column] for column in segment_by if column in vocabularies}
+
+    groups = {}
+    for part in ('train', 'test'):
+        split = outputs['split']
+        df = split[f'X_{part}'].assign(**{TARGET_COLUMN: split[f'y_{part}']})
+        df = df.join(encoded.loc[df.index, segment_by])
+        for values, frame in df.groupby(segment_by, observed=True):
+            values = values if isinstance(values, tuple) else (values,)
+            labels = [decode[column][int(v)] if column in decode else v for column, v in zip(segment_by, values)]
+            groups.setdefault(segment_key(labels), {'train': df.iloc[:0], 'test': df.iloc[:0]})[part] = frame
+    return groups
+
+def _init_worker(threads):
+    from app.utils.parallel import limit_threads
+    limit_threads(threads, tensorflow=True)
+
+def train_segment(key, X_train, y_train, X_test, y_test, model_config, global_engine_path, output_path):
+    """
+    Fit, fold and evaluate one segment model (runs in a pool worker).
+
+    The segment model is fitted on the segment's rows of the global train
+    split and compared with the global model on its rows of the global
+    held-out split.
+
+    Returns:
+        dict: Segment key, row counts, held-out metrics of the segment and
+        global models, and whether the segment model was kept
+    """
+    from sklearn.preprocessing import StandardScaler
+    from app.utils.numpy_engine import NumpyModel
+    from src.export_numpy import fold_model
+    from src.train import train_step
+
+    start = time.perf_counter()
+    feature_scaler = StandardScaler().fit(X_train)
+    target_scaler = StandardScaler().fit(y_train.reshape(-1, 1))
+    model = train_step({
+        'X_train': feature_scaler.transform(X_train),
+        'y_train': target_scaler.transform(y_train.reshape(-1, 1)),
+    }, model_config)
+    engine = fold_model(model, feature_scaler, target_scaler)
+
+    segment_metrics = regression_metrics(y_test, engine.predict(X_test).ravel())
+    global_metrics = regression_metrics(y_test, NumpyModel.load(global_engine_path).predict(X_test).ravel())
+    kept = segment_metrics['mae'] < global_metrics['mae']
+    if kept:
+        engine.save(output_path)
+    return {
+        'key': key,
+        'rows': len(X_train) + len(X_test),
+        'test_rows': len(X_test),
+        'metrics': segment_metrics,
+        'global_metrics': global_metrics,
+        'kept': bool(kept),
+        'seconds': time.perf_counter() - start,
+    }
+
+def train_segments(model_dir='models', segment_by=('City',), min_rows=30, workers=None, threads_per_worker=1,
+                   config=DEFAULT_CONFIG, log=print, min_test_rows=10):
+    """
+    Train the segment zoo and write it to ``<model_dir>/segments``.
+
+    ``config`` must be the one the global model was trained with, so the
+    held-out rows the two models are compared on are the global model's too.
+    A segment needs ``min_rows`` rows in all and ``min_test_rows`` of them
+    held out; smaller segments are left to the global model untested.
+
+    Returns:
+        dict: The manifest written (kept segments plus per-segment results)
+    """
+    segment_by = list(segment_by)
+    global_engine = os.path.join(model_dir, 'neural_network_model.npz')
+    groups = segment_frames(config, segment_by)
+    eligible = {key: parts for key, parts in groups.items()
+                if len(parts['train']) + len(parts['test']) >= min_rows and len(parts['test']) >= min_test_rows}
+    for key in sorted(set(groups) - set(eligible)):
+        parts = groups[key]
+        log(f"  {key:<24} {len(parts['train']) + len(parts['test']):>6} rows  -> global model "
+            f"(fewer than {min_rows} rows or {min_test_rows} held out; {len(parts['test'])} held out)")
+
+    zoo_dir = os.path.join(model_dir, SEGMENTS_DIR)
+    building = zoo_dir + '.building'
+    shutil.rmtree(building, ignore_errors=True)
+    os.makedirs(building)
+
+    results = []
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(workers or os.cpu_count(), mp_context=context, initializer=_init_worker,
+                             initargs=(threads_per_worker,)) as pool:
+        futures = [pool.submit(train_segment, key,
+                               parts['train'][FEATURE_COLUMNS].to_numpy(dtype=np.float64),
+                               parts['train'][TARGET_COLUMN].to_numpy(dtype=np.float64),
+                               parts['test'][FEATURE_COLUMNS].to_numpy(dtype=np.float64),
+                               parts['test'][TARGET_COLUMN].to_numpy(dtype=np.float64),
+                               config['model'], global_engine, os.path.join(building, segment_filename(key)))
+                   for key, parts in eligible.items()]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            log(f"  {result['key']:<24} {result['rows']:>6} rows  {result['test_rows']:>4} held out  MAE ₹{result['metrics']['mae']:>12,.0f} "
+                f"vs global ₹{result['global_metrics']['mae']:>12,.0f}  "
+                f"{'kept' if result['kept'] else '-> global model'}  ({result['seconds']:.1f}s)")
+
+    manifest = {
+        'segment_by': segment_by,
+        'min_rows': min_rows,
+        'min_test_rows': min_test_rows,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'segments': {result['key']: {'file': segment_filename(result['key']), 'rows': result['rows'],
+                                     'test_rows': result['test_rows'], 'metrics': result['metrics'],
+                                     'global_metrics': result['global_metrics']}
+                     for result in sorted(results, key=lambda r: r['key']) if result['kept']},
+        'fallback': sorted(set(groups) - {r['key'] for r in results if r['kept']}),
+    }
+    with open(os.path.join(building, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    shutil.rmtree(zoo_dir, ignore_errors=True)
+    os.replace(building, zoo_dir)
+    return manifest
+
+def main(argv=None):
+    from app.utils.loader import resolve_artifacts
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-dir', help='registry root or flat model directory (default: REVENUE_MODEL_DIR)')
+    parser.add_argument('--segment-by', default='City', help='comma-separated segment columns')
+    parser.add_argument('--min-rows', type=int, default=30, help='smaller segments use the global model')
+    parser.add_argument('--min-test-rows', type=int, default=10,
+                        help='segments with fewer held-out rows of the global split use the global model')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--threads-per-worker', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    directory = resolve_artifacts('numpy', args.model_dir)[1]
+    start = time.perf_counter()
+    manifest = train_segments(directory, args.segment_by.split(','), args.min_rows, args.workers,
+                              args.threads_per_worker, min_test_rows=args.min_test_rows)
+    print(f"{len(manifest['segments'])} segment models kept, {len(manifest['fallback'])} segments on the "
+          f"global model ({time.perf_counter() - start:.1f}s); saved to {os.path.join(directory, SEGMENTS_DIR)}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,16 +1,18 @@
 import streamlit as st
-from tensorflow.keras.models import load_model
-import numpy as np
-import pandas as pd
 import plotly.express as px
 from streamlit.components.v1 import html
+from app.utils.loader import load_assets, load_feature_importance, model_version
+from app.utils.predictor import category_options, inverse_scale_prediction, preprocess_input
+from app.utils.intervals import predict_interval, supports_intervals
+from app.utils.store import get_store
+from app.utils.visualizer import create_city_chart, revenue_aggregates
 
-# Load model
+# Load the published model with the scalers it was trained with
 @st.cache_resource
 def load_ml_model():
-    return load_model('neural_network_model.h5')
+    return model_version(), load_assets()
 
-model = load_ml_model()
+version, (model, feature_scaler, target_scaler) = load_ml_model()
 
 # ========== Custom CSS & Animations ==========
 st.markdown("""
@@ -102,53 +104,57 @@ with st.expander("⚙️ **Configure Restaurant Parameters**", expanded=True):
     with col1:
         franchise = st.selectbox('Franchise Status', ['Independent', 'Franchised'], 
                                help="Select restaurant ownership type")
-        category = st.selectbox('Cuisine Category', ['Fast Casual', 'Fine Dining', 'Family Style', 'Cafe'])
+        category = st.selectbox('Cuisine Category', category_options(feature_scaler))
         
     with col2:
         no_of_items = st.number_input('Menu Items Count', min_value=1, value=45,
                                     help="Total number of dishes offered")
         order_placed = st.slider('Monthly Orders (×1000)', 1, 500, 120)
-        
-    franchise_code = 1 if franchise == 'Franchised' else 0
-    category_codes = {'Fast Casual':0, 'Fine Dining':1, 'Family Style':2, 'Cafe':3}
-    order_item_ratio = order_placed / no_of_items
 
 # Prediction & Visualization
 if st.button('🚀 Generate Revenue Forecast'):
-    input_data = np.array([franchise_code, category_codes[category], 
-                         no_of_items, order_placed, order_item_ratio]).reshape(1, -1)
+    inputs = {'franchise': 1 if franchise == 'Franchised' else 0, 'category': category,
+              'menu_size': no_of_items, 'orders': order_placed}
+    # Encoded and scaled exactly as in training
+    input_data = preprocess_input(inputs, feature_scaler)
     
     with st.spinner('Crunching numbers with neural network...'):
-        prediction = model.predict(input_data)[0][0]
+        if supports_intervals(model):
+            # Point prediction plus Monte-Carlo dropout samples in one tiled pass, in rupees
+            result = predict_interval(inputs, model, feature_scaler, target_scaler, seed=0)
+            prediction, lower, upper = result['prediction'][0], result['lower'][0], result['upper'][0]
+            get_store().record(inputs, prediction, version, 'test.py', lower, upper)
+            interval = f"90% interval ₹ {lower:,.0f} – ₹ {upper:,.0f} (Monte-Carlo dropout)"
+        else:
+            prediction = inverse_scale_prediction(model.predict(input_data), target_scaler)
+            get_store().record(inputs, prediction, version, 'test.py')
+            interval = "No dropout layers to estimate an interval from"
         
         # Animated result display
         st.markdown(f"""
         <div class="metric-card">
             <h3 style="color:#1f567d; margin:0;">Projected Revenue</h3>
             <h1 style="color:#2c3e50; margin:0;">₹ {prediction:,.0f}</h1>
-            <p style="color:#6c757d; margin:0;">± 5% accuracy based on historical data</p>
+            <p style="color:#6c757d; margin:0;">{interval}</p>
         </div>
         """, unsafe_allow_html=True)
         
         # Interactive Visualizations
         col_v1, col_v2 = st.columns(2)
         with col_v1:
-            # Feature Importance Chart
-            fig = px.pie(values=[0.35, 0.25, 0.2, 0.15, 0.05], 
-                       names=['Orders', 'Menu Size', 'Category', 'Franchise', 'Other'],
-                       title='Revenue Drivers Breakdown')
-            st.plotly_chart(fig, use_container_width=True)
+            # Feature importance precomputed by src/importance.py
+            report = load_feature_importance()
+            if report is None:
+                st.info("Run `python -m src.importance` to compute the revenue drivers.")
+            else:
+                fig = px.pie(values=[item['share'] for item in report['importance']],
+                           names=[item['feature'] for item in report['importance']],
+                           title='Revenue Drivers Breakdown')
+                st.plotly_chart(fig, use_container_width=True)
             
         with col_v2:
-            # Historical Performance
-            history_data = pd.DataFrame({
-                'Month': ['Jan', 'Feb', 'Mar', 'Apr', 'May'],
-                'Revenue': [120000, 135000, 125000, 145000, prediction]
-            })
-            fig = px.line(history_data, x='Month', y='Revenue', 
-                        title='Revenue Trend Projection',
-                        markers=True)
-            st.plotly_chart(fig, use_container_width=True)
+            # Average revenue of comparable outlets, from the training data
+            st.plotly_chart(create_city_chart(revenue_aggregates()), use_container_width=True)
 
 # ========== Footer Section ==========
 st.markdown("---")
@@ -0,0 +1,14 @@
+import os
+import shutil
+
+import pytest
+
+from app.utils.loader import load_assets
+
+MODEL_DIR = os.path.join(os.path.dirname(__file__), os.pardir, 'models')
+
+def test_artifacts_without_feature_transform_are_rejected(tmp_path):
+    for name in ('neural_network_model.npz', 'feature_scaler.pkl', 'target_scaler.pkl'):
+        shutil.copy(os.path.join(MODEL_DIR, name), tmp_path)
+    with pytest.raises(FileNotFoundError, match='python -m src.train'):
+        load_assets('numpy', str(tmp_path))
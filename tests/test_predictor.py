@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from app.utils.intervals import predict_interval
+from app.utils.predictor import build_features, category_options, predict_batch
+
+class _UnusedModel:
+    """Fails the test if an empty batch reaches the network."""
+
+    def predict(self, x, **kwargs):
+        raise AssertionError('model called for an empty batch')
+
+@pytest.fixture
+def scalers():
+    rows = {'franchise': [0, 1, 1], 'category': [0, 4, 7],
+            'menu_size': [10, 25, 40], 'orders': [2.0, 4.0, 6.0]}
+    feature_scaler = StandardScaler().fit(build_features(rows))
+    target_scaler = StandardScaler().fit(np.array([[1e6], [2e6], [3e6]]))
+    return feature_scaler, target_scaler
+
+EMPTY = {'franchise': [], 'category': [], 'menu_size': [], 'orders': []}
+
+def test_predict_batch_empty(scalers):
+    result = predict_batch(EMPTY, _UnusedModel(), *scalers)
+    assert result.shape == (0,)
+
+def test_predict_interval_empty(scalers):
+    result = predict_interval(EMPTY, _UnusedModel(), *scalers)
+    assert all(result[key].shape == (0,) for key in ('prediction', 'lower', 'upper', 'std'))
+
+def test_labels_need_the_training_vocabulary(scalers):
+    rows = {'franchise': [1], 'category': ['Burger'], 'menu_size': [25], 'orders': [4.0]}
+    with pytest.raises(ValueError, match='feature_transform.npz'):
+        predict_batch(rows, _UnusedModel(), *scalers)
+    with pytest.raises(ValueError, match='src.train'):
+        category_options(scalers[0])
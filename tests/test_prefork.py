@@ -0,0 +1,35 @@
+import io
+import os
+import signal
+import time
+
+import pytest
+
+from app import prefork
+from app.prefork import PreforkServer
+
+class _CrashingServer(PreforkServer):
+    def _worker_main(self):
+        os._exit(1)
+
+@pytest.fixture
+def restore_signals():
+    handlers = {signum: signal.getsignal(signum) for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP)}
+    yield
+    for signum, handler in handlers.items():
+        signal.signal(signum, handler)
+
+def test_gives_up_on_workers_failing_at_startup(monkeypatch, restore_signals):
+    monkeypatch.setattr(prefork, 'RESPAWN_BACKOFF_BASE', 0.1)
+    monkeypatch.setattr(prefork, 'MAX_FAILED_STARTS', 3)
+    server = _CrashingServer('numpy', workers=1, port=0)
+    server.spawn()
+    log = io.StringIO()
+
+    start = time.monotonic()
+    assert server.run(log=log) == 1
+    # Backed off 0.1s then 0.2s between the three failed starts
+    assert time.monotonic() - start >= 0.3
+    assert log.getvalue().count('exited during startup') == 3
+    assert 'giving up' in log.getvalue()
+    assert not server.workers
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.refresh import refresh, trim_target
+
+def _rows(n):
+    return pd.DataFrame({
+        'Franchise': ['Yes', 'No'] * (n // 2),
+        'Category': ['Burger'] * n,
+        'City': ['Pune'] * n,
+        'No_Of_Item': np.arange(1, n + 1),
+        'Order_Placed': np.linspace(1.0, 9.0, n),
+        'Revenue': np.linspace(1e6, 9e6, n),
+    })
+
+def test_trim_target_drops_the_tails():
+    trimmed, dropped = trim_target(_rows(20), [0.05, 0.95])
+    assert dropped == 2
+    assert trimmed['Revenue'].min() > 1e6 and trimmed['Revenue'].max() < 9e6
+
+def test_refresh_refuses_a_tiny_holdout():
+    vocabularies = {'Franchise': ['No', 'Yes'], 'Category': ['Burger']}
+    with pytest.raises(ValueError, match='held-out rows'):
+        refresh(_rows(20), None, None, None, vocabularies, holdout=0.2, min_holdout_rows=10)
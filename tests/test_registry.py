@@ -0,0 +1,31 @@
+import os
+import shutil
+
+from app.utils.registry import activate, current_version, list_versions, publish
+
+MODEL_DIR = os.path.join(os.path.dirname(__file__), os.pardir, 'models')
+
+def _artifacts(directory):
+    os.makedirs(directory)
+    for name in ('neural_network_model.npz', 'feature_scaler.pkl', 'target_scaler.pkl'):
+        shutil.copy(os.path.join(MODEL_DIR, name), directory)
+    return directory
+
+def test_publish_identical_artifacts_reuses_version(tmp_path):
+    source = _artifacts(str(tmp_path / 'source'))
+    registry = str(tmp_path / 'registry')
+    first = publish(source, registry)
+    assert publish(source, registry) == first
+    assert list_versions(registry) == [first]
+
+def test_republish_reactivates_version(tmp_path):
+    source = _artifacts(str(tmp_path / 'source'))
+    registry = str(tmp_path / 'registry')
+    first = publish(source, registry)
+    with open(os.path.join(source, 'training_metrics.json'), 'w') as f:
+        f.write('{"mae": 1.0}')
+    second = publish(source, registry)
+    assert second != first
+    activate(first, registry)
+    assert publish(source, registry) == second
+    assert current_version(registry) == second
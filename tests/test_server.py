@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from app.server import ScoringServer
+
+class _Writer:
+    """Collects what the handler writes instead of sending it."""
+
+    def __init__(self):
+        self.data = b''
+        self.closed = False
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+def _handle(request):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(request)
+        reader.feed_eof()
+        writer = _Writer()
+        await ScoringServer(batcher=None)._handle_connection(reader, writer)
+        return writer
+    return asyncio.run(run())
+
+@pytest.mark.parametrize('request_bytes', [
+    b'GARBAGE\r\n\r\n',
+    b'POST /predict HTTP/1.1\r\nContent-Length: abc\r\n\r\n',
+    b'POST /predict HTTP/1.1\r\nContent-Length: -5\r\n\r\n',
+])
+def test_malformed_request_gets_400(request_bytes):
+    writer = _handle(request_bytes)
+    assert writer.data.startswith(b'HTTP/1.1 400 Bad Request\r\n')
+    assert b'Connection: close' in writer.data
+    assert writer.closed
+
+def test_healthz_still_served():
+    writer = _handle(b'GET /healthz HTTP/1.1\r\nConnection: close\r\n\r\n')
+    assert writer.data.startswith(b'HTTP/1.1 200 OK\r\n')
+    assert writer.data.endswith(b'{"status": "ok"}')
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from app.utils.store import PredictionStore
+
+ROWS = pd.DataFrame({
+    'Franchise': ['Yes', 'No', 'Yes'],
+    'Category': ['Burger', 'Burger', 'Pizza'],
+    'City': ['Pune', 'Pune', 'Noida'],
+    'No_Of_Item': [20, 30, 40],
+    'Order_Placed': [2.0, 4.0, 6.0],
+})
+
+def test_batch_is_written_and_rolled_up(tmp_path):
+    store = PredictionStore(str(tmp_path / 'predictions.sqlite3'), flush_interval=0.01)
+    assert store.record_batch(ROWS, [1e6, 3e6, 5e6], model_version='v1')
+    store.flush()
+    assert store.written == 3
+
+    trend = store.trend()
+    assert trend['predictions'].tolist() == [3]
+    assert trend['mean_revenue'].tolist() == [3e6]
+
+    summary = store.summary(by='category').set_index('category')
+    assert summary.loc['Burger', 'predictions'] == 2
+    assert summary.loc['Burger', 'mean_revenue'] == 2e6
+    assert summary.loc['Pizza', 'max_revenue'] == 5e6
+    assert store.summary(by='city', franchise='Yes')['predictions'].sum() == 2
+
+def test_writer_survives_a_failed_flush(tmp_path, monkeypatch):
+    store = PredictionStore(str(tmp_path / 'predictions.sqlite3'), flush_interval=0.01)
+    write = store._write
+    def fail_once(connection, rows):
+        monkeypatch.setattr(store, '_write', write)
+        raise RuntimeError('disk on fire')
+    monkeypatch.setattr(store, '_write', fail_once)
+
+    store.record_batch(ROWS, [1e6, 3e6, 5e6])
+    store.flush()
+    assert store.write_errors == 1 and store.last_error == 'RuntimeError: disk on fire'
+
+    store.record_batch(ROWS, [1e6, 3e6, 5e6])
+    store.flush()
+    assert store.written == 3
@@ -0,0 +1,15 @@
+from src import train
+from src.train import StepCache
+
+def _other_network(n_features, config):
+    return None
+
+def test_key_changes_with_helper_source(monkeypatch):
+    before = StepCache.key(train.train_step, {'epochs': 1}, 'upstream')
+    monkeypatch.setattr(train, 'build_network', _other_network)
+    assert StepCache.key(train.train_step, {'epochs': 1}, 'upstream') != before
+
+def test_key_changes_with_pipeline_version(monkeypatch):
+    before = StepCache.key(train.split_step, {'test_size': 0.2}, 'upstream')
+    monkeypatch.setattr(train, 'PIPELINE_VERSION', train.PIPELINE_VERSION + 1)
+    assert StepCache.key(train.split_step, {'test_size': 0.2}, 'upstream') != before